@@ -1,7 +1,12 @@
 import os
+from pydantic import ValidationInfo, field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+# Sample/placeholder values rejected for secrets: anyone who has read the
+# sample could forge download links or open the admin profiling endpoints.
+PLACEHOLDER_SECRETS = {"change_me", "changeme", "change-me", "secret", "your_secret_here", "your_key_here"}
+
 class Settings(BaseSettings):
     BACKEND_HOST: str = "0.0.0.0"
     BACKEND_PORT: int = 8000
@@ -14,6 +19,34 @@ class Settings(BaseSettings):
     ALLOWED_EXCEL_EXTS: str = ".xlsx,.xls"
     ALLOWED_PDF_EXTS: str = ".pdf"
 
+    # -- Download links --
+    # HMAC key for signed download tokens. Leave unset to use a key generated
+    # once under DATA_DIR (shared by every worker on the same volume).
+    DOWNLOAD_TOKEN_SECRET: str | None = None
+    DOWNLOAD_TOKEN_TTL_SECONDS: int = 7 * 24 * 60 * 60
+
+    @field_validator("DOWNLOAD_TOKEN_SECRET", "PROFILING_ADMIN_TOKEN")
+    @classmethod
+    def _reject_placeholder_secret(cls, value: str | None, info: ValidationInfo) -> str | None:
+        if value is not None and value.strip().lower() in PLACEHOLDER_SECRETS:
+            raise ValueError(
+                f"{info.field_name} is a placeholder; set a random value "
+                "(e.g. `openssl rand -hex 32`) or leave it unset"
+            )
+        return value or None
+
+    # -- Result previews --
+    PREVIEW_CACHE_SIZE: int = 256
+    PREVIEW_MAX_ROWS: int = 1000
+    PREVIEW_HTML_ROWS: int = 200
+
+    # -- Summary workbooks --
+    # The query sheet's formatting is copied from a full (editable) load of
+    # the workbook, whose memory grows with its size; above this many cells
+    # that load is skipped and the summary is written without formatting.
+    # Output sheets are always streamed, whatever the number of PNs.
+    EXCEL_TEMPLATE_MAX_CELLS: int = 200_000
+
     # -- AOAI Configurations --
     AZURE_OPENAI_ENDPOINT: str | None = None
     AZURE_OPENAI_API_KEY: str | None = None
@@ -24,15 +57,55 @@ class Settings(BaseSettings):
     DI_ENDPOINT: str | None = None
     DI_KEY: str | None = None
 
-    # --- S3 Compatible Storage (Optional - TODO) ---
+    # --- S3 Compatible Storage (Optional, requires boto3) ---
+    # Enabled when S3_BUCKET_NAME is set; DATA_DIR then only holds working copies.
     S3_ENDPOINT_URL: str | None = None
     S3_ACCESS_KEY_ID: str | None = None
     S3_SECRET_ACCESS_KEY: str | None = None
     S3_BUCKET_NAME: str | None = None
+    S3_REGION: str | None = None
+    S3_KEY_PREFIX: str = ""
+    S3_PRESIGNED_URL_TTL_SECONDS: int = 15 * 60
+
+    # -- Field aliases --
+    ALIAS_CACHE_CHECK_SECONDS: float = 5.0
+    ALIAS_FUZZY_MIN_SCORE: float = 0.6
+
+    # -- Alternative-part search --
+    ALT_TOP_N: int = 5
+    ALT_INDEX_TTL_SECONDS: int = 300
+
+    # -- Job registry --
+    JOB_TTL_SECONDS: int = 24 * 60 * 60
+    JOB_MAX_ENTRIES: int = 10000
+    JOB_RECORD_MAX_TEXT: int = 2000
+    JOB_STORE: str = "memory" # "memory" or "mongo" (shared between workers)
+
+    # -- Server-Sent Events --
+    SSE_FLUSH_INTERVAL_SECONDS: float = 0.25
+    SSE_HEARTBEAT_SECONDS: int = 15
+    SSE_REPLAY_BUFFER_SIZE: int = 1000
+    SSE_RETRY_MS: int = 3000
 
     # -- MongoDB Configurations --
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB: str = "simplo_ai"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: int | None = None
+    MONGODB_COMPRESSORS: str = "" # e.g. "zstd,zlib" (zstd needs the zstandard package)
+    MONGODB_SLOW_MS: float = 100.0 # commands slower than this are logged
+    MONGODB_EXPLAIN_SLOW: bool = True # log the query plan of slow reads
+
+    # -- Logging --
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = "" # per-logger overrides, e.g. "app.services=DEBUG,azure=WARNING"
+    LOG_FORMAT: str = "text" # "text" or "json"
+
+    # -- Profiling (off: no middleware, no sampler thread) --
+    PROFILING_ENABLED: bool = False
+    PROFILING_ADMIN_TOKEN: str | None = None # required in X-Admin-Token to start or download a profile
+    PROFILING_INTERVAL_MS: float = 5.0
 
     class Config:
         env_file = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
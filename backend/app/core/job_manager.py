@@ -1,15 +1,186 @@
 # backend/app/core/job_manager.py
 from __future__ import annotations
 
-import os
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------------------------------------------------------
-# In-memory job status table (kept for compatibility with existing imports)
+# Job registry
 # -----------------------------------------------------------------------------
-job_statuses: Dict[str, Dict[str, Any]] = {}
+def compact_record(record: Dict[str, Any], max_text: int | None = None) -> Dict[str, Any]:
+    """
+    Drops unset (None) fields and keeps only the tail of long strings such as
+    tracebacks, where the useful part (the exception) is.
+    """
+    max_text = settings.JOB_RECORD_MAX_TEXT if max_text is None else max_text
+    compact: Dict[str, Any] = {}
+    for key, value in record.items():
+        if value is None:
+            continue
+        if isinstance(value, str) and len(value) > max_text:
+            value = "..." + value[-max_text:]
+        compact[key] = value
+    return compact
+
+class MongoJobStore:
+    """
+    Shares job records between workers through the `jobs` collection; a TTL
+    index on updatedAt (see ensure_indexes) removes old records.
+
+    Writes carry the registry's version and only replace an older one, so
+    background writes that land out of order never bring back a stale record.
+    """
+    collection_name = "jobs"
+
+    def _collection(self):
+        from app.db.mongo import get_db
+        db = get_db()
+        return db[self.collection_name] if db is not None else None
+
+    async def put(self, job_id: str, record: Dict[str, Any], version: int) -> None:
+        from pymongo.errors import DuplicateKeyError
+
+        collection = self._collection()
+        if collection is None:
+            return
+        doc = {**record, "version": version, "updatedAt": datetime.now(timezone.utc)}
+        try:
+            # If a newer version is stored the filter misses and the upsert
+            # collides with its _id: this write is stale and is dropped.
+            # Records written before versioning have no version field.
+            older = {"$or": [{"version": {"$lt": version}}, {"version": {"$exists": False}}]}
+            await collection.replace_one({"_id": job_id, **older}, doc, upsert=True)
+        except DuplicateKeyError:
+            pass
+
+    async def get(self, job_id: str) -> Dict[str, Any] | None:
+        collection = self._collection()
+        if collection is None:
+            return None
+        return await collection.find_one({"_id": job_id}, {"_id": 0, "version": 0, "updatedAt": 0})
+
+class JobRegistry:
+    """
+    Job records keyed by job_id, evicted ttl_seconds after their last update
+    or, oldest first, once more than max_entries are held.
+
+    Records are compacted on write. With a store, every write is also
+    persisted in the background and aget() falls back to the store, so a
+    job started on one worker can be polled on another.
+    """
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        store: MongoJobStore | None = None,
+        on_evict: Callable[[str, Dict[str, Any]], None] | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self.on_evict = on_evict
+        self._records: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Set[asyncio.Task] = set()
+        # Orders the persisted writes; seeded from the clock so versions keep
+        # increasing across evictions and restarts.
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def __getitem__(self, job_id: str) -> Dict[str, Any]:
+        record = self.get(job_id)
+        if record is None:
+            raise KeyError(job_id)
+        return record
+
+    def __setitem__(self, job_id: str, record: Dict[str, Any]) -> None:
+        self.set(job_id, record)
+
+    def get(self, job_id: str, default: Any = None) -> Dict[str, Any] | Any:
+        evicted = []
+        with self._lock:
+            entry = self._records.get(job_id)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl_seconds:
+                evicted.append((job_id, self._records.pop(job_id)[1]))
+                entry = None
+        self._notify_evicted(evicted)
+        return entry[1] if entry is not None else default
+
+    def set(self, job_id: str, record: Dict[str, Any]) -> None:
+        record = compact_record(record)
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            self._version = max(self._version + 1, time.time_ns())
+            version = self._version
+            self._records[job_id] = (now, record)
+            self._records.move_to_end(job_id)
+            # Records are ordered by last update, so expired ones are at the front.
+            while self._records:
+                oldest_id, (updated_at, oldest) = next(iter(self._records.items()))
+                if len(self._records) <= self.max_entries and now - updated_at < self.ttl_seconds:
+                    break
+                self._records.popitem(last=False)
+                evicted.append((oldest_id, oldest))
+        self._notify_evicted(evicted)
+        if self.store is not None:
+            self._persist(job_id, record, version)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Merges fields into an existing record (or starts a new one)."""
+        self.set(job_id, {**(self.get(job_id) or {}), **fields})
+
+    async def aget(self, job_id: str) -> Dict[str, Any] | None:
+        record = self.get(job_id)
+        if record is None and self.store is not None:
+            try:
+                record = await self.store.get(job_id)
+            except Exception as e:
+                logger.warning("Job store lookup failed for %s: %s", job_id, e)
+        return record
+
+    def _persist(self, job_id: str, record: Dict[str, Any], version: int) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._put(job_id, record, version))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _put(self, job_id: str, record: Dict[str, Any], version: int) -> None:
+        try:
+            await self.store.put(job_id, record, version)
+        except Exception as e:
+            logger.warning("Job store write failed for %s: %s", job_id, e)
+
+    def _notify_evicted(self, evicted) -> None:
+        if self.on_evict:
+            for job_id, record in evicted:
+                self.on_evict(job_id, record)
+
+# Value-search job status, polled by /api/value/result_polling.
+job_statuses = JobRegistry(
+    ttl_seconds=settings.JOB_TTL_SECONDS,
+    max_entries=settings.JOB_MAX_ENTRIES,
+    store=MongoJobStore() if settings.JOB_STORE == "mongo" else None,
+)
 
 # -----------------------------------------------------------------------------
 # Job directories handling
@@ -24,21 +195,11 @@ class JobDirs:
 
 def _resolve_data_root() -> Path:
     """
-    Decide where to store job data.
-    Priority:
-      1) DATA_DIR env var (if set)
-      2) '/data' (docker-compose mounts ./data:/data)
-      3) '.data' (fallback)
+    The data root, settings.DATA_DIR: the same directory StorageService uses
+    as its base_dir, so job artifacts are always inside the storage root and
+    can be made downloadable.
     """
-    env_dir = os.getenv("DATA_DIR")
-    if env_dir:
-        return Path(env_dir).resolve()
-    # prefer /data inside containers when volume is mounted
-    default_container_path = Path("/data")
-    if default_container_path.exists():
-        return default_container_path.resolve()
-    # local fallback
-    return Path(".data").resolve()
+    return Path(settings.DATA_DIR).resolve()
 
 def get_job_dirs(job_id: str) -> JobDirs:
     """
@@ -64,3 +225,9 @@ def get_job_dirs(job_id: str) -> JobDirs:
         p.mkdir(parents=True, exist_ok=True)
 
     return JobDirs(base=base, di_results=di_results, output=output, tmp=tmp)
+
+def get_profiles_dir() -> Path:
+    """<DATA_ROOT>/profiles/, where per-request profiles are written."""
+    path = _resolve_data_root() / "profiles"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,113 @@
+# backend/app/core/logging_config.py
+"""
+Application logging: modules log through `logging.getLogger(__name__)` and
+setup_logging() routes every record through a QueueHandler, so the event
+loop only formats and enqueues; a QueueListener thread does the stdout I/O.
+
+The current job id (bind_job_id) is a context variable, so it follows the
+job's task, its child tasks and its asyncio.to_thread calls, and is added
+to every record logged on its behalf.
+
+    LOG_LEVEL=INFO
+    LOG_LEVELS=app.services=DEBUG,app.db.monitoring=WARNING,azure=WARNING
+    LOG_FORMAT=json        # one JSON object per line; "text" for humans
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator
+
+from app.core.config import settings
+
+job_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("job_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(job_id)s] %(message)s"
+# SDKs that log every HTTP request at INFO; LOG_LEVELS can turn them back up.
+DEFAULT_LEVELS = {"azure": "WARNING", "httpx": "WARNING", "openai": "WARNING"}
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "job_id"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+@contextmanager
+def bind_job_id(job_id: str) -> Iterator[None]:
+    """Tags records logged inside the block (and tasks/threads started from it) with job_id."""
+    token = job_id_var.set(job_id)
+    try:
+        yield
+    finally:
+        job_id_var.reset(token)
+
+class JobContextFilter(logging.Filter):
+    """Copies the job id from the logging call's context onto the record."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "job_id"):
+            record.job_id = job_id_var.get() or "-"
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        job_id = getattr(record, "job_id", "-")
+        if job_id != "-":
+            entry["job_id"] = job_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """"app.services=DEBUG, azure=WARNING" -> {"app.services": "DEBUG", "azure": "WARNING"}"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging() -> None:
+    """Installs the queue handler on the root logger; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    # QueueHandler.prepare() formats the record on the caller's side (message
+    # args may not be safe to read later from another thread), so the
+    # listener's handler only writes the finished line.
+    output = logging.StreamHandler(sys.stdout)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.setFormatter(formatter)
+    handler.addFilter(JobContextFilter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in {**DEFAULT_LEVELS, **parse_levels(settings.LOG_LEVELS)}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,168 @@
+# backend/app/core/metrics.py
+"""
+Process metrics in the Prometheus text exposition format, served by
+GET /metrics.
+
+The few counters this app needs do not warrant a client library: gauges and
+histograms below are plain in-process objects (each worker reports its own
+numbers, scraped per pod). MongoDB command latencies come from
+app.db.monitoring.command_listener and are rendered alongside.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from app.db.monitoring import LATENCY_BUCKETS_MS, command_listener
+
+# Upper bounds (seconds) of the job stage buckets; DI and AOAI calls take seconds to minutes.
+STAGE_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(labels[n] for n in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = STAGE_BUCKETS_S):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one open-ended), count, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, count, total) in series:
+            lines.extend(_histogram_lines(self.name, self.labelnames, key, self.buckets, counts, count, total))
+        return lines
+
+def _histogram_lines(name, labelnames, key, buckets, counts, count, total) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, n in zip(buckets, counts):
+        cumulative += n
+        le = 'le="%s"' % _number(bound)
+        lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+    inf = 'le="+Inf"'
+    lines.append(f"{name}_bucket{_format_labels(labelnames, key, inf)} {count}")
+    lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+    lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_number(round(total, 6))}")
+    return lines
+
+job_stage_seconds = Histogram("job_stage_seconds", "Duration of each job processing stage.", ["kind", "stage"])
+job_duration_seconds = Histogram("job_duration_seconds", "End-to-end job duration.", ["kind", "status"])
+jobs_in_flight = Gauge("jobs_in_flight", "Jobs currently being processed.", ["kind"])
+jobs_queued = Gauge("jobs_queued", "Jobs accepted but not started yet.", ["kind"])
+
+class StageTimer:
+    """
+    Wall-clock seconds per stage of one job. timings is stored on the job
+    record; every stage is also observed in job_stage_seconds.
+    """
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.timings: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, metric_stage: str | None = None) -> Iterator[None]:
+        """
+        Times the enclosed block as `name`. metric_stage overrides the metric
+        label, e.g. per-file "di:<file>" timings are all observed as "di_call".
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 4)
+            job_stage_seconds.observe(elapsed, kind=self.kind, stage=metric_stage or name)
+
+    def finish(self, status: str) -> float:
+        """Records the total under "total" and in job_duration_seconds."""
+        elapsed = time.perf_counter() - self._started
+        self.timings["total"] = round(elapsed, 4)
+        job_duration_seconds.observe(elapsed, kind=self.kind, status=status)
+        return elapsed
+
+def _executor_queue_depth() -> int | None:
+    # Work waiting for a thread of the default executor (asyncio.to_thread):
+    # DI calls, Excel parsing and storage I/O all queue here.
+    try:
+        executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    except RuntimeError:
+        return None
+    queue = getattr(executor, "_work_queue", None)
+    return queue.qsize() if queue is not None else None
+
+def _mongo_lines() -> List[str]:
+    name = "mongodb_command_duration_seconds"
+    lines = [f"# HELP {name} MongoDB command latency by collection and command.", f"# TYPE {name} histogram"]
+    buckets = [b / 1000.0 for b in LATENCY_BUCKETS_MS]
+    for (collection, command), counts, count, total_ms in command_listener.collect():
+        lines.extend(_histogram_lines(name, ("collection", "command"), (collection, command), buckets, counts, count, total_ms / 1000.0))
+    return lines
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (job_stage_seconds, job_duration_seconds, jobs_in_flight, jobs_queued):
+        lines.extend(metric.render())
+    depth = _executor_queue_depth()
+    if depth is not None:
+        lines += [
+            "# HELP executor_queue_depth Tasks waiting for a worker thread of the default executor.",
+            "# TYPE executor_queue_depth gauge",
+            f"executor_queue_depth {depth}",
+        ]
+    lines.extend(_mongo_lines())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,189 @@
+# backend/app/core/profiling.py
+"""
+Opt-in wall-clock sampling profiler for one asyncio task: a single request
+(X-Profile header, see ProfilingMiddleware) or a single value job
+(upload_polling?profile=true).
+
+A daemon thread wakes every PROFILING_INTERVAL_MS and records what the
+profiled task is doing:
+
+- when the task is running on the event loop, the loop thread's Python
+  stack (from the profiled call down);
+- otherwise, the chain of coroutines it is suspended in, ending in
+  "[await]" - so time spent waiting on DI, AOAI or a worker thread shows up
+  under the call that awaited it.
+
+Samples are written as collapsed stacks ("frame;frame;frame count" per
+line), which speedscope and flamegraph.pl open directly. Nothing is
+installed unless PROFILING_ENABLED is set with a PROFILING_ADMIN_TOKEN, so
+there is no cost otherwise.
+"""
+import asyncio
+import hmac
+import logging
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Awaitable, List, TypeVar
+
+from app.core.config import PLACEHOLDER_SECRETS, settings
+from app.core.job_manager import _resolve_data_root, get_profiles_dir
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILENAME = "profile.collapsed"
+AWAIT_MARKER = "[await]"
+
+T = TypeVar("T")
+
+def profiling_configured() -> bool:
+    """PROFILING_ENABLED with a real PROFILING_ADMIN_TOKEN (not empty, not a placeholder)."""
+    token = settings.PROFILING_ADMIN_TOKEN
+    return bool(settings.PROFILING_ENABLED and token and token.strip().lower() not in PLACEHOLDER_SECRETS)
+
+def profiling_allowed(admin_token: str | None) -> bool:
+    """Whether profiling is configured and admin_token matches PROFILING_ADMIN_TOKEN."""
+    expected = settings.PROFILING_ADMIN_TOKEN
+    if not profiling_configured() or not admin_token:
+        return False
+    return hmac.compare_digest(admin_token.encode("utf-8"), expected.encode("utf-8"))
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = code.co_filename.replace(os.sep, "/")
+    short = "/".join(path.split("/")[-2:])
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+class TaskProfiler:
+    """Samples the asyncio task that calls start() until stop() is called."""
+    def __init__(self, interval_ms: float | None = None):
+        self.interval = (settings.PROFILING_INTERVAL_MS if interval_ms is None else interval_ms) / 1000.0
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread_id = threading.get_ident()
+        # Stacks start at the caller (e.g. the middleware or process_files),
+        # not at the server's per-connection coroutine.
+        self._root_code = sys._getframe(1).f_code
+        self._thread = threading.Thread(target=self._run, name="task-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                stack = self._sample()
+            except Exception:  # the task's frames can change under us; skip the sample
+                continue
+            if stack:
+                self.samples[";".join(stack)] += 1
+
+    def _sample(self) -> List[str]:
+        if self._task.done():
+            return []
+        if asyncio.current_task(self._loop) is self._task:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if frame.f_code is self._root_code:
+                    break
+                frame = frame.f_back
+            stack.reverse()
+            return stack
+        # Suspended: follow the await chain from the task's coroutine down.
+        stack = []
+        awaitable = self._task.get_coro()
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                break
+            if frame.f_code is self._root_code:
+                stack.clear()
+            stack.append(_frame_label(frame))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        stack.append(AWAIT_MARKER)
+        return stack
+
+def job_profile_path(job_dir: Path) -> Path:
+    return job_dir / PROFILE_FILENAME
+
+def request_profile_path(profile_id: str) -> Path:
+    return get_profiles_dir() / f"{profile_id}.collapsed"
+
+def find_profile(profile_id: str) -> Path | None:
+    """The profile of a job (by job id) or of a request (by X-Profile-Id)."""
+    try:
+        uuid.UUID(profile_id)  # both kinds of id are UUIDs; also rules out path tricks
+    except ValueError:
+        return None
+    for path in (_resolve_data_root() / "jobs" / profile_id / PROFILE_FILENAME, request_profile_path(profile_id)):
+        if path.is_file():
+            return path
+    return None
+
+async def profile_call(path: Path, awaitable: Awaitable[T]) -> T:
+    """Awaits `awaitable` under a TaskProfiler and writes the profile to path."""
+    profiler = TaskProfiler()
+    profiler.start()
+    try:
+        return await awaitable
+    finally:
+        profiler.stop()
+        profiler.write(path)
+        logger.info("Profile: %d samples -> %s", sum(profiler.samples.values()), path)
+
+class ProfilingMiddleware:
+    """
+    Profiles requests sent with `X-Profile: 1` and a valid X-Admin-Token; the
+    response carries X-Profile-Id, the id to fetch from /api/admin/profiles.
+    Only added when profiling_configured() (see main.py).
+
+    A plain ASGI middleware, so async endpoints run in the profiled task.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile") not in (b"1", b"true") or not profiling_allowed(
+            headers.get(b"x-admin-token", b"").decode("latin-1")
+        ):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode("ascii"))]
+            await send(message)
+
+        profiler = TaskProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            path = profiler.write(request_profile_path(profile_id))
+            logger.info("Profile of %s %s: %d samples -> %s", scope.get("method"), scope.get("path"), sum(profiler.samples.values()), path)
@@ -1,45 +1,328 @@
 import aiofiles
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import threading
+import time
 import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator, List
 from fastapi import UploadFile
-from typing import Dict, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
 
 from .config import settings
+from .storage_backends import StorageBackend, LocalStorageBackend, create_storage_backend
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-download_registry: Dict[str, Path] = {}
+@dataclass(frozen=True)
+class StoredUpload:
+    """An uploaded file: a per-upload reference path plus the content digest."""
+    path: Path
+    digest: str
+    size: int
+    filename: str
 
 class StorageService:
-    def __init__(self, base_dir: str):
+    """
+    File storage for uploads and job artifacts.
+
+    Uploads are content-addressed: the bytes live once under
+    blobs/<aa>/<sha256>, and every upload gets a hard link in uploads/ named
+    "<uuid>_<original filename>". The link count of a blob is its reference count.
+    Linking and releasing a blob hold a lock on its digest prefix (a file lock
+    under locks/, so workers sharing DATA_DIR are serialized too).
+
+    Working copies always live under base_dir. With a remote backend (S3),
+    blobs and downloadable artifacts are also persisted there under the same
+    relative key, so any node can serve them.
+    """
+    def __init__(
+        self,
+        base_dir: str,
+        token_secret: str | None = None,
+        token_ttl_seconds: int = settings.DOWNLOAD_TOKEN_TTL_SECONDS,
+        backend: StorageBackend | None = None,
+    ):
         self.base_dir = Path(base_dir)
-        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.backend = backend or LocalStorageBackend(self.base_dir)
+        self.blobs_dir = self.base_dir / "blobs"
+        self.uploads_dir = self.base_dir / "uploads"
+        self.tmp_dir = self.base_dir / "tmp"
+        self.locks_dir = self.base_dir / "locks"
+        for p in (self.base_dir, self.blobs_dir, self.uploads_dir, self.tmp_dir, self.locks_dir):
+            p.mkdir(parents=True, exist_ok=True)
+        self._blob_thread_lock = threading.Lock()
+        self.token_ttl_seconds = token_ttl_seconds
+        self._token_key = token_secret.encode("utf-8") if token_secret else None
+
+    async def save_upload(self, file: UploadFile, guard: Callable[[bytes], None] | None = None) -> StoredUpload:
+        """
+        Streams an upload to disk while hashing it, then stores it under its
+        SHA-256 digest. Identical content is only kept once.
 
-    async def save_upload(self, file: UploadFile) -> Path:
-        safe_filename = f"{uuid.uuid4()}_{file.filename}"
-        file_path = self.base_dir / safe_filename
-        
+        guard, if given, is called with every chunk before it is written and
+        with b"" at end of file; an exception from it aborts the save and
+        removes the partial file.
+        """
+        filename = Path(file.filename or "upload").name
+        tmp_path = self.tmp_dir / f"{uuid.uuid4()}.part"
+        ref_path = self.uploads_dir / f"{uuid.uuid4()}_{filename}"
+        hasher = hashlib.sha256()
+        size = 0
+
+        upload: StoredUpload | None = None
         try:
-            async with aiofiles.open(file_path, 'wb') as out_file:
-                while content := await file.read(1024 * 1024):
+            async with aiofiles.open(tmp_path, 'wb') as out_file:
+                while content := await file.read(UPLOAD_CHUNK_SIZE):
+                    if guard:
+                        guard(content)
+                    hasher.update(content)
+                    size += len(content)
                     await out_file.write(content)
-        finally:
+            if guard:
+                guard(b"")
+            digest = hasher.hexdigest()
+            self._link_blob(tmp_path, digest, ref_path)
+            # Drop the temp link now so it is not counted as a blob reference.
+            tmp_path.unlink(missing_ok=True)
+            upload = StoredUpload(path=ref_path, digest=digest, size=size, filename=filename)
+            if self.backend.is_remote:
+                await asyncio.to_thread(self._persist_blob, digest, ref_path)
             await file.close()
-            
-        return file_path
+        except BaseException:
+            # Failed or cancelled (e.g. by save_uploads): leave nothing behind.
+            if upload is not None:
+                self.release_upload(upload)
+            file.file.close()
+            raise
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        return upload
+
+    async def save_uploads(
+        self,
+        files: List[UploadFile],
+        guard_factory: Callable[[UploadFile], Callable[[bytes], None]] | None = None,
+    ) -> List[StoredUpload]:
+        """
+        Saves several uploads concurrently, in input order. If any save fails,
+        the others are cancelled, completed ones are released, and the first
+        error is raised.
+        """
+        tasks = [
+            asyncio.create_task(self.save_upload(f, guard_factory(f) if guard_factory else None))
+            for f in files
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, StoredUpload):
+                    self.release_upload(result)
+            raise
+
+    def release_upload(self, upload: StoredUpload) -> None:
+        """
+        Drops one reference to an upload; the blob is removed with its last
+        reference, from the remote backend too. Blocking (it may call the
+        backend): async code should use release_uploads.
+        """
+        blob_path = self.blob_path(upload.digest)
+        # Under the lock, a concurrent _link_blob cannot add a reference
+        # between the link count check and the unlinks.
+        with self._blob_lock(upload.digest):
+            upload.path.unlink(missing_ok=True)
+            try:
+                if blob_path.stat().st_nlink > 1:
+                    return
+                blob_path.unlink()
+            except FileNotFoundError:
+                # No local blob (e.g. copies on a filesystem without hard
+                # links): the reference count is unknown, keep the remote copy.
+                return
+            if self.backend.is_remote:
+                self.backend.delete(self._relative_key(blob_path))
+
+    async def release_uploads(self, uploads: List[StoredUpload]) -> None:
+        """release_upload for each upload, off the event loop."""
+        def release_all():
+            for upload in uploads:
+                self.release_upload(upload)
+        await asyncio.to_thread(release_all)
+
+    def ref_count(self, digest: str) -> int:
+        """Returns how many uploads currently reference the blob with this digest."""
+        try:
+            return self.blob_path(digest).stat().st_nlink - 1
+        except FileNotFoundError:
+            return 0
 
-    def make_downloadable(self, file_path: Path) -> str:
-        file_id = str(uuid.uuid4())
-        download_registry[file_id] = file_path
-        return f"/api/download/{file_id}"
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+
+    def _persist_blob(self, digest: str, local_path: Path) -> None:
+        key = self._relative_key(self.blob_path(digest))
+        if not self.backend.exists(key):
+            self.backend.put_file(key, local_path)
+
+    @contextmanager
+    def _blob_lock(self, digest: str) -> Iterator[None]:
+        """Serializes link/release of blobs sharing digest's two-character prefix."""
+        with self._blob_thread_lock, open(self.locks_dir / f"blobs-{digest[:2]}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+            yield
+
+    def _link_blob(self, tmp_path: Path, digest: str, ref_path: Path) -> None:
+        blob_path = self.blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._blob_lock(digest):
+            try:
+                try:
+                    os.link(tmp_path, blob_path)
+                except FileExistsError:
+                    pass
+                os.link(blob_path, ref_path)
+                return
+            except OSError:
+                # The filesystem does not support hard links: keep a private copy.
+                pass
+        shutil.copyfile(tmp_path, ref_path)
+
+    async def make_downloadable(self, file_path: Path) -> str:
+        """
+        Returns a download URL carrying a signed, expiring token for file_path.
+        The token encodes the file location relative to base_dir, so any worker
+        sharing the same DATA_DIR (or remote backend) and secret can resolve it
+        without shared state.
+        """
+        key = self._relative_key(file_path)
+        if self.backend.is_remote:
+            await asyncio.to_thread(self.backend.put_file, key, Path(file_path))
+        payload = json.dumps({"k": key, "exp": int(time.time()) + self.token_ttl_seconds}, separators=(",", ":"))
+        payload_b64 = _b64encode(payload.encode("utf-8"))
+        return f"/api/download/{payload_b64}.{self._sign(payload_b64)}"
 
     def resolve_download_path(self, file_id: str) -> Path | None:
-        return download_registry.get(file_id)
+        """Verifies a download token and returns the local path it points to, or None."""
+        key = self.resolve_download_key(file_id)
+        return self.local_path(key) if key else None
+
+    def resolve_download_key(self, file_id: str) -> str | None:
+        """Verifies a download token and returns the storage key it points to, or None."""
+        payload_b64, _, signature = file_id.partition(".")
+        if not payload_b64 or not signature:
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload_b64)):
+            return None
+
+        try:
+            payload = json.loads(_b64decode(payload_b64))
+            key, expires_at = payload["k"], int(payload["exp"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        if expires_at < time.time() or not isinstance(key, str):
+            return None
+        return key if self.local_path(key) else None
+
+    def local_path(self, key: str) -> Path | None:
+        """Maps a storage key to its working-copy path, rejecting keys that escape base_dir."""
+        file_path = (self.base_dir / key).resolve()
+        if not file_path.is_relative_to(self.base_dir.resolve()):
+            return None
+        return file_path
 
-    async def read_file_bytes(self, file_path: Path) -> bytes:
+    async def ensure_local(self, key: str) -> Path | None:
+        """Returns a local working copy of key, fetching it from the backend when missing."""
+        file_path = self.local_path(key)
+        if file_path is None:
+            return None
+        if not file_path.exists() and self.backend.is_remote:
+            if not await asyncio.to_thread(self.backend.exists, key):
+                return None
+            tmp_path = self.tmp_dir / f"{uuid.uuid4()}.part"
+            try:
+                await asyncio.to_thread(self.backend.download_file, key, tmp_path)
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, file_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        return file_path if file_path.exists() else None
+
+    async def presigned_url(self, key: str) -> str | None:
+        """Returns a direct backend download URL for key, when the backend supports one."""
+        if not self.backend.is_remote:
+            return None
+        return await asyncio.to_thread(self.backend.presigned_url, key, Path(key).name)
+
+    async def read_file_bytes(self, file_path: Path, start: int = 0, end: int | None = None) -> bytes:
         """
         Reads the content of a file as bytes asynchronously.
+        start/end select the byte range [start, end); the backend is used when
+        there is no local working copy.
         """
+        file_path = Path(file_path)
+        if not file_path.exists() and self.backend.is_remote:
+            return await asyncio.to_thread(self.backend.read_range, self._relative_key(file_path), start, end)
+
         async with aiofiles.open(file_path, 'rb') as f:
-            content = await f.read()
+            await f.seek(start)
+            content = await f.read() if end is None else await f.read(max(end - start, 0))
         return content
 
-storage_service = StorageService(settings.DATA_DIR)
+    def _relative_key(self, file_path: Path) -> str:
+        try:
+            return Path(file_path).resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            raise ValueError(f"File '{file_path}' is outside the storage root '{self.base_dir}'.")
+
+    def _sign(self, payload_b64: str) -> str:
+        digest = hmac.new(self._get_token_key(), payload_b64.encode("ascii"), hashlib.sha256).digest()
+        return _b64encode(digest)
+
+    def _get_token_key(self) -> bytes:
+        """
+        Returns the HMAC key. Without a configured secret, a random key is created
+        once under base_dir; os.link makes the creation atomic across workers.
+        """
+        if self._token_key is None:
+            key_path = self.base_dir / ".download_token_key"
+            if not key_path.exists():
+                tmp_path = self.base_dir / f".download_token_key.{uuid.uuid4()}"
+                tmp_path.write_text(secrets.token_hex(32), encoding="utf-8")
+                try:
+                    os.link(tmp_path, key_path)
+                except FileExistsError:
+                    pass
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+            self._token_key = key_path.read_text(encoding="utf-8").strip().encode("utf-8")
+        return self._token_key
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+storage_service = StorageService(
+    settings.DATA_DIR,
+    token_secret=settings.DOWNLOAD_TOKEN_SECRET,
+    backend=create_storage_backend(settings, Path(settings.DATA_DIR)),
+)
@@ -0,0 +1,156 @@
+# backend/app/core/storage_backends.py
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from urllib.parse import quote
+
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+class StorageBackend:
+    """
+    Where uploads and artifacts are persisted, addressed by a relative key
+    (e.g. "blobs/ab/abcd..." or "jobs/<job_id>/output/summary.xlsx").
+
+    The working copy of every file always lives under DATA_DIR; a remote
+    backend additionally keeps the durable copy so any node can serve it.
+    """
+    is_remote = False
+
+    def put_file(self, key: str, local_path: Path) -> None:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def read_range(self, key: str, start: int = 0, end: int | None = None) -> bytes:
+        """Reads bytes [start, end) of the object; end=None reads to the end."""
+        raise NotImplementedError
+
+    def download_file(self, key: str, local_path: Path) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Removes the object; a missing key is not an error."""
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, filename: str | None = None) -> str | None:
+        """Returns a time-limited URL clients can download from directly, if supported."""
+        return None
+
+class LocalStorageBackend(StorageBackend):
+    """Keeps everything under base_dir; the working copy is the durable copy."""
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+
+    def put_file(self, key: str, local_path: Path) -> None:
+        target = self.base_dir / key
+        if Path(local_path).resolve() != target.resolve():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(local_path, target)
+
+    def exists(self, key: str) -> bool:
+        return (self.base_dir / key).exists()
+
+    def read_range(self, key: str, start: int = 0, end: int | None = None) -> bytes:
+        with open(self.base_dir / key, "rb") as f:
+            f.seek(start)
+            return f.read() if end is None else f.read(max(end - start, 0))
+
+    def download_file(self, key: str, local_path: Path) -> None:
+        source = self.base_dir / key
+        if source.resolve() != Path(local_path).resolve():
+            Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, local_path)
+
+    def delete(self, key: str) -> None:
+        (self.base_dir / key).unlink(missing_ok=True)
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3-compatible object storage (AWS S3, MinIO, ...). Large files are sent as
+    multipart uploads streamed from disk; reads can be ranged.
+    """
+    is_remote = True
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+        region: str | None = None,
+        key_prefix: str = "",
+        presigned_url_ttl_seconds: int = 900,
+        client=None,
+    ):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+        except ImportError as e:
+            raise RuntimeError("S3 storage requires the 'boto3' package (pip install boto3).") from e
+
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+        self.presigned_url_ttl_seconds = presigned_url_ttl_seconds
+        self.client = client or boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            region_name=region,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=MULTIPART_CHUNK_SIZE,
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def put_file(self, key: str, local_path: Path) -> None:
+        self.client.upload_file(str(local_path), self.bucket, self._object_key(key), Config=self.transfer_config)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def read_range(self, key: str, start: int = 0, end: int | None = None) -> bytes:
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+        rsp = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key), Range=byte_range)
+        return rsp["Body"].read()
+
+    def download_file(self, key: str, local_path: Path) -> None:
+        Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+        self.client.download_file(self.bucket, self._object_key(key), str(local_path), Config=self.transfer_config)
+
+    def delete(self, key: str) -> None:
+        # DeleteObject succeeds for keys that do not exist.
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def presigned_url(self, key: str, filename: str | None = None) -> str | None:
+        params = {"Bucket": self.bucket, "Key": self._object_key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.presigned_url_ttl_seconds)
+
+def create_storage_backend(settings, base_dir: Path) -> StorageBackend:
+    """Uses S3 when S3_BUCKET_NAME is configured, local disk otherwise."""
+    if settings.S3_BUCKET_NAME:
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET_NAME,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            region=settings.S3_REGION,
+            key_prefix=settings.S3_KEY_PREFIX,
+            presigned_url_ttl_seconds=settings.S3_PRESIGNED_URL_TTL_SECONDS,
+        )
+    return LocalStorageBackend(base_dir)
@@ -1,23 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Dict
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import ConnectionFailure, OperationFailure
 from app.core.config import settings
+from app.db.monitoring import command_listener
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts when MongoDB cannot be reached (e.g. not up yet)
+INDEX_RETRY_SECONDS = 5.0
 
 class MongoClient:
     client: AsyncIOMotorClient = None
     db: AsyncIOMotorDatabase = None
+    # Background ensure_indexes() run started by connect_to_mongo
+    index_task: asyncio.Task | None = None
 
 mongo_client = MongoClient()
 
-async def connect_to_mongo():
-    mongo_client.client = AsyncIOMotorClient(settings.MONGODB_URI)
+def client_options() -> Dict[str, Any]:
+    """Pool, compression and monitoring options for the Motor client, from Settings."""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "event_listeners": [command_listener],
+    }
+    if settings.MONGODB_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    compressors = [c.strip() for c in settings.MONGODB_COMPRESSORS.split(",") if c.strip()]
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+async def connect_to_mongo(wait_for_indexes: bool = False):
+    """
+    Creates the client (Motor connects lazily, so this does not block) and
+    builds the indexes in the background; the app starts serving right away
+    and /api/health/ready reports when the indexes are in place. Scripts that
+    write in bulk pass wait_for_indexes=True.
+    """
+    mongo_client.client = AsyncIOMotorClient(settings.MONGODB_URI, **client_options())
     mongo_client.db = mongo_client.client[settings.MONGODB_DB]
-    print("Connected to MongoDB.")
-    await ensure_indexes()
+    command_listener.bind(mongo_client.db, asyncio.get_running_loop())
+    logger.info("Connected to MongoDB.")
+    mongo_client.index_task = asyncio.create_task(_ensure_indexes_until_done())
+    if wait_for_indexes:
+        await mongo_client.index_task
+
+async def _ensure_indexes_until_done():
+    """
+    Retries while MongoDB is unreachable. A command the server rejects (an
+    index option conflict, duplicate partNo values for the unique index)
+    will not fix itself, so it is logged and the task fails; the app then
+    stays not-ready until the data or settings are fixed and it restarts.
+    """
+    while True:
+        try:
+            await ensure_indexes()
+            return
+        except ConnectionFailure as e:
+            logger.warning("Could not reach MongoDB to ensure indexes, retrying in %.0fs: %s", INDEX_RETRY_SECONDS, e)
+            await asyncio.sleep(INDEX_RETRY_SECONDS)
+        except OperationFailure as e:
+            logger.error("Building MongoDB indexes failed, not retrying: %s", e)
+            raise
+
+def indexes_ready() -> bool:
+    task = mongo_client.index_task
+    return task is not None and task.done() and not task.cancelled() and task.exception() is None
+
+def index_error() -> str | None:
+    """Why the background index build failed, if it did."""
+    task = mongo_client.index_task
+    if task is None or not task.done() or task.cancelled() or task.exception() is None:
+        return None
+    return str(task.exception())
+
+async def wait_for_indexes(timeout: float | None = None) -> bool:
+    """Waits for the background index build; returns whether it finished."""
+    task = mongo_client.index_task
+    if task is None:
+        return False
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        return False
+    except OperationFailure:
+        return False
+    return indexes_ready()
 
 async def ensure_indexes():
     # parts collection indexes
     parts_collection = mongo_client.db["parts"]
     await parts_collection.create_index("partNo", unique=True)
     await parts_collection.create_index("specs.key")
+    # Parts listing filters on spec key + review status
+    await parts_collection.create_index([("specs.key", 1), ("specs.status", 1)])
+    await parts_collection.create_index("specs.status")
     # For specs.aliases, MongoDB can index array elements directly
     await parts_collection.create_index("specs.aliases")
 
@@ -25,12 +105,33 @@ async def ensure_indexes():
     field_aliases_collection = mongo_client.db["field_aliases"]
     await field_aliases_collection.create_index("canonical", unique=True) # Ensure canonical is unique
     await field_aliases_collection.create_index("aliases")
-    print("MongoDB indexes ensured.")
+
+    # Shared job records expire with the in-memory registry's TTL.
+    if settings.JOB_STORE == "mongo":
+        await ensure_ttl_index(mongo_client.db, "jobs", "updatedAt", settings.JOB_TTL_SECONDS)
+    logger.info("MongoDB indexes ensured.")
+
+async def ensure_ttl_index(db: AsyncIOMotorDatabase, collection_name: str, field: str, seconds: int):
+    """
+    Creates a TTL index on `field`, or changes the TTL of the existing one
+    with collMod: create_index with a new expireAfterSeconds would fail with
+    IndexOptionsConflict once JOB_TTL_SECONDS changes.
+    """
+    collection = db[collection_name]
+    indexes = await collection.index_information()
+    existing = next((info for info in indexes.values() if info.get("key") == [(field, 1)]), None)
+    if existing is None:
+        await collection.create_index(field, expireAfterSeconds=seconds)
+    elif existing.get("expireAfterSeconds") != seconds:
+        await db.command("collMod", collection_name, index={"keyPattern": {field: 1}, "expireAfterSeconds": seconds})
+        logger.info("Changed TTL of %s.%s to %ss.", collection_name, field, seconds)
 
 async def close_mongo_connection():
+    if mongo_client.index_task is not None and not mongo_client.index_task.done():
+        mongo_client.index_task.cancel()
     if mongo_client.client:
         mongo_client.client.close()
-        print("MongoDB connection closed.")
+        logger.info("MongoDB connection closed.")
 
 def get_client() -> AsyncIOMotorClient:
     return mongo_client.client
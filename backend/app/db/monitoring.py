@@ -0,0 +1,151 @@
+# backend/app/db/monitoring.py
+"""
+MongoDB command instrumentation.
+
+CommandLatencyListener is registered on the Motor client (see
+connect_to_mongo) and records a latency histogram per (collection,
+command). Commands slower than MONGODB_SLOW_MS are logged, and for reads
+an `explain` of the same command is run in the background so the log line
+says which plan (index scan or collection scan) was used.
+"""
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Session/driver fields that must not be passed back into explain
+_DRIVER_FIELDS = {"$db", "lsid", "$clusterTime", "txnNumber", "$readPreference", "$readConcern", "autocommit", "startTransaction"}
+EXPLAIN_INTERVAL_SECONDS = 60.0
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float, failed: bool = False) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.failures += failed
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+def summarize_plan(plan: Dict[str, Any]) -> str:
+    """Flattens a winningPlan into "IXSCAN(partNo_1) <- FETCH <- LIMIT" style text."""
+    stages: List[str] = []
+    # The slot-based engine wraps the classic stage tree in "queryPlan"
+    node = plan.get("queryPlan", plan)
+    while isinstance(node, dict) and node.get("stage"):
+        index = node.get("indexName")
+        stages.append(f"{node['stage']}({index})" if index else node["stage"])
+        node = node.get("inputStage") or (node.get("inputStages") or [None])[0]
+    return " <- ".join(reversed(stages)) or "unknown"
+
+class CommandLatencyListener(monitoring.CommandListener):
+    """
+    pymongo calls these hooks from driver threads, so state is guarded by a
+    lock and explains are handed to the event loop that owns the client.
+    """
+    def __init__(self, slow_ms: float | None = None, explain_slow: bool | None = None):
+        self.slow_ms = settings.MONGODB_SLOW_MS if slow_ms is None else slow_ms
+        self.explain_slow = settings.MONGODB_EXPLAIN_SLOW if explain_slow is None else explain_slow
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._inflight: Dict[Tuple[Any, int], Tuple[str, str, Dict[str, Any] | None]] = {}
+        self._last_explained: Dict[Tuple[str, str], float] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._db = None
+
+    def bind(self, db, loop: asyncio.AbstractEventLoop) -> None:
+        """Sets the database and loop used to run explains of slow commands."""
+        self._db = db
+        self._loop = loop
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        name = event.command_name
+        collection = event.command.get(name)
+        if not isinstance(collection, str):  # e.g. getMore carries the cursor id
+            collection = event.command.get("collection", "-")
+        command = None
+        if self.explain_slow and name in EXPLAINABLE_COMMANDS:
+            command = {k: v for k, v in event.command.items() if k not in _DRIVER_FIELDS}
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = (collection, name, command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Histograms keyed by "collection.command"."""
+        with self._lock:
+            return {f"{c}.{op}": h.snapshot() for (c, op), h in sorted(self._histograms.items())}
+
+    def collect(self) -> List[Tuple[Tuple[str, str], List[int], int, float]]:
+        """((collection, command), bucket counts, count, total ms) per histogram, for /metrics."""
+        with self._lock:
+            return [(key, list(h.buckets), h.count, h.total_ms) for key, h in sorted(self._histograms.items())]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def _finish(self, event, failed: bool) -> None:
+        duration_ms = event.duration_micros / 1000.0
+        with self._lock:
+            collection, name, command = self._inflight.pop(
+                (event.connection_id, event.request_id), ("-", event.command_name, None)
+            )
+            key = (collection, name)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(duration_ms, failed)
+
+            explain = False
+            if duration_ms >= self.slow_ms and command is not None:
+                now = time.monotonic()
+                if now - self._last_explained.get(key, float("-inf")) >= EXPLAIN_INTERVAL_SECONDS:
+                    self._last_explained[key] = now
+                    explain = True
+
+        if duration_ms < self.slow_ms or name == "explain":
+            return
+        logger.warning("[SLOW MONGO] %s.%s took %.1f ms%s", collection, name, duration_ms, " (failed)" if failed else "")
+        if explain and self._db is not None and self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._explain(collection, name, command), self._loop)
+
+    async def _explain(self, collection: str, name: str, command: Dict[str, Any]) -> None:
+        try:
+            result = await self._db.command({"explain": command, "verbosity": "queryPlanner"})
+            plan = result.get("queryPlanner", {}).get("winningPlan", {})
+            logger.warning("[SLOW MONGO] %s.%s plan: %s", collection, name, summarize_plan(plan))
+        except Exception as e:
+            logger.warning("[SLOW MONGO] explain of %s.%s failed: %s", collection, name, e)
+
+command_listener = CommandLatencyListener()
@@ -1,12 +1,22 @@
+import asyncio
+import logging
 import os
 from pathlib import Path
 from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.routers import alt, value, download, parts, aliases
-from app.db.mongo import connect_to_mongo, close_mongo_connection, ping_mongodb
+from app.core.logging_config import setup_logging
+from app.core.metrics import render_metrics
+from app.core.profiling import ProfilingMiddleware, profiling_configured
+from app.routers import alt, value, download, parts, aliases, admin
+from app.db.mongo import connect_to_mongo, close_mongo_connection, ping_mongodb, get_db, index_error, indexes_ready
+from app.db.monitoring import command_listener
+from app.services.alias_cache import alias_cache
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Ensure DATA_DIR exists
 os.makedirs(settings.DATA_DIR, exist_ok=True)
@@ -17,14 +27,30 @@ app = FastAPI(
     version="1.0.0",
 )
 
+async def preload_alias_cache():
+    try:
+        await alias_cache.refresh(get_db())
+    except Exception as e:
+        # resolve() loads the table on first use instead
+        logger.warning("Could not preload field aliases: %s", e)
+
 @app.on_event("startup")
 async def startup_event():
+    # Nothing here waits on MongoDB: indexes are built and the alias table is
+    # loaded in the background, so a worker accepts requests as soon as it boots.
     await connect_to_mongo()
+    app.state.alias_preload = asyncio.create_task(preload_alias_cache())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_mongo_connection()
 
+# Profiling is opt-in per request; when disabled the middleware is not installed at all.
+if profiling_configured():
+    app.add_middleware(ProfilingMiddleware)
+elif settings.PROFILING_ENABLED:
+    logger.warning("PROFILING_ENABLED is set without PROFILING_ADMIN_TOKEN; profiling stays off.")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.FRONTEND_ORIGIN],
@@ -39,6 +65,7 @@ app.include_router(value.router, prefix="/api/value", tags=["value"])
 app.include_router(download.router, prefix="/api/download", tags=["download"])
 app.include_router(parts.router, prefix="/api/parts", tags=["parts"])
 app.include_router(aliases.router, prefix="/api/aliases", tags=["aliases"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/api/health", tags=["Health Check"])
 def health_check():
@@ -48,6 +75,24 @@ def health_check():
 async def db_health_check():
     return await ping_mongodb()
 
+@app.get("/api/health/ready", tags=["Health Check"])
+def readiness_check():
+    """503 until the background MongoDB index build has finished (with the error if it failed)."""
+    if indexes_ready():
+        return JSONResponse({"ready": True})
+    error = index_error()
+    return JSONResponse({"ready": False, **({"error": error} if error else {})}, status_code=503)
+
+@app.get("/api/health/db/latency", tags=["Health Check"])
+def db_latency():
+    """Per collection/command MongoDB latency histograms since startup."""
+    return command_listener.snapshot()
+
+@app.get("/metrics", tags=["Health Check"], response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: job stage/duration histograms, in-flight and queued jobs, MongoDB latencies."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # SPA static files
 STATIC_DIR = (Path(__file__).resolve().parent.parent / "static")
 
@@ -28,6 +28,31 @@ class PatchSpecsResponse(BaseModel):
     updated_specs: List[UpdatedSpecResponse]
     unresolved_aliases: List[str] = []
 
+class BulkPatchPartItem(BaseModel):
+    partNo: str
+    items: List[SpecUpdateItem]
+
+class BulkPatchSpecsRequest(BaseModel):
+    parts: List[BulkPatchPartItem]
+    actor: str
+
+class BulkPatchSpecsResult(PatchSpecsResponse):
+    partNo: str
+
+class BulkPatchSpecsResponse(BaseModel):
+    results: List[BulkPatchSpecsResult]
+
+class PartListItem(BaseModel):
+    partNo: str
+    manufacturer: str | None = None
+    createdAt: datetime | None = None
+    updatedAt: datetime | None = None
+    specs: List[Dict[str, Any]] | None = None # only the projected spec fields
+
+class PartListResponse(BaseModel):
+    items: List[PartListItem]
+    next_cursor: str | None = None # pass as ?cursor= to get the next page
+
 class MarkIncorrectRequest(BaseModel):
     keysOrAliases: List[str]
     note: str | None = None
@@ -37,9 +62,19 @@ class MarkIncorrectRequest(BaseModel):
 
 class ResolveAliasesRequest(BaseModel):
     keys: List[str]
+    fuzzy: bool = False # fall back to the closest alias for unknown keys
 
 class ResolveAliasesResponse(BaseModel):
-    mappings: Dict[str, str] # candidate -> canonical
+    mappings: Dict[str, str | None] # candidate -> canonical (None if unresolved)
+
+class AliasSuggestion(BaseModel):
+    canonical: str
+    alias: str
+    score: float
+
+class SuggestAliasesResponse(BaseModel):
+    query: str
+    suggestions: List[AliasSuggestion]
 
 class BatchUpsertAliasItem(BaseModel):
     canonical: str
@@ -1,6 +1,6 @@
 # backend/app/models/schemas.py
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List
 from datetime import datetime
 
 # --- Core Data Models ---
@@ -18,9 +18,11 @@ class JobResponse(BaseModel):
 
 class ValueResultResponse(BaseModel):
     status: str
-    download_url: str | None
+    download_url: str | None = None
     query_fields: List[str] | None = None
     query_targets: List[str] | None = None
+    exports: Dict[str, str] | None = None # format ("ndjson", "parquet") -> download URL
+    timings: Dict[str, float] | None = None # stage -> seconds, e.g. {"excel_parse": 0.2, "aoai": 41.7, "total": 63.0}
 
 class SSEProgress(BaseModel):
     percent: int
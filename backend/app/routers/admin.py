@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.profiling import find_profile, profiling_allowed, profiling_configured
+
+router = APIRouter()
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_admin_token: str | None = Header(None)):
+    """
+    Collapsed-stack profile of a job (profile_id = job_id) or of a request
+    (profile_id = its X-Profile-Id response header). Open it in speedscope.
+    """
+    if not profiling_configured():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not profiling_allowed(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="無權限下載效能分析")
+    path = find_profile(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="找不到效能分析檔")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from typing import List, Dict
 
 from app.services.aliases_repo import AliasesRepository
@@ -15,9 +15,22 @@ async def resolve_aliases(
     request: api_schemas.ResolveAliasesRequest,
     aliases_repo: AliasesRepository = Depends(get_aliases_repo)
 ):
-    mappings = await aliases_repo.resolve(request.keys)
+    mappings = await aliases_repo.resolve(request.keys, fuzzy=request.fuzzy)
     return api_schemas.ResolveAliasesResponse(mappings=mappings)
 
+@router.get("/suggest", response_model=api_schemas.SuggestAliasesResponse)
+async def suggest_aliases(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(5, ge=1, le=50),
+    min_score: float = Query(0.3, ge=0.0, le=1.0),
+    aliases_repo: AliasesRepository = Depends(get_aliases_repo)
+):
+    matches = await aliases_repo.suggest(q, limit=limit, min_score=min_score)
+    return api_schemas.SuggestAliasesResponse(
+        query=q,
+        suggestions=[api_schemas.AliasSuggestion(canonical=m.canonical, alias=m.alias, score=round(m.score, 4)) for m in matches]
+    )
+
 @router.post("/batch-upsert", status_code=204) # No content response
 async def batch_upsert_aliases(
     request: api_schemas.BatchUpsertAliasesRequest,
@@ -6,7 +6,7 @@ from app.core.config import settings
 from app.core.storage import storage_service
 from app.services.alt_service import AltService
 from app.models.schemas import JobResponse
-from app.utils.file_validation import validate_file
+from app.utils.file_validation import validate_file, UploadGuard
 
 router = APIRouter()
 alt_service = AltService()
@@ -16,18 +16,20 @@ async def upload_for_alt_search(file: UploadFile = File(...)):
     allowed_excel_exts = [ext.strip() for ext in settings.ALLOWED_EXCEL_EXTS.split(',')]
     validate_file(file, allowed_excel_exts, settings.MAX_FILE_SIZE_MB)
     
-    saved_path = await storage_service.save_upload(file)
+    saved_upload = await storage_service.save_upload(file, UploadGuard(settings).for_file(file))
     
     job_id = str(uuid.uuid4())
-    alt_service.register_job(job_id, saved_path)
+    alt_service.register_job(job_id, saved_upload)
     
     return {"job_id": job_id}
 
 @router.get("/stream/{job_id}")
 async def stream_alt_search_results(request: Request, job_id: str):
-    file_path = alt_service.get_job_filepath(job_id)
-    if not file_path:
+    emitter = alt_service.get_emitter(job_id)
+    if not emitter:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
-    event_generator = alt_service.process_file(request, file_path)
-    return EventSourceResponse(event_generator)
+    # Browsers send Last-Event-ID when they reconnect; resume from there
+    # instead of re-running the job.
+    event_generator = emitter.subscribe(request.headers.get("last-event-id"))
+    return EventSourceResponse(event_generator, ping=settings.SSE_HEARTBEAT_SECONDS)
@@ -1,40 +1,80 @@
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import FileResponse, HTMLResponse # Import HTMLResponse
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse # Import HTMLResponse
+from app.core.config import settings
 from app.core.storage import storage_service
+from app.services.preview_service import get_sheet_window
 from pathlib import Path
-import pandas as pd # Import pandas
 
 router = APIRouter()
 
+MEDIA_TYPES = {
+    ".ndjson": "application/x-ndjson",
+    ".parquet": "application/vnd.apache.parquet",
+}
+
 @router.get("/{file_id}")
 async def download_file(file_id: str):
-    file_path: Path | None = storage_service.resolve_download_path(file_id)
-    
+    key = storage_service.resolve_download_key(file_id)
+    if not key:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found or expired.")
+
+    file_path: Path | None = storage_service.local_path(key)
     if not file_path or not file_path.exists():
+        # Not on this node: hand the client a direct link to the object store.
+        presigned_url = await storage_service.presigned_url(key)
+        if presigned_url:
+            return RedirectResponse(presigned_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found or expired.")
         
     return FileResponse(
         path=file_path,
         filename=file_path.name,
-        media_type='application/octet-stream',
+        media_type=MEDIA_TYPES.get(file_path.suffix.lower(), 'application/octet-stream'),
         headers={"Content-Disposition": f"attachment; filename={file_path.name}"}
     )
 
-@router.get("/preview/{file_id}", response_class=HTMLResponse)
-async def preview_file(file_id: str):
-    file_path: Path | None = storage_service.resolve_download_path(file_id)
+async def _resolve_excel_for_preview(file_id: str) -> Path:
+    key = storage_service.resolve_download_key(file_id)
+    file_path: Path | None = await storage_service.ensure_local(key) if key else None
 
     if not file_path or not file_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found or expired.")
     
     if file_path.suffix.lower() not in ['.xlsx', '.xls']:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only Excel files can be previewed.")
+    return file_path
+
+@router.get("/preview/{file_id}", response_class=HTMLResponse)
+async def preview_file(file_id: str):
+    file_path = await _resolve_excel_for_preview(file_id)
 
     try:
-        # Read the Excel file into a pandas DataFrame
-        df = pd.read_excel(file_path)
+        # Only the first rows are rendered; use /preview/{file_id}/rows to page through the rest.
+        window = await get_sheet_window(file_path, offset=0, limit=settings.PREVIEW_HTML_ROWS + 1)
+        rows = window["rows"]
+        header = [h if h is not None else f"Unnamed: {i}" for i, h in enumerate(rows[0])] if rows else []
+        import pandas as pd  # Only needed for the HTML preview; slow to import
+
+        df = pd.DataFrame(rows[1:], columns=header, dtype=object).fillna("")
         # Convert the DataFrame to an HTML table
         html_table = df.to_html(index=False, classes="table table-striped")
         return HTMLResponse(content=html_table)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to preview Excel file: {e}")
+
+@router.get("/preview/{file_id}/rows")
+async def preview_file_rows(
+    file_id: str,
+    sheet: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+):
+    """Returns one window of rows of a result workbook as JSON."""
+    file_path = await _resolve_excel_for_preview(file_id)
+
+    try:
+        return await get_sheet_window(file_path, sheet=sheet, offset=offset, limit=min(limit, settings.PREVIEW_MAX_ROWS))
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Sheet '{sheet}' not found.")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to preview Excel file: {e}")
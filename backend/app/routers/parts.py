@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
 from app.db.mongo import get_db
 from app.services.parts_repo import PartsRepository
 from app.services.aliases_repo import AliasesRepository
 from app.models import api_schemas, schemas
+from app.utils.normalize import normalize_string
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter()
 
+# Routes returning a FastJSONResponse document their shape with responses=
+# instead of response_model, which FastAPI does not apply to a Response.
+
 # Dependency to get PartsRepository instance
 def get_parts_repo() -> PartsRepository:
     return PartsRepository()
@@ -17,29 +22,72 @@ def get_parts_repo() -> PartsRepository:
 def get_aliases_repo() -> AliasesRepository:
     return AliasesRepository()
 
-@router.get("/{partNo}", response_model=schemas.Part)
-async def get_part(partNo: str, parts_repo: PartsRepository = Depends(get_parts_repo)):
-    part = await parts_repo.get_part(partNo)
-    if not part:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
-    return part
+@router.get("", responses={200: {"model": api_schemas.PartListResponse}})
+async def list_parts(
+    prefix: str | None = Query(None, description="partNo prefix (normalized)"),
+    specKey: str | None = Query(None, description="only parts that have this spec key"),
+    status_: str | None = Query(None, alias="status", description="only parts with a spec in this status"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    fields: str | None = Query(None, description="comma-separated, e.g. partNo,updatedAt,specs.key"),
+    parts_repo: PartsRepository = Depends(get_parts_repo)
+):
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        docs, next_cursor = await parts_repo.list_parts(
+            prefix=prefix, spec_key=specKey, status=status_, cursor=cursor, limit=limit, fields=field_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse({"items": docs, "next_cursor": next_cursor})
 
-@router.patch("/{partNo}/specs", response_model=api_schemas.PatchSpecsResponse)
-async def patch_specs(
+@router.get("/{partNo}", responses={200: {"model": schemas.Part}})
+async def get_part(
     partNo: str,
-    request: api_schemas.PatchSpecsRequest,
+    keys: str | None = Query(None, description="comma-separated spec keys or aliases to return"),
+    fields: str | None = Query(None, description="comma-separated spec fields, e.g. value,unit,status"),
     parts_repo: PartsRepository = Depends(get_parts_repo),
     aliases_repo: AliasesRepository = Depends(get_aliases_repo)
 ):
+    # Documents are serialized as stored (they were validated when written),
+    # without building Part/SpecItem models or re-validating the response.
+    if keys is None and fields is None:
+        part = await parts_repo.get_part_document(partNo)
+        if not part:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
+        return FastJSONResponse(part)
+
+    # Filtered view: Mongo returns only the requested specs
+    spec_keys = None
+    if keys is not None:
+        requested = [k.strip() for k in keys.split(",") if k.strip()]
+        resolved = await aliases_repo.resolve(requested) if requested else {}
+        spec_keys = [resolved.get(k) or normalize_string(k) for k in requested]
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        part = await parts_repo.get_part_view(partNo, keys=spec_keys, fields=field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not part:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
+    return FastJSONResponse(part)
+
+def _plan_spec_updates(
+    existing_part: schemas.Part | None,
+    items: List[api_schemas.SpecUpdateItem],
+    resolved_mappings: Dict[str, str | None],
+    actor: str,
+) -> Tuple[List[schemas.SpecItem], api_schemas.PatchSpecsResponse]:
+    """
+    Turns PATCH items into the SpecItems to upsert for one part, using the
+    already loaded part for status, aliases, notes and source files.
+    """
     updated_specs_response: List[api_schemas.UpdatedSpecResponse] = []
     unresolved_aliases: List[str] = []
     specs_to_upsert: List[schemas.SpecItem] = []
+    existing_specs = {spec.key: spec for spec in existing_part.specs} if existing_part else {}
 
-    # Resolve all keyOrAliases first
-    keys_to_resolve = [item.keyOrAlias for item in request.items]
-    resolved_mappings = await aliases_repo.resolve(keys_to_resolve)
-
-    for item in request.items:
+    for item in items:
         canonical_key = resolved_mappings.get(item.keyOrAlias)
 
         if not canonical_key:
@@ -51,20 +99,12 @@ async def patch_specs(
                 unit=item.unit,
                 status="pending", # Default to pending if unresolved
                 lastUpdatedAt=datetime.now(),
-                lastUpdatedBy=request.actor,
+                lastUpdatedBy=actor,
                 aliasUnresolved=True
             ))
             continue
 
-        # Fetch existing part to determine status
-        existing_part = await parts_repo.get_part(partNo)
-        existing_spec = None
-        if existing_part:
-            for spec in existing_part.specs:
-                if spec.key == canonical_key:
-                    existing_spec = spec
-                    break
-
+        existing_spec = existing_specs.get(canonical_key)
         spec_status = "edited" if existing_spec else "pending"
 
         source_files = []
@@ -91,7 +131,7 @@ async def patch_specs(
             status=spec_status,
             sourceFiles=[schemas.SourceFile(**sf) for sf in source_files], # Convert back to Pydantic model
             lastUpdatedAt=datetime.now(),
-            lastUpdatedBy=request.actor,
+            lastUpdatedBy=actor,
             notes=existing_spec.notes if existing_spec else None # Preserve existing notes
         )
         specs_to_upsert.append(spec_item)
@@ -107,13 +147,56 @@ async def patch_specs(
             aliasUnresolved=False
         ))
 
-    if specs_to_upsert:
-        await parts_repo.upsert_specs(partNo, specs_to_upsert, request.actor, None) # sourceFilename handled internally
-
-    return api_schemas.PatchSpecsResponse(
+    response = api_schemas.PatchSpecsResponse(
         updated_specs=updated_specs_response,
         unresolved_aliases=unresolved_aliases
     )
+    return specs_to_upsert, response
+
+@router.patch("/specs/bulk", response_model=api_schemas.BulkPatchSpecsResponse)
+async def bulk_patch_specs(
+    request: api_schemas.BulkPatchSpecsRequest,
+    parts_repo: PartsRepository = Depends(get_parts_repo),
+    aliases_repo: AliasesRepository = Depends(get_aliases_repo)
+):
+    """Patches specs of many parts with one alias lookup, one read and one bulk write."""
+    keys_to_resolve = list({item.keyOrAlias for part in request.parts for item in part.items})
+    resolved_mappings = await aliases_repo.resolve(keys_to_resolve) if keys_to_resolve else {}
+    existing_parts = await parts_repo.get_parts([part.partNo for part in request.parts])
+
+    updates: Dict[str, List[schemas.SpecItem]] = {}
+    results: List[api_schemas.BulkPatchSpecsResult] = []
+    for part in request.parts:
+        normalized_partNo = normalize_string(part.partNo)
+        specs_to_upsert, response = _plan_spec_updates(
+            existing_parts.get(normalized_partNo), part.items, resolved_mappings, request.actor
+        )
+        updates.setdefault(normalized_partNo, []).extend(specs_to_upsert)
+        results.append(api_schemas.BulkPatchSpecsResult(partNo=part.partNo, **response.model_dump()))
+
+    await parts_repo.bulk_upsert_specs(updates, request.actor)
+
+    return api_schemas.BulkPatchSpecsResponse(results=results)
+
+@router.patch("/{partNo}/specs", response_model=api_schemas.PatchSpecsResponse)
+async def patch_specs(
+    partNo: str,
+    request: api_schemas.PatchSpecsRequest,
+    parts_repo: PartsRepository = Depends(get_parts_repo),
+    aliases_repo: AliasesRepository = Depends(get_aliases_repo)
+):
+    # Resolve all keyOrAliases first
+    keys_to_resolve = [item.keyOrAlias for item in request.items]
+    resolved_mappings = await aliases_repo.resolve(keys_to_resolve)
+
+    # Load the part once to determine status and preserve aliases/notes
+    existing_part = await parts_repo.get_part(partNo)
+    specs_to_upsert, response = _plan_spec_updates(existing_part, request.items, resolved_mappings, request.actor)
+
+    if specs_to_upsert:
+        await parts_repo.upsert_specs(partNo, specs_to_upsert, request.actor, None) # sourceFilename handled internally
+
+    return response
 
 @router.post("/{partNo}/specs/mark-incorrect", response_model=Dict[str, Any])
 async def mark_specs_incorrect(
@@ -148,18 +231,18 @@ async def mark_specs_incorrect(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
 
     # Update specs
-    updated_count = 0
+    marked_specs = []
     for spec in part.specs:
         if spec.key in canonical_keys_to_mark:
             spec.status = "incorrect"
             spec.notes = request.note # Overwrite or set note
             spec.lastUpdatedAt = datetime.now()
             spec.lastUpdatedBy = request.actor
-            updated_count += 1
+            marked_specs.append(spec)
+    updated_count = len(marked_specs)
 
-    if updated_count > 0:
-        # Use upsert_specs to update the part with modified specs
-        # This will overwrite the existing specs with the updated ones
-        await parts_repo.upsert_specs(partNo, part.specs, request.actor, None)
+    if marked_specs:
+        # Only the marked specs are written; the rest of the part is untouched
+        await parts_repo.upsert_specs(partNo, marked_specs, request.actor, None)
 
     return {"message": f"Successfully marked {updated_count} specs as incorrect.", "unresolved_aliases": unresolved_mark_aliases}
@@ -1,41 +1,64 @@
 import uuid
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, BackgroundTasks, Header, Query
 from typing import List
 import asyncio, logging
 import os
 
 from app.core.config import settings
-from app.core.storage import storage_service
+from app.core.metrics import jobs_queued
+from app.core.profiling import profiling_allowed
+from app.core.storage import StoredUpload, storage_service
 from app.services.value_service import process_files, job_statuses
 from app.models.schemas import JobResponse, ValueResultResponse
-from app.utils.file_validation import validate_files
+from app.utils.file_validation import validate_files, UploadGuard
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter()
+RESULT_FIELDS = list(ValueResultResponse.model_fields)
 logger = logging.getLogger(__name__)
 
 @router.post("/upload_polling", response_model=JobResponse)
 async def upload_for_value_search_polling(
     background_tasks: BackgroundTasks,
     excel: UploadFile = File(...),
-    pdfs: List[UploadFile] = File(...)
+    pdfs: List[UploadFile] = File(...),
+    profile: bool = Query(False, description="Profile this job (needs PROFILING_ENABLED and X-Admin-Token)"),
+    x_admin_token: str | None = Header(None),
 ):
+    if profile and not profiling_allowed(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="無權限啟用效能分析")
     validate_files([excel] + pdfs, settings)
 
     job_id = str(uuid.uuid4())
     logger.info(f"[upload_polling] job_id=%s accepting files", job_id)
     logger.info("[upload_polling] pid=%s", os.getpid())
     
-    saved_excel_path = await storage_service.save_upload(excel)
-    saved_pdf_paths = [await storage_service.save_upload(f) for f in pdfs]
+    # Declared sizes were checked above; the guard enforces the real byte counts
+    # and file signatures while the uploads are streamed to disk concurrently.
+    upload_guard = UploadGuard(settings)
+    saved_excel, *saved_pdfs = await storage_service.save_uploads([excel] + pdfs, upload_guard.for_file)
 
-    asyncio.create_task(process_files(job_id, [saved_excel_path], saved_pdf_paths, job_type="polling"))
+    jobs_queued.inc(kind="value")
+    job_run = process_files(job_id, [saved_excel.path], [p.path for p in saved_pdfs], job_type="polling", profile=profile)
+    asyncio.create_task(_release_after([saved_excel] + saved_pdfs, job_run))
     logger.info(f"[upload_polling] job_id=%s scheduled process_files", job_id)
     
     return {"job_id": job_id}
 
-@router.get("/result_polling/{job_id}", response_model=ValueResultResponse)
+async def _release_after(uploads: List[StoredUpload], job_run) -> None:
+    """Runs the job, then drops its references to the uploads (the results are separate files)."""
+    try:
+        await job_run
+    finally:
+        await storage_service.release_uploads(uploads)
+
+# Returned as a FastJSONResponse, which response_model would not validate:
+# the model only documents the shape, and RESULT_FIELDS enforces it.
+@router.get("/result_polling/{job_id}", responses={200: {"model": ValueResultResponse}})
 async def get_value_search_result_polling(job_id: str):
-    result = job_statuses.get(job_id)
+    result = await job_statuses.aget(job_id)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-    return result
+    # Job records are written by this service: pick the response fields
+    # (never e.g. the traceback in "details") without a validation pass.
+    return FastJSONResponse({field: result.get(field) for field in RESULT_FIELDS})
@@ -0,0 +1,295 @@
+"""
+Bulk import/export of the parts and field-alias catalogs.
+
+    python -m app.scripts.catalog_io import parts vendor_catalog.ndjson
+    python -m app.scripts.catalog_io import parts vendor_catalog.csv --batch-size 2000
+    python -m app.scripts.catalog_io import aliases aliases.csv
+    python -m app.scripts.catalog_io export parts -o parts.ndjson
+    python -m app.scripts.catalog_io export aliases --format csv -o aliases.csv
+
+Input is streamed and written in unordered bulk_write batches, and exports
+iterate a cursor, so memory stays bounded by --batch-size whatever the
+catalog size.
+
+Formats
+  parts NDJSON:   one part per line, as exported:
+                  {"partNo", "manufacturer", "specs": [{"key", "value", "unit", ...}]}
+  parts CSV:      one spec per row: partNo,key,value,unit[,status,manufacturer,notes]
+                  (rows of one part must be adjacent, e.g. sorted by partNo)
+  aliases NDJSON: {"canonical": ..., "aliases": [...]} per line
+  aliases CSV:    canonical,alias (one alias per row)
+
+CSV cells carry no type: an integer cell ("5") is imported as the integer
+the exporter wrote, and anything else ("4.25", "5V", "-40 to 85") stays
+text, as _spec_value stores it. A spec stored as integer-looking *text*
+therefore comes back as an integer; only NDJSON round-trips every document
+unchanged.
+
+Importing a part replaces its spec list (a key repeated within one record
+keeps its last value) and sets its manufacturer only when the record has
+one; importing aliases adds to the existing ones. Records that cannot be
+imported (invalid JSON, no partNo/canonical, a spec without key) are
+reported on stderr and skipped.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from itertools import groupby
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, TextIO
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.mongo import connect_to_mongo, close_mongo_connection, get_db
+from app.services.alias_cache import alias_cache
+from app.services.alt_engine import parse_numeric_spec
+from app.utils.normalize import normalize_string
+
+DEFAULT_BATCH_SIZE = 1000
+PART_CSV_COLUMNS = ["partNo", "key", "value", "unit", "status", "manufacturer", "notes"]
+ALIAS_CSV_COLUMNS = ["canonical", "alias"]
+
+# --- Readers ---
+
+def read_ndjson(f: TextIO, out: TextIO | None = None) -> Iterator[Dict[str, Any]]:
+    for line_no, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"[WARNING] line {line_no} skipped: invalid JSON ({e})", file=out or sys.stderr)
+            continue
+        yield record
+
+def read_parts_csv(f: TextIO) -> Iterator[Dict[str, Any]]:
+    """Groups adjacent spec rows into one part record per partNo."""
+    rows = (row for row in csv.DictReader(f) if (row.get("partNo") or "").strip())
+    for part_no, part_rows in groupby(rows, key=lambda row: row["partNo"].strip()):
+        part_rows = list(part_rows)
+        yield {
+            "partNo": part_no,
+            "manufacturer": next((r["manufacturer"] for r in part_rows if r.get("manufacturer")), None),
+            "specs": [
+                {
+                    "key": r["key"],
+                    "value": _csv_value(r.get("value")),
+                    "unit": r.get("unit") or None,
+                    "status": r.get("status") or None,
+                    "notes": r.get("notes") or None,
+                }
+                for r in part_rows if r.get("key")
+            ],
+        }
+
+def _csv_value(text: str | None) -> str | int | None:
+    # Undo the export's str(): integers come back as int, other values stay text.
+    if not text:
+        return None
+    number = parse_numeric_spec(text)
+    if number is not None and number.is_integer() and str(int(number)) == text:
+        return int(number)
+    return text
+
+def read_aliases_csv(f: TextIO) -> Iterator[Dict[str, Any]]:
+    rows = (row for row in csv.DictReader(f) if (row.get("canonical") or "").strip())
+    for canonical, alias_rows in groupby(rows, key=lambda row: row["canonical"].strip()):
+        yield {"canonical": canonical, "aliases": [r["alias"] for r in alias_rows if r.get("alias")]}
+
+# --- Import ---
+
+def _spec_value(value: Any) -> Any:
+    # SpecItem.value is str | int: keep integers, store other numbers as text.
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else str(value)
+    return value
+
+def _required(record: Dict[str, Any], field: str) -> str:
+    value = record.get(field) if isinstance(record, dict) else None
+    if value is None or not str(value).strip():
+        raise ValueError(f"missing {field}")
+    return normalize_string(str(value))
+
+def part_operation(record: Dict[str, Any], actor: str, now: datetime) -> UpdateOne:
+    """Raises ValueError for a record that cannot be imported."""
+    part_no = _required(record, "partNo")
+    specs: Dict[str, Dict[str, Any]] = {}
+    for spec in record.get("specs") or []:
+        key = _required(spec, "key")
+        specs.pop(key, None)  # a repeated key keeps its last value (and position)
+        specs[key] = {
+            "key": key,
+            "value": _spec_value(spec.get("value")),
+            "unit": spec.get("unit"),
+            "aliases": [normalize_string(str(a)) for a in spec.get("aliases") or []],
+            "status": spec.get("status") or "confirmed",
+            "sourceFiles": spec.get("sourceFiles") or [],
+            "lastUpdatedAt": now,
+            "lastUpdatedBy": actor,
+            "notes": spec.get("notes"),
+        }
+    update = {
+        "$set": {"specs": list(specs.values()), "updatedAt": now},
+        "$setOnInsert": {"createdAt": now, "manufacturer": None},
+    }
+    # Records without a manufacturer leave the stored one alone.
+    if record.get("manufacturer"):
+        update["$set"]["manufacturer"] = record["manufacturer"]
+        del update["$setOnInsert"]["manufacturer"]
+    return UpdateOne({"partNo": part_no}, update, upsert=True)
+
+def alias_operation(record: Dict[str, Any]) -> UpdateOne:
+    """Raises ValueError for a record that cannot be imported."""
+    canonical = _required(record, "canonical")
+    aliases = {normalize_string(str(a)) for a in record.get("aliases") or []}
+    aliases.add(canonical)  # canonical resolves to itself, as in AliasesRepository.batch_upsert
+    return UpdateOne(
+        {"canonical": canonical},
+        {"$addToSet": {"aliases": {"$each": sorted(aliases)}}},
+        upsert=True,
+    )
+
+def _operations(records: Iterable[Dict[str, Any]], build: Callable[[Dict[str, Any]], UpdateOne], out: TextIO | None = None) -> Iterator[UpdateOne]:
+    """Builds one operation per record, reporting and skipping bad records."""
+    for index, record in enumerate(records, start=1):
+        try:
+            yield build(record)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"[WARNING] record {index} skipped: {e}", file=out or sys.stderr)
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def bulk_import(collection, operations: Iterable[UpdateOne], batch_size: int = DEFAULT_BATCH_SIZE, out: TextIO = sys.stderr) -> int:
+    """Writes operations in unordered bulk_write batches; returns the number written."""
+    written = 0
+    failed = 0
+    started = time.monotonic()
+    for batch in _batches(operations, batch_size):
+        # Unordered: one bad document does not stop the batch, and the server
+        # may apply the writes in parallel.
+        try:
+            await collection.bulk_write(batch, ordered=False)
+            written += len(batch)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            failed += len(errors)
+            written += len(batch) - len(errors)
+            for error in errors[:5]:
+                print(f"[WARNING] write failed: {error.get('errmsg')}", file=out)
+        rate = written / max(time.monotonic() - started, 1e-6)
+        print(f"{written} records written, {failed} failed ({rate:.0f}/s)", file=out)
+    return written
+
+async def import_catalog(db, kind: str, records: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE, actor: str = "catalog_io") -> int:
+    if kind == "parts":
+        now = datetime.now()
+        written = await bulk_import(db["parts"], _operations(records, lambda r: part_operation(r, actor, now)), batch_size)
+    else:
+        written = await bulk_import(db["field_aliases"], _operations(records, alias_operation), batch_size)
+        if written:
+            await alias_cache.bump_version(db)
+    return written
+
+# --- Export ---
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def _iter_collection(collection, batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+    order = "partNo" if collection.name == "parts" else "canonical"
+    async for doc in collection.find({}, {"_id": 0}).sort(order, 1).batch_size(batch_size):
+        yield doc
+
+async def export_catalog(db, kind: str, fmt: str, out: TextIO, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    collection = db["parts" if kind == "parts" else "field_aliases"]
+    count = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(PART_CSV_COLUMNS if kind == "parts" else ALIAS_CSV_COLUMNS)
+
+    async for doc in _iter_collection(collection, batch_size):
+        if writer is None:
+            out.write(json.dumps(doc, ensure_ascii=False, default=_json_default))
+            out.write("\n")
+        elif kind == "parts":
+            for spec in doc.get("specs") or []:
+                writer.writerow([doc["partNo"], spec.get("key"), spec.get("value"), spec.get("unit"),
+                                 spec.get("status"), doc.get("manufacturer"), spec.get("notes")])
+        else:
+            for alias in doc.get("aliases") or []:
+                writer.writerow([doc["canonical"], alias])
+        count += 1
+        if count % batch_size == 0:
+            print(f"{count} records exported", file=sys.stderr)
+    return count
+
+# --- CLI ---
+
+def _detect_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+async def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import/export of the parts and alias catalogs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import")
+    imp.add_argument("kind", choices=["parts", "aliases"])
+    imp.add_argument("path", help="input file, or - for stdin")
+    imp.add_argument("--format", choices=["ndjson", "csv"])
+    imp.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    imp.add_argument("--actor", default="catalog_io")
+    exp = sub.add_parser("export")
+    exp.add_argument("kind", choices=["parts", "aliases"])
+    exp.add_argument("-o", "--output", default="-", help="output file, or - for stdout")
+    exp.add_argument("--format", choices=["ndjson", "csv"])
+    exp.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    # Upserts by partNo/canonical rely on the unique indexes
+    await connect_to_mongo(wait_for_indexes=True)
+    try:
+        db = get_db()
+        if args.command == "import":
+            fmt = _detect_format(args.path, args.format)
+            f = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+            try:
+                if fmt == "ndjson":
+                    records = read_ndjson(f)
+                else:
+                    records = read_parts_csv(f) if args.kind == "parts" else read_aliases_csv(f)
+                written = await import_catalog(db, args.kind, records, args.batch_size, args.actor)
+            finally:
+                if f is not sys.stdin:
+                    f.close()
+            print(f"Imported {written} {args.kind} records.", file=sys.stderr)
+        else:
+            fmt = _detect_format(args.output, args.format)
+            f = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+            try:
+                count = await export_catalog(db, args.kind, fmt, f, args.batch_size)
+            finally:
+                if f is not sys.stdout:
+                    f.close()
+            print(f"Exported {count} {args.kind} records.", file=sys.stderr)
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
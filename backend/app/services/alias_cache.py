@@ -0,0 +1,85 @@
+# backend/app/services/alias_cache.py
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.services.alias_matcher import TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+# cache_versions/{_id: "field_aliases"}.version is bumped on every alias write,
+# so every worker can tell its copy is stale with one tiny read.
+VERSIONS_COLLECTION = "cache_versions"
+ALIASES_VERSION_ID = "field_aliases"
+
+class AliasCache:
+    """
+    Process-local map of normalized alias -> canonical key, built from the
+    `field_aliases` collection. The shared version counter is checked at most
+    every check_interval seconds; the table is reloaded only when it changed.
+    """
+    def __init__(self, check_interval: float | None = None):
+        self.check_interval = settings.ALIAS_CACHE_CHECK_SECONDS if check_interval is None else check_interval
+        self._mapping: Dict[str, str] | None = None
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._index: TrigramIndex | None = None
+        self._index_source: Dict[str, str] | None = None
+
+    @property
+    def version(self) -> int | None:
+        return self._version
+
+    async def get_mapping(self, db) -> Dict[str, str]:
+        if self._mapping is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._mapping
+
+        async with self._lock:
+            if self._mapping is None or time.monotonic() - self._checked_at >= self.check_interval:
+                version = await self._read_version(db)
+                if self._mapping is None or version != self._version:
+                    await self._load(db, version)
+                self._checked_at = time.monotonic()
+        return self._mapping
+
+    async def get_index(self, db) -> TrigramIndex:
+        """Trigram index over the current alias table, rebuilt when the table is reloaded."""
+        mapping = await self.get_mapping(db)
+        if self._index is None or self._index_source is not mapping:
+            self._index = TrigramIndex(mapping)
+            self._index_source = mapping
+        return self._index
+
+    async def refresh(self, db) -> None:
+        """Reloads the table now (used at startup and after local writes)."""
+        async with self._lock:
+            await self._load(db, await self._read_version(db))
+            self._checked_at = time.monotonic()
+
+    async def bump_version(self, db) -> None:
+        """Marks every worker's copy stale after field_aliases was written."""
+        await db[VERSIONS_COLLECTION].update_one(
+            {"_id": ALIASES_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True
+        )
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._mapping = None
+
+    async def _read_version(self, db) -> int:
+        doc = await db[VERSIONS_COLLECTION].find_one({"_id": ALIASES_VERSION_ID})
+        return doc.get("version", 0) if doc else 0
+
+    async def _load(self, db, version: int) -> None:
+        mapping: Dict[str, str] = {}
+        async for doc in db["field_aliases"].find({}, {"_id": 0, "canonical": 1, "aliases": 1}):
+            for alias in doc.get("aliases") or []:
+                mapping.setdefault(alias, doc["canonical"])
+        self._mapping = mapping
+        self._version = version
+        logger.info("Alias cache loaded: %d aliases (version %s)", len(mapping), version)
+
+alias_cache = AliasCache()
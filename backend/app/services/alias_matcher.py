@@ -0,0 +1,73 @@
+# backend/app/services/alias_matcher.py
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from dataclasses import dataclass
+from typing import Dict, List, Set
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of text, ignoring case and punctuation ("Over-charge" == "over charge")."""
+    words = _NON_WORD_RE.sub(" ", text.lower()).split()
+    if not words:
+        return set()
+    padded = f"  {' '.join(words)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+@dataclass(frozen=True)
+class AliasMatch:
+    canonical: str
+    alias: str
+    score: float  # Dice coefficient of the trigram sets, 1.0 = same trigrams
+
+class TrigramIndex:
+    """
+    Inverted trigram index over alias strings. A lookup only touches aliases
+    sharing at least one trigram with the query, so it stays in the
+    microsecond range for alias tables of a few thousand entries.
+    """
+    def __init__(self, aliases: Dict[str, str]):
+        self._aliases: List[str] = []
+        self._canonicals: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for alias, canonical in aliases.items():
+            grams = trigrams(alias)
+            if not grams:
+                continue
+            alias_id = len(self._aliases)
+            self._aliases.append(alias)
+            self._canonicals.append(canonical)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(alias_id)
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.0) -> List[AliasMatch]:
+        """Returns up to `limit` canonical keys, best first, each with its closest alias."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # Counter over the chained posting lists counts shared trigrams in C
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+
+        query_size, sizes = len(grams), self._sizes
+        scored = sorted(
+            ((2.0 * count / (query_size + sizes[alias_id]), alias_id) for alias_id, count in shared.items()),
+            reverse=True,
+        )
+
+        matches: List[AliasMatch] = []
+        seen: Set[str] = set()
+        for score, alias_id in scored:
+            if score < min_score or len(matches) >= limit:
+                break
+            canonical = self._canonicals[alias_id]
+            if canonical in seen:
+                continue
+            seen.add(canonical)
+            matches.append(AliasMatch(canonical=canonical, alias=self._aliases[alias_id], score=score))
+        return matches
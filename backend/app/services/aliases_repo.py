@@ -1,30 +1,38 @@
 from typing import List, Dict, Any
+from pymongo import UpdateOne
+from app.core.config import settings
 from app.db.mongo import get_db
 from app.models.schemas import FieldAlias
+from app.services.alias_cache import alias_cache
+from app.services.alias_matcher import AliasMatch
+from app.utils.normalize import normalize_string
 
 class AliasesRepository:
     def __init__(self):
-        self.collection = get_db()["field_aliases"]
+        self.db = get_db()
+        self.collection = self.db["field_aliases"]
 
-    async def resolve(self, candidates: List[str]) -> Dict[str, str | None]:
-        # Normalize candidates for lookup
-        normalized_candidates = [self._normalize_string(c) for c in candidates]
-        
-        # Find aliases that match any of the normalized candidates
-        # We need to search in the 'aliases' array field
-        results = await self.collection.find({"aliases": {"$in": normalized_candidates}}).to_list(None)
-        
-        mapping = {candidate: None for candidate in candidates}
-        for doc in results:
-            canonical = doc["canonical"]
-            for alias in doc["aliases"]:
-                if alias in normalized_candidates:
-                    # Map the original candidate to its canonical form
-                    # This assumes a 1:1 mapping for simplicity, first match wins
-                    original_candidate_index = normalized_candidates.index(alias)
-                    mapping[candidates[original_candidate_index]] = canonical
+    async def resolve(self, candidates: List[str], fuzzy: bool = False, min_score: float | None = None) -> Dict[str, str | None]:
+        # Lookups go to the process-local alias table; MongoDB is only
+        # consulted when another writer has bumped the alias version.
+        aliases = await alias_cache.get_mapping(self.db)
+        mapping = {candidate: aliases.get(self._normalize_string(candidate)) for candidate in candidates}
+
+        if fuzzy:
+            # Unknown header variants fall back to the closest alias, if close enough
+            min_score = settings.ALIAS_FUZZY_MIN_SCORE if min_score is None else min_score
+            index = await alias_cache.get_index(self.db)
+            for candidate, canonical in mapping.items():
+                if canonical is None:
+                    matches = index.search(candidate, limit=1, min_score=min_score)
+                    mapping[candidate] = matches[0].canonical if matches else None
         return mapping
 
+    async def suggest(self, query: str, limit: int = 5, min_score: float = 0.0) -> List[AliasMatch]:
+        """Ranks canonical keys by trigram similarity of their aliases to query."""
+        index = await alias_cache.get_index(self.db)
+        return index.search(query, limit=limit, min_score=min_score)
+
     async def batch_upsert(self, items: List[FieldAlias]):
         operations = []
         for item in items:
@@ -35,21 +43,15 @@ class AliasesRepository:
             if normalized_canonical not in normalized_aliases:
                 normalized_aliases.append(normalized_canonical)
 
-            operations.append({
-                "update_one": {
-                    "filter": {"canonical": normalized_canonical},
-                    "update": {"$set": {"aliases": normalized_aliases}},
-                    "upsert": True
-                }
-            })
+            operations.append(UpdateOne(
+                {"canonical": normalized_canonical},
+                {"$set": {"aliases": normalized_aliases}},
+                upsert=True
+            ))
         
         if operations:
             await self.collection.bulk_write(operations)
+            await alias_cache.bump_version(self.db)
 
     def _normalize_string(self, text: str) -> str:
-        # This should be consistent with parts_repo.py
-        text = text.strip()
-        text = text.lower()
-        text = " ".join(text.split())
-        text = text.replace(" (", "(").replace(") ", ")")
-        return text
+        return normalize_string(text)
@@ -0,0 +1,256 @@
+# backend/app/services/alt_engine.py
+"""
+Alternative-part search over the `parts` catalog.
+
+Every catalogued part becomes one row of an in-memory feature matrix: one
+column per spec key, holding either a unit-normalised number or a category
+code (for values such as packages). Ranking a query target is a handful of
+vectorised NumPy operations over that matrix, so a 100k-part catalog answers
+in milliseconds.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.normalize import normalize_string
+
+logger = logging.getLogger(__name__)
+
+# SI prefixes recognised in front of the base units below.
+UNIT_PREFIXES = {"p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "μ": 1e-6, "m": 1e-3, "k": 1e3, "M": 1e6, "G": 1e9}
+BASE_UNITS = {"V", "A", "W", "Ω", "ohm", "Hz", "F", "H", "s", "Wh", "Ah"}
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_RANGE_RE = re.compile(r"^\s*([-+]?\d+(?:\.\d+)?)\s*(?:to|~|～|\.\.|–|—)\s*([-+]?\d+(?:\.\d+)?)\s*$")
+# Catalog documents converted per worker-thread call while building the index
+INDEX_BUILD_CHUNK = 1000
+
+def unit_scale(unit: str | None) -> float:
+    """Returns the factor converting a value in `unit` to its base unit (mV -> 1e-3)."""
+    if not unit:
+        return 1.0
+    unit = unit.strip()
+    if unit in BASE_UNITS:
+        return 1.0
+    if len(unit) > 1 and unit[0] in UNIT_PREFIXES and unit[1:] in BASE_UNITS:
+        return UNIT_PREFIXES[unit[0]]
+    return 1.0
+
+def parse_numeric_spec(value: Any, unit: str | None = None) -> float | None:
+    """
+    Converts a spec value to a number in base units, or None if it is not numeric.
+    Ranges such as "-40 to 85" are represented by their midpoint.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        text = value.strip()
+        range_match = _RANGE_RE.match(text)
+        if range_match:
+            number = (float(range_match.group(1)) + float(range_match.group(2))) / 2
+        else:
+            number_match = _NUMBER_RE.match(text)
+            if not number_match:
+                return None
+            rest = text[number_match.end():].strip()
+            # Accept a trailing unit ("4.25V", "150 mA") but not free text ("3 cells in series").
+            if rest and (" " in rest or len(rest) > 4):
+                return None
+            number = float(number_match.group())
+            if rest and not unit:
+                unit = rest
+    else:
+        return None
+    if not np.isfinite(number):
+        return None
+    return number * unit_scale(unit)
+
+def spec_row(part: Dict[str, Any]) -> Dict[str, Any]:
+    """A part's usable specs: key -> parsed number, or normalized text for categorical values."""
+    row: Dict[str, Any] = {}
+    for spec in part.get("specs") or []:
+        if spec.get("status") == "incorrect" or spec.get("value") is None:
+            continue
+        number = parse_numeric_spec(spec.get("value"), spec.get("unit"))
+        row[spec["key"]] = number if number is not None else normalize_string(str(spec["value"]))
+    return row
+
+@dataclass(frozen=True)
+class AltCandidate:
+    part_no: str
+    score: float          # 1.0 = identical on every compared spec
+    distance: float
+    compared_keys: int    # specs present on both the target and the candidate
+
+class SpecIndex:
+    """
+    Feature matrix over catalogued parts.
+
+    numeric:  float32 [n_parts, n_keys], values already divided by the column's
+              spread, NaN where the part has no numeric value for the key.
+    category: int32 [n_parts, n_keys], category code, -1 where missing.
+    """
+    def __init__(self, part_nos: List[str], keys: List[str], numeric: np.ndarray, category: np.ndarray):
+        self.part_nos = part_nos
+        self.keys = keys
+        self.numeric = numeric
+        self.category = category
+        self.built_at = time.monotonic()
+        self._row_by_part = {part_no: i for i, part_no in enumerate(part_nos)}
+        self._col_by_key = {key: j for j, key in enumerate(keys)}
+
+    def __len__(self) -> int:
+        return len(self.part_nos)
+
+    @classmethod
+    def from_parts(cls, parts: Iterable[Dict[str, Any]]) -> "SpecIndex":
+        """Builds the index from `parts` documents (partNo + specs[].key/value/unit)."""
+        part_nos: List[str] = []
+        cells: List[Dict[str, Any]] = []
+        for part in parts:
+            part_nos.append(part["partNo"])
+            cells.append(spec_row(part))
+        return cls.from_rows(part_nos, cells)
+
+    @classmethod
+    def from_rows(cls, part_nos: List[str], cells: List[Dict[str, Any]]) -> "SpecIndex":
+        """Builds the index from one spec_row() per part."""
+        keys = sorted({key for row in cells for key in row})
+        col_by_key = {key: j for j, key in enumerate(keys)}
+        numeric = np.full((len(part_nos), len(keys)), np.nan, dtype=np.float32)
+        category = np.full((len(part_nos), len(keys)), -1, dtype=np.int32)
+        codes: Dict[tuple, int] = {}
+        for i, row in enumerate(cells):
+            for key, value in row.items():
+                j = col_by_key[key]
+                if isinstance(value, float):
+                    numeric[i, j] = value
+                else:
+                    category[i, j] = codes.setdefault((j, value), len(codes))
+
+        # Scale each numeric column by its 5th-95th percentile spread so one
+        # spec measured in volts and another in hertz weigh the same.
+        if numeric.size:
+            with warnings.catch_warnings():
+                # nanpercentile warns on all-NaN (purely categorical) columns; those get spread 1.
+                warnings.simplefilter("ignore", RuntimeWarning)
+                spread = np.nanpercentile(numeric, 95, axis=0) - np.nanpercentile(numeric, 5, axis=0)
+            spread = np.where(np.isfinite(spread) & (spread > 0), spread, 1.0).astype(np.float32)
+            numeric /= spread
+        return cls(part_nos, keys, numeric, category)
+
+    def rank(
+        self,
+        target_part_no: str,
+        keys: Sequence[str] | None = None,
+        weights: Dict[str, float] | None = None,
+        top_n: int = 5,
+    ) -> List[AltCandidate]:
+        """
+        Ranks catalogued parts by weighted distance to target_part_no over `keys`
+        (all of the target's specs when omitted). Per spec, the distance is the
+        normalised numeric difference capped at 1, or 0/1 for category match;
+        a candidate missing a spec the target has costs the full 1.
+        """
+        row = self._row_by_part.get(target_part_no)
+        if row is None or not len(self):
+            return []
+
+        cols = [self._col_by_key[k] for k in (keys if keys is not None else self.keys) if k in self._col_by_key]
+        target_numeric = self.numeric[row, cols]
+        target_category = self.category[row, cols]
+        has_numeric = ~np.isnan(target_numeric)
+        has_category = target_category >= 0
+        present = has_numeric | has_category
+        cols = np.asarray(cols, dtype=np.intp)[present]
+        if cols.size == 0:
+            return []
+        has_numeric, has_category = has_numeric[present], has_category[present]
+        w = np.asarray([(weights or {}).get(self.keys[j], 1.0) for j in cols], dtype=np.float32)
+
+        dist = np.ones((len(self), cols.size), dtype=np.float32)
+        if has_numeric.any():
+            num_cols = cols[has_numeric]
+            diff = np.abs(self.numeric[:, num_cols] - self.numeric[row, num_cols])
+            dist[:, has_numeric] = np.where(np.isnan(diff), 1.0, np.minimum(diff, 1.0))
+        if has_category.any():
+            cat_cols = cols[has_category]
+            dist[:, has_category] = (self.category[:, cat_cols] != self.category[row, cat_cols]).astype(np.float32)
+
+        total = (dist @ w) / w.sum()
+        compared = (~np.isnan(self.numeric[:, cols]) | (self.category[:, cols] >= 0)).sum(axis=1)
+        total[row] = np.inf  # never suggest the target itself
+        total[compared == 0] = np.inf
+
+        n = min(top_n, int(np.isfinite(total).sum()))
+        if n <= 0:
+            return []
+        best = np.argpartition(total, n - 1)[:n]
+        best = best[np.argsort(total[best], kind="stable")]
+        return [
+            AltCandidate(
+                part_no=self.part_nos[i],
+                score=float(1.0 - total[i]),
+                distance=float(total[i]),
+                compared_keys=int(compared[i]),
+            )
+            for i in best
+        ]
+
+_index: SpecIndex | None = None
+_index_lock = asyncio.Lock()
+
+async def get_spec_index(db=None, max_age_seconds: float | None = None) -> SpecIndex:
+    """
+    Returns the process-wide SpecIndex, rebuilding it from the `parts`
+    collection when it is older than ALT_INDEX_TTL_SECONDS.
+    """
+    global _index
+    max_age = settings.ALT_INDEX_TTL_SECONDS if max_age_seconds is None else max_age_seconds
+    if _index is not None and time.monotonic() - _index.built_at < max_age:
+        return _index
+
+    async with _index_lock:
+        if _index is None or time.monotonic() - _index.built_at >= max_age:
+            if db is None:
+                from app.db.mongo import get_db
+                db = get_db()
+            _index = await _build_spec_index(db)
+            logger.info("Alt spec index built: %d parts x %d keys", len(_index), len(_index.keys))
+    return _index
+
+async def _build_spec_index(db) -> SpecIndex:
+    # Streams the catalog: only one chunk of documents is held at a time,
+    # reduced to compact spec rows off the event loop.
+    projection = {"_id": 0, "partNo": 1, "specs.key": 1, "specs.value": 1, "specs.unit": 1, "specs.status": 1}
+    part_nos: List[str] = []
+    cells: List[Dict[str, Any]] = []
+    chunk: List[Dict[str, Any]] = []
+
+    async def flush():
+        cells.extend(await asyncio.to_thread(lambda docs: [spec_row(d) for d in docs], chunk))
+        chunk.clear()
+
+    async for part in db["parts"].find({}, projection).batch_size(INDEX_BUILD_CHUNK):
+        part_nos.append(part["partNo"])
+        chunk.append(part)
+        if len(chunk) >= INDEX_BUILD_CHUNK:
+            await flush()
+    if chunk:
+        await flush()
+    return await asyncio.to_thread(SpecIndex.from_rows, part_nos, cells)
+
+def invalidate_spec_index() -> None:
+    """Forces the next get_spec_index() call to rebuild from MongoDB."""
+    global _index
+    _index = None
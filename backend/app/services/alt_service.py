@@ -1,115 +1,132 @@
 import asyncio
-import json
+import logging
 from pathlib import Path
-from fastapi import Request
-from typing import Dict, Any, List # Added List
-import openpyxl # Added openpyxl
+from typing import Dict, Any, List
 
-from app.core.storage import storage_service
-from app.models.schemas import SSEProgress, SSEPartial, SSEDone, SSEMetadata # Added SSEMetadata
+from app.core.config import settings
+from app.core.job_manager import JobRegistry
+from app.core.logging_config import bind_job_id
+from app.core.metrics import StageTimer, jobs_in_flight
+from app.core.storage import StoredUpload, storage_service
+from app.models.schemas import SSEProgress, SSEDone, SSEMetadata
+from app.services.aliases_repo import AliasesRepository
+from app.services.excel_processing_service import read_excel_sheet
+from app.utils.normalize import normalize_string
+from app.utils.sse import SSEEmitter
+
+logger = logging.getLogger(__name__)
+
+def _close_evicted_job(job_id: str, job: Dict[str, Any]) -> None:
+    emitter = job.get("emitter")
+    if emitter is not None:
+        emitter.cancel()
+    # The upload is the job's download too, so it lives as long as the job.
+    upload = job.get("upload")
+    if upload is not None:
+        storage_service.release_upload(upload)
 
 class AltService:
     def __init__(self):
-        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.jobs = JobRegistry(
+            ttl_seconds=settings.JOB_TTL_SECONDS,
+            max_entries=settings.JOB_MAX_ENTRIES,
+            on_evict=_close_evicted_job,
+        )
 
-    def register_job(self, job_id: str, file_path: Path):
-        self.jobs[job_id] = {"file_path": file_path}
+    def register_job(self, job_id: str, upload: StoredUpload):
+        self.jobs[job_id] = {"file_path": upload.path, "upload": upload}
 
     def get_job_filepath(self, job_id: str) -> Path | None:
         job = self.jobs.get(job_id)
         return job.get("file_path") if job else None
 
-    async def process_file(self, request: Request, file_path: Path):
+    async def _resolve_spec_keys(self, query_fields: List[str]) -> List[str]:
+        """Maps the workbook's field names to canonical spec keys via field_aliases."""
+        names = [str(f) for f in query_fields]
         try:
-            yield {
-                "event": "progress",
-                "data": SSEProgress(percent=10, message="檔案讀取完成，開始分析...").model_dump_json()
-            }
-            await asyncio.sleep(0.7)
-
-            # --- 新增：讀取 Excel 檔案並提取查詢欄位和目標 ---
-            query_fields: List[str] = []
-            query_targets: List[str] = []
-            try:
-                workbook = openpyxl.load_workbook(file_path)
-                sheet = workbook.active
+            mapping = await AliasesRepository().resolve(names, fuzzy=True)
+        except Exception as e:
+            logger.warning("Alias resolution failed, using normalized field names: %s", e)
+            mapping = {}
+        return [mapping.get(name) or normalize_string(name) for name in names]
 
-                # 提取第一列作為查詢欄位 (A1, A2, A3...) 
-                if sheet.max_column >= 1:
-                    for row_idx in range(1, sheet.max_row + 1):
-                        cell_value = sheet.cell(row=row_idx, column=1).value
-                        if cell_value is not None:
-                            query_fields.append(cell_value)
+    def get_emitter(self, job_id: str) -> SSEEmitter | None:
+        """
+        Returns the job's event emitter, starting the job on first use. Later
+        connections (including reconnects) attach to the same run.
+        """
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+        if "emitter" not in job:
+            emitter = SSEEmitter()
+            file_path = job["file_path"]
+            with bind_job_id(job_id):  # inherited by the producer task
+                emitter.start(lambda e: self.process_file(e, file_path))
+            self.jobs.update(job_id, emitter=emitter)
+            return emitter
+        return job["emitter"]
 
-                # 提取第一行（從第二個儲存格開始）作為查詢目標 (B1, C1, D1...)
-                if sheet.max_row >= 1:
-                    query_targets = [cell.value for cell in sheet[1][1:] if cell.value is not None]
+    async def process_file(self, emitter: SSEEmitter, file_path: Path):
+        timer = StageTimer("alt")
+        outcome = "error"
+        jobs_in_flight.inc(kind="alt")
+        try:
+            emitter.send("progress", SSEProgress(percent=10, message="檔案讀取完成，開始分析..."))
+
+            # --- 讀取 Excel 檔案並提取查詢欄位和目標 ---
+            try:
+                with timer.stage("excel_parse"):
+                    excel_sheet = await read_excel_sheet(file_path)
+                query_fields = excel_sheet.query.query_fields
+                query_targets = excel_sheet.query.query_targets
 
                 # 發送 metadata 事件給前端
-                yield {
-                    "event": "metadata",
-                    "data": SSEMetadata(query_fields=query_fields, query_targets=query_targets).model_dump_json()
-                }
-                await asyncio.sleep(0.5)
+                emitter.send("metadata", SSEMetadata(query_fields=query_fields, query_targets=query_targets))
 
             except Exception as e:
-                print(f"Error reading Excel file: {e}")
-                yield {
-                    "event": "error",
-                    "data": json.dumps({"message": f"讀取 Excel 檔案失敗: {e}"})
-                }
+                logger.warning("Error reading Excel file: %s", e)
+                emitter.send("error", {"message": f"讀取 Excel 檔案失敗: {e}"})
                 return # 讀取失敗則終止處理
-            # --- 結束新增 ---
-
-            mock_text = "正在比對第一行資料... 找到可能替代品 A... 相似度 92%... 正在驗證庫存..."
-            for char in mock_text:
-                if await request.is_disconnected():
-                    print(f"Client for job {request.url.path} disconnected, stopping SSE stream.")
-                    break
-                yield {
-                    "event": "partial",
-                    "data": SSEPartial(text=char).model_dump_json()
-                }
-                await asyncio.sleep(0.05)
-            
-            yield {
-                "event": "progress",
-                "data": SSEProgress(percent=50, message="初步比對完成，進行深度掃描...").model_dump_json()
-            }
-            await asyncio.sleep(1)
-
-            mock_text_2 = "\n深度掃描發現替代品 B，成本降低 15%... 正在產生報告..."
-            for char in mock_text_2:
-                if await request.is_disconnected():
-                    print(f"Client for job {request.url.path} disconnected, stopping SSE stream.")
-                    break
-                yield {
-                    "event": "partial",
-                    "data": SSEPartial(text=char).model_dump_json()
-                }
-                await asyncio.sleep(0.05)
-
-            yield {
-                "event": "progress",
-                "data": SSEProgress(percent=90, message="報告產生中...").model_dump_json()
-            }
-            await asyncio.sleep(0.5)
+
+            emitter.send("progress", SSEProgress(percent=30, message="載入料號規格索引..."))
+            # alt_engine pulls in numpy; import it with the first job, not the app
+            from app.services.alt_engine import get_spec_index
+            with timer.stage("spec_index"):
+                spec_index = await get_spec_index()
+                spec_keys = await self._resolve_spec_keys(query_fields)
+
+            emitter.send("progress", SSEProgress(percent=50, message=f"比對 {len(query_targets)} 個料號，目錄共 {len(spec_index)} 筆..."))
+
+            # --- 逐一料號排序替代品 ---
+            for target in query_targets:
+                with timer.stage("rank"):
+                    candidates = spec_index.rank(normalize_string(str(target)), keys=spec_keys, top_n=settings.ALT_TOP_N)
+                if candidates:
+                    lines = [f"{target} 的替代品："] + [
+                        f"  {i}. {c.part_no}  相似度 {c.score:.0%}（比對 {c.compared_keys} 項規格）"
+                        for i, c in enumerate(candidates, start=1)
+                    ]
+                else:
+                    lines = [f"{target}：目錄中找不到此料號或可比對的規格。"]
+                emitter.send_text("partial", "\n".join(lines) + "\n")
+                await asyncio.sleep(0)
+
+            emitter.send("progress", SSEProgress(percent=90, message="報告產生中..."))
 
             # 使用原始上傳檔案作為下載連結
-            download_url = storage_service.make_downloadable(file_path)
-            
-            yield {
-                "event": "done",
-                "data": SSEDone(download_url=download_url).model_dump_json()
-            }
+            download_url = await storage_service.make_downloadable(file_path)
+
+            emitter.send("done", SSEDone(download_url=download_url))
+            outcome = "done"
 
         except asyncio.CancelledError:
-            print(f"SSE stream for job {request.url.path} was cancelled.")
+            logger.info("Alt search for %s was cancelled.", file_path.name)
+            outcome = "cancelled"
+            raise
         except Exception as e:
-            print(f"Error during SSE processing for job {request.url.path}: {e}")
-            yield {
-                "event": "error",
-                "data": json.dumps({"message": "處理過程中發生錯誤"})
-            }
+            logger.exception("Error during SSE processing for %s: %s", file_path.name, e)
+            emitter.send("error", {"message": "處理過程中發生錯誤"})
         finally:
-            pass
\ No newline at end of file
+            jobs_in_flight.dec(kind="alt")
+            timer.finish(outcome)
@@ -1,24 +1,31 @@
 # backend/app/services/aoai_core_service.py
 import asyncio
 import json
-from typing import List, Dict, Any, Optional
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
-from openai import AzureOpenAI, AsyncAzureOpenAI
 from app.core.config import settings
 
-# Initialize the synchronous client for potential sync operations if needed
-# client = AzureOpenAI(
-#     azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-#     api_key=settings.AZURE_OPENAI_API_KEY,
-#     api_version=settings.AZURE_OPENAI_API_VER,
-# )
+logger = logging.getLogger(__name__)
 
-# Initialize the asynchronous client for FastAPI
-async_client = AsyncAzureOpenAI(
-    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-    api_key=settings.AZURE_OPENAI_API_KEY,
-    api_version=settings.AZURE_OPENAI_API_VER,
-)
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
+
+@lru_cache(maxsize=1)
+def get_async_client() -> "AsyncAzureOpenAI":
+    """
+    The AOAI client, built on first use. openai is imported here rather than at
+    module level: it is slow to import and only needed once a job calls AOAI,
+    and the client can only be built when the AZURE_OPENAI_* settings exist.
+    """
+    from openai import AsyncAzureOpenAI
+
+    return AsyncAzureOpenAI(
+        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+        api_key=settings.AZURE_OPENAI_API_KEY,
+        api_version=settings.AZURE_OPENAI_API_VER,
+    )
 
 def extract_first_json_block(text: str) -> Optional[str]:
     """
@@ -62,9 +69,9 @@ async def call_aoai_extractor(system_prompt: str, user_payload: Dict[str, Any])
     """
     Calls the AOAI chat completion API asynchronously and requests JSON output.
     """
-    print("\nCalling AOAI API...")
+    logger.info("Calling AOAI API")
     try:
-        rsp = await async_client.chat.completions.create(
+        rsp = await get_async_client().chat.completions.create(
             model=settings.AZURE_OPENAI_DEPLOYMENT,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -82,18 +89,18 @@ async def call_aoai_extractor(system_prompt: str, user_payload: Dict[str, Any])
         try:
             return json.loads(content)
         except json.JSONDecodeError:
-            print("[WARNING] AOAI response was not valid JSON, attempting to extract from code block...")
+            logger.warning("AOAI response was not valid JSON, attempting to extract from code block")
             json_block = extract_first_json_block(content)
             if json_block:
                 try:
                     return json.loads(json_block)
                 except json.JSONDecodeError:
-                    print("[ERROR] Content extracted from code block is still not valid JSON.")
+                    logger.error("Content extracted from code block is still not valid JSON.")
                     raise ValueError(f"Could not parse LLM response: {content}")
             else:
                 raise ValueError(f"No JSON block found in LLM response: {content}")
 
     except Exception as e:
-        print(f"[ERROR] An error occurred while calling the AOAI API: {e}")
+        logger.error("An error occurred while calling the AOAI API: %s", e)
         # In a real app, you might want to raise a custom exception
         return {"error": str(e)}
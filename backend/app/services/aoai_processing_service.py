@@ -1,37 +1,51 @@
 # backend/app/services/aoai_processing_service.py
 import asyncio
 import json
+import logging
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Dict, Any, Callable, Awaitable
 
 from app.core.job_manager import get_job_dirs
-from app.services.excel_processing_service import get_excel_query_data, write_summary_to_excel
+from app.core.metrics import StageTimer
+from app.services.excel_processing_service import read_excel_sheet, write_summary_to_excel
 from app.services.azure_di_service import analyze_pdf
 from app.services.di_processing_service import create_structured_document
 from app.services.aoai_core_service import build_user_payload, call_aoai_extractor
+from app.services.export_service import write_result_exports
+
+logger = logging.getLogger(__name__)
 
 PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
 
 # Define a type for the async callback
 StatusCallback = Callable[[str], Awaitable[None]]
 
+@dataclass
+class AoaiJobResult:
+    """Artifacts produced by a finished AOAI job."""
+    summary_path: Path
+    export_paths: Dict[str, Path] = field(default_factory=dict)
+
 async def _run_di_on_all_pdfs(
     pdf_paths: List[Path], 
     di_output_dir: Path,
-    update_status: StatusCallback
+    update_status: StatusCallback,
+    timer: StageTimer
 ) -> None: 
     """Runs Document Intelligence on all PDF files and saves the raw JSON output."""
     
     async def process_single_pdf(pdf_path: Path, index: int):
         try:
             await update_status(f"正在處理 PDF 文件 ({index}/{len(pdf_paths)}): {pdf_path.name}...")
-            di_result = await analyze_pdf(pdf_path)
+            with timer.stage(f"di:{pdf_path.name}", metric_stage="di_call"):
+                di_result = await analyze_pdf(pdf_path)
             output_path = di_output_dir / f"{pdf_path.stem}.json"
             with open(output_path, "w", encoding="utf-8") as f:
                 json.dump(di_result, f, ensure_ascii=False, indent=2)
-            print(f"  - DI result for {pdf_path.name} saved to {output_path}")
+            logger.debug("DI result for %s saved to %s", pdf_path.name, output_path)
         except Exception as e:
-            print(f"[ERROR] Failed DI analysis for {pdf_path.name}: {e}")
+            logger.error("Failed DI analysis for %s: %s", pdf_path.name, e)
             # Optionally, report a non-fatal error for this specific file
             await update_status(f"處理 PDF 文件 {pdf_path.name} 失敗: {e}")
 
@@ -43,7 +57,7 @@ async def _run_di_on_all_pdfs(
 def _load_and_structure_di_results(di_output_dir: Path) -> List[Dict[str, Any]]:
     """Loads raw DI JSONs and converts them to the structured format for AOAI."""
     structured_docs = []
-    print(f"\nLoading and structuring DI results from '{di_output_dir}'...")
+    logger.debug("Loading and structuring DI results from %s", di_output_dir)
     
     for json_path in di_output_dir.glob("*.json"):
         try:
@@ -57,9 +71,9 @@ def _load_and_structure_di_results(di_output_dir: Path) -> List[Dict[str, Any]]:
                 "title": json_path.name,
                 "ocr_json": structured_data
             })
-            print(f"  - Loaded and structured: {json_path.name}")
+            logger.debug("Loaded and structured: %s", json_path.name)
         except Exception as e:
-            print(f"[WARNING] Could not load or structure {json_path.name}: {e}")
+            logger.warning("Could not load or structure %s: %s", json_path.name, e)
             
     return structured_docs
 
@@ -67,24 +81,30 @@ async def process_aoai_job(
     job_id: str, 
     pdf_paths: List[Path], 
     excel_path: Path,
-    update_status: StatusCallback
-) -> Path:
+    update_status: StatusCallback,
+    timer: StageTimer | None = None
+) -> AoaiJobResult:
     """
     Main orchestrator for the AOAI extraction process with status updates.
+    Each stage is timed on `timer` (timer.timings, in seconds).
     """
-    print(f"--- Starting AOAI Job --- (ID: {job_id})")
+    timer = timer or StageTimer("value")
+    logger.info("Starting AOAI job")
     job_dirs = get_job_dirs(job_id)
 
     await update_status("讀取 Excel 設定...")
-    query_data = await get_excel_query_data(excel_path)
-    print(f"  - Query Targets (PNs): {query_data.query_targets}")
-    print(f"  - Query Fields (Items): {query_data.query_fields}")
+    with timer.stage("excel_parse"):
+        excel_sheet = await read_excel_sheet(excel_path)
+    query_data = excel_sheet.query
+    logger.info("Query targets (PNs): %s; fields (items): %s", query_data.query_targets, query_data.query_fields)
 
     di_output_dir = job_dirs.di_results
-    await _run_di_on_all_pdfs(pdf_paths, di_output_dir, update_status)
+    with timer.stage("di"):
+        await _run_di_on_all_pdfs(pdf_paths, di_output_dir, update_status, timer)
 
     await update_status("轉換文件結構中...")
-    structured_docs = _load_and_structure_di_results(di_output_dir)
+    with timer.stage("structure"):
+        structured_docs = _load_and_structure_di_results(di_output_dir)
     if not structured_docs:
         raise ValueError("No DI results could be processed. Aborting job.")
 
@@ -97,25 +117,32 @@ async def process_aoai_job(
         raise FileNotFoundError(f"System prompt not found at {system_prompt_path}")
 
     await update_status("建構 AI 請求...")
-    user_payload = build_user_payload(
-        docs=structured_docs,
-        pns=query_data.query_targets,
-        items=query_data.query_fields
-    )
+    with timer.stage("payload_build"):
+        user_payload = build_user_payload(
+            docs=structured_docs,
+            pns=query_data.query_targets,
+            items=query_data.query_fields
+        )
     
     await update_status("呼叫 Azure OpenAI 進行數據抽取...")
-    aoai_result = await call_aoai_extractor(system_prompt, user_payload)
+    with timer.stage("aoai"):
+        aoai_result = await call_aoai_extractor(system_prompt, user_payload)
     if "error" in aoai_result:
         raise ValueError(f"AOAI extraction failed: {aoai_result['error']}")
 
     await update_status("正在產生最終報告...")
     output_dir = job_dirs.output
-    summary_file_path = await write_summary_to_excel(
-        original_excel_path=excel_path,
-        query_data=query_data,
-        aoai_result=aoai_result,
-        output_dir=output_dir
-    )
-
-    print(f"\n--- Job {job_id} Completed Successfully ---")
-    return summary_file_path
+    with timer.stage("excel_write"):
+        summary_file_path = await write_summary_to_excel(
+            original_excel_path=excel_path,
+            query_data=query_data,
+            aoai_result=aoai_result,
+            output_dir=output_dir,
+            excel_sheet=excel_sheet
+        )
+
+    with timer.stage("export"):
+        export_paths = await write_result_exports(job_id, aoai_result, output_dir)
+
+    logger.info("AOAI job completed")
+    return AoaiJobResult(summary_path=summary_file_path, export_paths=export_paths)
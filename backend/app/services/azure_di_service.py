@@ -1,12 +1,24 @@
 # backend/app/services/azure_di_service.py
 import asyncio
+import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
-from azure.core.credentials import AzureKeyCredential
-from azure.core.exceptions import HttpResponseError
-from azure.ai.formrecognizer import DocumentAnalysisClient
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from azure.ai.formrecognizer import DocumentAnalysisClient
+
+@lru_cache(maxsize=1)
+def get_di_client() -> "DocumentAnalysisClient":
+    """The Document Intelligence client, built (and the SDK imported) on first use."""
+    from azure.core.credentials import AzureKeyCredential
+    from azure.ai.formrecognizer import DocumentAnalysisClient
+
+    return DocumentAnalysisClient(settings.DI_ENDPOINT, AzureKeyCredential(settings.DI_KEY))
+
 async def analyze_pdf(pdf_path: Path, locale: Optional[str] = "en-US") -> Dict[str, Any]:
     """
     Analyzes a single PDF file using Document Intelligence in an async manner.
@@ -19,12 +31,10 @@ async def analyze_pdf(pdf_path: Path, locale: Optional[str] = "en-US") -> Dict[s
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF file not found at: {pdf_path}")
 
-    print(f"Analyzing document: {pdf_path}")
-    
-    client = DocumentAnalysisClient(
-        settings.DI_ENDPOINT, 
-        AzureKeyCredential(settings.DI_KEY)
-    )
+    from azure.core.exceptions import HttpResponseError
+
+    logger.info("Analyzing document: %s", pdf_path)
+    client = get_di_client()
 
     try:
         with open(pdf_path, "rb") as f:
@@ -53,8 +63,8 @@ async def analyze_pdf(pdf_path: Path, locale: Optional[str] = "en-US") -> Dict[s
             error_message += f"\nDetails: {error_content}"
         except Exception:
             pass
-        print(error_message)
+        logger.error(error_message)
         raise  # Re-raise the exception to be handled by the caller
     except Exception as e:
-        print(f"An unexpected error occurred during PDF analysis for {pdf_path}: {e}")
+        logger.exception("An unexpected error occurred during PDF analysis for %s: %s", pdf_path, e)
         raise
@@ -1,18 +1,20 @@
 
 import os
 import json
+import logging
 from typing import Optional
 from openai import AzureOpenAI
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.formrecognizer import DocumentAnalysisClient
 from ..core.config import settings
 
+logger = logging.getLogger(__name__)
+
 def analyze_document_from_path(pdf_path: str, locale: Optional[str] = "en-US") -> dict:
     """
     Analyzes a PDF file from a path using Document Intelligence.
     """
-    print(f"[DEBUG] DI Endpoint: {settings.DI_ENDPOINT}", flush=True)
-    print(f"[DEBUG] DI Key (masked): {settings.DI_KEY[:5] if settings.DI_KEY else 'N/A'}...", flush=True)
+    logger.debug("DI endpoint: %s (key set: %s)", settings.DI_ENDPOINT, bool(settings.DI_KEY))
     client = DocumentAnalysisClient(settings.DI_ENDPOINT, AzureKeyCredential(settings.DI_KEY))
     with open(pdf_path, "rb") as f:
         poller = client.begin_analyze_document("prebuilt-document", f.read(), locale=locale)
@@ -23,10 +25,11 @@ def get_aoai_response(system_prompt: str, user_prompt: str) -> dict:
     """
     Calls the Azure OpenAI API and returns the parsed JSON response.
     """
-    print(f"[DEBUG] AOAI Endpoint: {settings.AZURE_OPENAI_ENDPOINT}", flush=True)
-    print(f"[DEBUG] AOAI Key (masked): {settings.AZURE_OPENAI_API_KEY[:5] if settings.AZURE_OPENAI_API_KEY else 'N/A'}...", flush=True)
-    print(f"[DEBUG] AOAI API Version: {settings.AZURE_OPENAI_API_VER}", flush=True)
-    print(f"[DEBUG] AOAI Deployment: {settings.AZURE_OPENAI_DEPLOYMENT}", flush=True)
+    logger.debug(
+        "AOAI endpoint: %s, API version: %s, deployment: %s (key set: %s)",
+        settings.AZURE_OPENAI_ENDPOINT, settings.AZURE_OPENAI_API_VER,
+        settings.AZURE_OPENAI_DEPLOYMENT, bool(settings.AZURE_OPENAI_API_KEY),
+    )
     client = AzureOpenAI(
         azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
         api_key=settings.AZURE_OPENAI_API_KEY,
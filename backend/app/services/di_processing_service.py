@@ -1,6 +1,9 @@
 # backend/app/services/di_processing_service.py
+import logging
 from typing import List, Dict, Any, Tuple
 
+logger = logging.getLogger(__name__)
+
 def _structure_di_tables(di_tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Transforms DI tables into a structured list of table objects."""
     structured_tables = []
@@ -98,7 +101,7 @@ def create_structured_document(di_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Takes raw DI data and returns a structured dictionary with processed pages and tables.
     """
-    print("\n=== Structuring page and table content (from di_processing_service) ===")
+    logger.debug("Structuring page and table content")
     structured_tables = _structure_di_tables(di_data.get("tables", []))
     page_content = _extract_text_by_page(di_data.get("pages", []), di_data.get("tables", []))
 
@@ -1,12 +1,83 @@
 # backend/app/services/excel_processing_service.py
 import asyncio
 import datetime
+import logging
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import TYPE_CHECKING, Dict, Any, Tuple, List
 
-import pandas as pd
 from app.models.schemas import ExcelQuery
 
+logger = logging.getLogger(__name__)
+
+DETAIL_COLUMNS = ["Field", "Value", "Unit", "Confidence", "Provenance", "Notes"]
+# Characters Excel does not allow in sheet titles.
+INVALID_SHEET_TITLE_CHARS = str.maketrans({c: "_" for c in " /\\?*[]:"})
+
+# openpyxl is imported where a workbook is opened, so importing the app does not pay for it.
+if TYPE_CHECKING:
+    import openpyxl
+
+@dataclass(frozen=True)
+class ExcelSheet:
+    """
+    The first worksheet of a query workbook, parsed once.
+
+    grid holds the cell values row by row; field_rows and target_cols give the
+    0-based row/column of each query field (column A) and query target (row 1),
+    so the report writer can fill results without re-reading the file.
+    """
+    query: ExcelQuery
+    grid: List[Tuple[Any, ...]]
+    field_rows: Dict[Any, int]
+    target_cols: Dict[Any, int]
+
+def _read_excel_sheet(excel_path: Path) -> ExcelSheet:
+    import openpyxl
+
+    try:
+        # read_only streams rows from the sheet XML instead of building the full cell model
+        workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    except Exception as e:
+        raise IOError(f"Failed to read or parse the Excel file: {e}")
+
+    try:
+        grid = [tuple(row) for row in workbook.worksheets[0].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+    # "Query Fields" are the non-empty values of A1, A2, ...
+    field_rows: Dict[Any, int] = {}
+    for row_idx, row in enumerate(grid):
+        if row and row[0] is not None:
+            field_rows.setdefault(row[0], row_idx)
+
+    # "Query Targets" are the non-empty values of B1, C1, ...
+    target_cols: Dict[Any, int] = {}
+    if grid:
+        for col_idx, value in enumerate(grid[0][1:], start=1):
+            if value is not None:
+                target_cols.setdefault(value, col_idx)
+
+    query = ExcelQuery(
+        query_fields=[row[0] for row in grid if row and row[0] is not None],
+        query_targets=[value for value in (grid[0][1:] if grid else ()) if value is not None],
+    )
+    return ExcelSheet(query=query, grid=grid, field_rows=field_rows, target_cols=target_cols)
+
+async def read_excel_sheet(excel_path: Path) -> ExcelSheet:
+    """
+    Reads the query workbook in a single pass asynchronously.
+
+    Args:
+        excel_path: Path to the Excel file.
+
+    Returns:
+        An ExcelSheet with the ExcelQuery and the cell grid used by write_summary_to_excel.
+    """
+    logger.debug("Reading Excel file: %s", excel_path)
+    return await asyncio.to_thread(_read_excel_sheet, excel_path)
+
 async def get_excel_query_data(excel_path: Path) -> ExcelQuery:
     """
     Reads query data from a single Excel file asynchronously.
@@ -17,113 +88,172 @@ async def get_excel_query_data(excel_path: Path) -> ExcelQuery:
     Returns:
         An ExcelQuery object containing the query data.
     """
-    def read_excel():
-        try:
-            # Read the first row for Query Targets
-            df_row1 = pd.read_excel(excel_path, sheet_name=0, header=None, nrows=1)
-            # Read the first column for Query Fields
-            df_colA = pd.read_excel(excel_path, sheet_name=0, header=None, usecols="A")
-        except Exception as e:
-            raise IOError(f"Failed to read or parse the Excel file: {e}")
-        
-        # Get "Query Fields" (non-empty values from A1, A2, ...)
-        query_fields = df_colA.iloc[:, 0].dropna().tolist()
+    return (await read_excel_sheet(excel_path)).query
 
-        # Get "Query Targets" (non-empty values from B1, C1, ...)
-        query_targets = df_row1.iloc[0, 1:].dropna().tolist()
+def _load_template(original_excel_path: Path, excel_sheet: ExcelSheet) -> "openpyxl.Workbook | None":
+    """
+    Loads the original workbook with its formatting (a second, full parse:
+    read-only mode drops styles, widths and merged ranges). Skipped (None)
+    above settings.EXCEL_TEMPLATE_MAX_CELLS cells or when the file cannot be
+    loaded; the summary is then streamed from the already-parsed grid.
+    """
+    import openpyxl
+    from app.core.config import settings
+
+    cells = sum(len(row) for row in excel_sheet.grid)
+    if cells > settings.EXCEL_TEMPLATE_MAX_CELLS:
+        logger.info("Query sheet has %d cells, writing the summary without its formatting", cells)
+        return None
+    try:
+        return openpyxl.load_workbook(original_excel_path)
+    except Exception as e:
+        logger.warning("Could not load %s as a template, formatting will not be kept: %s", original_excel_path, e)
+        return None
+
+def _stream_template(workbook: "openpyxl.Workbook", template: "openpyxl.Workbook", fills: Dict[Tuple[int, int], Any]) -> None:
+    """
+    Copies the template's first sheet into a write-only workbook with the
+    values filled in, row by row. Carried over: values and formulas, cell
+    styles, column widths, row heights, merged ranges and frozen panes.
+    """
+    from copy import copy
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import MergedCell
 
-        return ExcelQuery(
-            query_fields=query_fields,
-            query_targets=query_targets
-        )
+    source = template.worksheets[0]
+    summary_sheet = workbook.create_sheet("Summary")
+    for key, dim in source.column_dimensions.items():
+        if dim.width or dim.hidden:
+            summary_sheet.column_dimensions[key].width = dim.width
+            summary_sheet.column_dimensions[key].hidden = dim.hidden
+    for idx, dim in source.row_dimensions.items():
+        if dim.height or dim.hidden:
+            summary_sheet.row_dimensions[idx].height = dim.height
+            summary_sheet.row_dimensions[idx].hidden = dim.hidden
+    for merged in source.merged_cells.ranges:
+        summary_sheet.merged_cells.add(merged.coord)
+    summary_sheet.freeze_panes = source.freeze_panes
 
-    print(f"Reading Excel file: {excel_path}")
-    return await asyncio.to_thread(read_excel)
+    for row_idx, row in enumerate(source.iter_rows()):
+        values = []
+        for col_idx, cell in enumerate(row):
+            if isinstance(cell, MergedCell):
+                values.append(None)
+                continue
+            value = fills.get((row_idx, col_idx), cell.value)
+            if not cell.has_style:
+                values.append(value)
+                continue
+            out = WriteOnlyCell(summary_sheet, value=value)
+            out.font, out.fill, out.border = copy(cell.font), copy(cell.fill), copy(cell.border)
+            out.alignment, out.protection = copy(cell.alignment), copy(cell.protection)
+            out.number_format = cell.number_format
+            values.append(out)
+        summary_sheet.append(values)
+
+def _stream_summary(workbook: "openpyxl.Workbook", excel_sheet: ExcelSheet, fills: Dict[Tuple[int, int], Any]) -> None:
+    """Appends the grid with the values filled in to a write-only workbook, one row at a time."""
+    summary_sheet = workbook.create_sheet("Summary")
+    fills_by_row: Dict[int, Dict[int, Any]] = {}
+    for (row_idx, col_idx), value in fills.items():
+        fills_by_row.setdefault(row_idx, {})[col_idx] = value
+    for row_idx, row in enumerate(excel_sheet.grid):
+        row_fills = fills_by_row.get(row_idx)
+        if row_fills:
+            row = list(row) + [None] * (max(row_fills) + 1 - len(row))
+            for col_idx, value in row_fills.items():
+                row[col_idx] = value
+        summary_sheet.append(row)
+
+def _detail_sheet_title(target_pn: str) -> str:
+    return str(target_pn).translate(INVALID_SHEET_TITLE_CHARS)[:31]
+
+def _cell_value(value: Any) -> Any:
+    return str(value) if isinstance(value, (dict, list)) else value
 
 async def write_summary_to_excel(
     original_excel_path: Path, 
     query_data: ExcelQuery, 
     aoai_result: Dict[str, Any], 
-    output_dir: Path
+    output_dir: Path,
+    excel_sheet: ExcelSheet | None = None
 ) -> Path:
     """
     Writes the AOAI extraction result to a new Excel file asynchronously.
-    The first sheet is a summary, and subsequent sheets contain details for each target_pn.
+    The first sheet is the original query sheet with the values filled in (its
+    formatting is kept unless the sheet is over EXCEL_TEMPLATE_MAX_CELLS), and
+    subsequent sheets contain details for each target_pn. Every sheet is
+    written in write-only mode.
     
     Args:
         original_excel_path: Path to the original Excel file.
         query_data: The ExcelQuery object with fields and targets.
         aoai_result: The dictionary result from the AOAI service.
         output_dir: The directory to save the output file in.
+        excel_sheet: The already-parsed original sheet; read from original_excel_path if omitted.
 
     Returns:
         The path to the newly created summary Excel file.
     """
+    if excel_sheet is None:
+        excel_sheet = await read_excel_sheet(original_excel_path)
+
     def write_excel():
+        import openpyxl
+
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
         output_filename = f"summary_{timestamp}.xlsx"
         output_excel_path = output_dir / output_filename
         
-        print(f"\nWriting results to {output_excel_path}...")
+        logger.debug("Writing results to %s", output_excel_path)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        try:
-            original_df = pd.read_excel(original_excel_path, sheet_name=0, header=None)
-        except Exception as e:
-            print(f"[ERROR] Could not read original Excel file {original_excel_path}: {e}")
-            raise
+        wanted_fields, wanted_pns = set(query_data.query_fields), set(query_data.query_targets)
+        field_to_row_idx = {field: row for field, row in excel_sheet.field_rows.items() if field in wanted_fields}
+        pn_to_col_idx = {pn: col for pn, col in excel_sheet.target_cols.items() if pn in wanted_pns}
 
-        field_to_row_idx = {field: i for i, field in enumerate(query_data.query_fields)}
-        pn_to_col_idx = {pn: i + 1 for i, pn in enumerate(query_data.query_targets)}
-        
-        summary_df = original_df.copy()
-
-        # --- Resize DataFrame if necessary ---
-        max_row_needed = max(field_to_row_idx.values()) if field_to_row_idx else 0
-        max_col_needed = max(pn_to_col_idx.values()) if pn_to_col_idx else 0
-        current_rows, current_cols = summary_df.shape
-
-        if max_row_needed >= current_rows:
-            summary_df = summary_df.reindex(range(max_row_needed + 1), axis=0)
-        if max_col_needed >= current_cols:
-            summary_df = summary_df.reindex(range(max_col_needed + 1), axis=1)
-
-        # --- Fill Summary Sheet ---
+        # 0-based (row, column) -> extracted value on the summary sheet
+        fills: Dict[Tuple[int, int], Any] = {}
         for doc in aoai_result.get("documents", []):
             target_pn = doc.get("target_pn")
             if target_pn in pn_to_col_idx:
-                col_idx = pn_to_col_idx[target_pn]
                 for item in doc.get("items", []):
                     field = item.get("field")
-                    value = item.get("value")
                     if field in field_to_row_idx:
-                        row_idx = field_to_row_idx[field]
-                        summary_df.iloc[row_idx, col_idx] = str(value) if isinstance(value, (dict, list)) else value
-
-        # --- Write to Excel file ---
-        with pd.ExcelWriter(output_excel_path, engine='openpyxl') as writer:
-            summary_df.to_excel(writer, sheet_name='Summary', index=False, header=False)
-
-            for doc in aoai_result.get("documents", []):
-                target_pn = doc.get("target_pn")
-                if not target_pn:
-                    continue
-                
-                detail_data = [
-                    {
-                        "Field": item.get("field", ""),
-                        "Value": item.get("value", "N/A"),
-                        "Unit": item.get("unit"),
-                        "Confidence": item.get("confidence", 0.0),
-                        "Provenance": item.get("provenance", ""),
-                        "Notes": item.get("notes", "")
-                    } for item in doc.get("items", [])
-                ]
-                detail_df = pd.DataFrame(detail_data)
-                sheet_name = target_pn.replace(" ", "_").replace("/", "_")[:31]
-                detail_df.to_excel(writer, sheet_name=sheet_name, index=False)
+                        fills[(field_to_row_idx[field], pn_to_col_idx[target_pn])] = _cell_value(item.get("value"))
+
+        # Output rows are streamed (write-only), so memory does not grow with
+        # the number of PNs; only the template's first sheet is held.
+        workbook = openpyxl.Workbook(write_only=True)
+        template = _load_template(original_excel_path, excel_sheet)
+        if template is not None:
+            _stream_template(workbook, template, fills)
+            template.close()
+        else:
+            _stream_summary(workbook, excel_sheet, fills)
+
+        # --- Stream one detail sheet per PN, row by row ---
+        for doc in aoai_result.get("documents", []):
+            target_pn = doc.get("target_pn")
+            if not target_pn:
+                continue
+
+            detail_sheet = workbook.create_sheet(title=_detail_sheet_title(target_pn))
+            detail_sheet.append(DETAIL_COLUMNS)
+            for item in doc.get("items", []):
+                detail_sheet.append([
+                    _cell_value(item.get("field", "")),
+                    _cell_value(item.get("value", "N/A")),
+                    _cell_value(item.get("unit")),
+                    _cell_value(item.get("confidence", 0.0)),
+                    _cell_value(item.get("provenance", "")),
+                    _cell_value(item.get("notes", "")),
+                ])
+
+        workbook.save(output_excel_path)
+        workbook.close()
         
-        print(f"  - Successfully wrote results to {output_excel_path}")
+        logger.info("Wrote results to %s", output_excel_path)
         return output_excel_path
 
     return await asyncio.to_thread(write_excel)
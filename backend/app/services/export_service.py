@@ -0,0 +1,113 @@
+# backend/app/services/export_service.py
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # In requirements.txt; only a partial dev install lacks it (NDJSON only)
+    pa = None
+    pq = None
+
+# One row per documents[].items[] entry of the AOAI result.
+EXPORT_COLUMNS = [
+    "job_id", "target_pn", "item_index", "field", "value", "value_number",
+    "unit", "confidence", "provenance", "notes", "source_excerpt",
+]
+
+def _value_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+def _value_number(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+def _confidence(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def iter_result_rows(job_id: str, aoai_result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Flattens an AOAI result into one record per extracted item."""
+    for doc in aoai_result.get("documents", []):
+        target_pn = doc.get("target_pn")
+        for index, item in enumerate(doc.get("items", [])):
+            value = item.get("value")
+            yield {
+                "job_id": job_id,
+                "target_pn": None if target_pn is None else str(target_pn),
+                "item_index": index,
+                "field": None if item.get("field") is None else str(item.get("field")),
+                "value": _value_text(value),
+                "value_number": _value_number(value),
+                "unit": _value_text(item.get("unit")),
+                "confidence": _confidence(item.get("confidence")),
+                "provenance": _value_text(item.get("provenance")),
+                "notes": _value_text(item.get("notes")),
+                "source_excerpt": _value_text(item.get("source_excerpt")),
+            }
+
+def _parquet_schema():
+    return pa.schema([
+        ("job_id", pa.string()),
+        ("target_pn", pa.string()),
+        ("item_index", pa.int32()),
+        ("field", pa.string()),
+        ("value", pa.string()),
+        ("value_number", pa.float64()),
+        ("unit", pa.string()),
+        ("confidence", pa.float64()),
+        ("provenance", pa.string()),
+        ("notes", pa.string()),
+        ("source_excerpt", pa.string()),
+    ])
+
+def _write_exports(job_id: str, aoai_result: Dict[str, Any], output_dir: Path) -> Dict[str, Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rows: List[Dict[str, Any]] = list(iter_result_rows(job_id, aoai_result))
+    exports: Dict[str, Path] = {}
+
+    ndjson_path = output_dir / "results.ndjson"
+    with open(ndjson_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write("\n")
+    exports["ndjson"] = ndjson_path
+
+    if pa is not None:
+        parquet_path = output_dir / "results.parquet"
+        table = pa.Table.from_pylist(rows, schema=_parquet_schema())
+        pq.write_table(table, parquet_path, compression="zstd")
+        exports["parquet"] = parquet_path
+    else:
+        logger.warning("pyarrow is not installed (see requirements.txt); skipping Parquet export.")
+
+    return exports
+
+async def write_result_exports(job_id: str, aoai_result: Dict[str, Any], output_dir: Path) -> Dict[str, Path]:
+    """
+    Writes the extraction results as NDJSON and, when pyarrow is available,
+    as a Parquet table, next to the summary workbook.
+
+    Returns:
+        A mapping of format name ("ndjson", "parquet") to the written file.
+    """
+    return await asyncio.to_thread(_write_exports, job_id, aoai_result, output_dir)
@@ -1,15 +1,69 @@
+import base64
+import binascii
+import re
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from bson import ObjectId
+from pymongo import UpdateOne
 from app.db.mongo import get_db
 from app.models.schemas import Part, SpecItem, SourceFile
+from app.utils.normalize import normalize_string
+
+def build_spec_upsert_ops(partNo: str, specs: List[Dict[str, Any]], current_time: datetime) -> List[UpdateOne]:
+    """
+    Builds the ordered bulk_write operations that upsert `specs` (keyed by
+    spec "key") into one part. Each spec costs two small updates: a $push
+    guarded by $ne that matches only if the key is missing, then a positional
+    replace of the element with that key, so concurrent edits to other specs
+    of the same part are never overwritten.
+
+    The push comes first so that when two writers add the same new key at
+    once, the one whose push loses the race still writes its value through
+    the positional replace (last writer wins instead of a lost update).
+    """
+    operations = [
+        UpdateOne(
+            {"partNo": partNo},
+            {
+                "$set": {"updatedAt": current_time},
+                "$setOnInsert": {"manufacturer": None, "specs": [], "createdAt": current_time},
+            },
+            upsert=True,
+        )
+    ]
+    for spec in specs:
+        operations.append(UpdateOne({"partNo": partNo, "specs.key": {"$ne": spec["key"]}}, {"$push": {"specs": spec}}))
+        operations.append(UpdateOne({"partNo": partNo, "specs.key": spec["key"]}, {"$set": {"specs.$": spec}}))
+    return operations
+
+# Fields a parts listing may project; anything under specs is opt-in so list
+# views do not pull whole spec arrays.
+LISTABLE_FIELDS = {
+    "partNo", "manufacturer", "createdAt", "updatedAt",
+    "specs", "specs.key", "specs.value", "specs.unit", "specs.status",
+}
+DEFAULT_LIST_FIELDS = ["partNo", "manufacturer", "updatedAt"]
+SPEC_FIELDS = set(SpecItem.model_fields)
+# Defaults of the optional Part/SpecItem fields, applied to raw documents
+PART_DEFAULTS = {"manufacturer": None, "specs": []}
+SPEC_DEFAULTS = {"unit": None, "aliases": [], "sourceFiles": [], "notes": None}
+
+def encode_cursor(partNo: str) -> str:
+    return base64.urlsafe_b64encode(partNo.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> str:
+    """Raises ValueError for a cursor that was not produced by encode_cursor."""
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
 
 class PartsRepository:
     def __init__(self):
         self.collection = get_db()["parts"]
 
     async def get_part(self, partNo: str) -> Part | None:
-        part_data = await self.collection.find_one({"partNo": partNo})
+        part_data = await self.collection.find_one({"partNo": self._normalize_string(partNo)})
         if part_data:
             # Convert _id to str for Pydantic compatibility if needed
             if "_id" in part_data: # Ensure _id is handled if present
@@ -18,75 +72,137 @@ class PartsRepository:
             return Part(**part_data)
         return None
 
+    async def get_part_document(self, partNo: str) -> Dict[str, Any] | None:
+        """
+        Returns a part as a plain dict shaped like the Part model (optional
+        fields filled with their defaults) without validating it, for
+        responses that serialize documents we wrote ourselves.
+        """
+        part_data = await self.collection.find_one({"partNo": self._normalize_string(partNo)}, {"_id": 0})
+        if part_data is None:
+            return None
+        part = {**PART_DEFAULTS, **part_data}
+        part["specs"] = [{**SPEC_DEFAULTS, **spec} for spec in part["specs"] or []]
+        return part
+
+    async def get_part_view(self, partNo: str, keys: List[str] | None = None, fields: List[str] | None = None) -> Dict[str, Any] | None:
+        """
+        Returns a part as a plain dict with only the requested specs (by
+        canonical key) and spec fields. The filtering runs server-side in an
+        aggregation, so unrequested specs are never sent or validated.
+        Raises ValueError for an unknown spec field.
+        """
+        if fields:
+            unknown = [f for f in fields if f not in SPEC_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown spec fields: {', '.join(unknown)}")
+
+        specs: Any = "$specs"
+        if keys is not None:
+            specs = {"$filter": {"input": {"$ifNull": ["$specs", []]}, "as": "s", "cond": {"$in": ["$$s.key", keys]}}}
+        if fields:
+            # key always identifies the spec; missing fields stay absent
+            spec_fields = ["key"] + [f for f in fields if f != "key"]
+            specs = {"$map": {"input": {"$ifNull": [specs, []]}, "as": "s", "in": {f: f"$$s.{f}" for f in spec_fields}}}
+
+        pipeline = [
+            {"$match": {"partNo": self._normalize_string(partNo)}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "partNo": 1, "manufacturer": 1, "createdAt": 1, "updatedAt": 1, "specs": specs}},
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(1)
+        return docs[0] if docs else None
+
+    async def get_parts(self, partNos: List[str]) -> Dict[str, Part]:
+        """Loads several parts in one query, keyed by normalized partNo."""
+        normalized = list({self._normalize_string(p) for p in partNos})
+        parts: Dict[str, Part] = {}
+        async for part_data in self.collection.find({"partNo": {"$in": normalized}}, {"_id": 0}):
+            parts[part_data["partNo"]] = Part(**part_data)
+        return parts
+
+    async def list_parts(
+        self,
+        prefix: str | None = None,
+        spec_key: str | None = None,
+        status: str | None = None,
+        cursor: str | None = None,
+        limit: int = 50,
+        fields: List[str] | None = None,
+    ) -> Tuple[List[Dict[str, Any]], str | None]:
+        """
+        Lists parts ordered by partNo, `limit` at a time.
+
+        Pagination is keyset-based: the returned cursor encodes the last
+        partNo and the next page starts after it, so every page is an index
+        range scan on partNo however deep the client pages. Raises ValueError
+        for an unknown field or a malformed cursor.
+        """
+        fields = fields or DEFAULT_LIST_FIELDS
+        unknown = [f for f in fields if f not in LISTABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        part_filter: Dict[str, Any] = {}
+        partNo_filter: Dict[str, Any] = {}
+        if prefix:
+            partNo_filter["$regex"] = "^" + re.escape(self._normalize_string(prefix))
+        if cursor:
+            partNo_filter["$gt"] = decode_cursor(cursor)
+        if partNo_filter:
+            part_filter["partNo"] = partNo_filter
+        if spec_key and status:
+            part_filter["specs"] = {"$elemMatch": {"key": self._normalize_string(spec_key), "status": status}}
+        elif spec_key:
+            part_filter["specs.key"] = self._normalize_string(spec_key)
+        elif status:
+            part_filter["specs.status"] = status
+
+        projection = {"_id": 0, "partNo": 1, **{f: 1 for f in fields}}
+        # A "specs" projection supersedes projections of its sub-fields.
+        if "specs" in fields:
+            projection = {k: v for k, v in projection.items() if not k.startswith("specs.")}
+
+        # Fetch one extra document to know whether another page exists.
+        docs = await self.collection.find(part_filter, projection).sort("partNo", 1).limit(limit + 1).to_list(limit + 1)
+        next_cursor = encode_cursor(docs[limit - 1]["partNo"]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
     async def upsert_specs(self, partNo: str, items: List[SpecItem], actor: str, sourceFilename: str | None = None):
+        await self.bulk_upsert_specs({partNo: items}, actor, sourceFilename)
+
+    async def bulk_upsert_specs(self, updates: Dict[str, List[SpecItem]], actor: str, sourceFilename: str | None = None):
+        """
+        Upserts specs across several parts ({partNo: specs}) in one ordered
+        round trip, without reading the parts.
+        """
         current_time = datetime.now()
+        operations: List[UpdateOne] = []
+        for partNo, items in updates.items():
+            if not items:
+                continue
+            specs_to_upsert = [self._spec_document(item, actor, sourceFilename, current_time) for item in items]
+            # Create the part if needed, then per spec append it if missing
+            # and replace the matching array element.
+            operations.extend(build_spec_upsert_ops(self._normalize_string(partNo), specs_to_upsert, current_time))
+        if operations:
+            await self.collection.bulk_write(operations, ordered=True)
+
+    def _spec_document(self, item: SpecItem, actor: str, sourceFilename: str | None, current_time: datetime) -> Dict[str, Any]:
+        spec_data = item.model_dump(exclude_unset=True) # Use model_dump for Pydantic v2
+        spec_data["key"] = self._normalize_string(item.key)
+        spec_data["aliases"] = [self._normalize_string(alias) for alias in item.aliases]
+        spec_data["lastUpdatedAt"] = current_time
+        spec_data["lastUpdatedBy"] = actor
 
-        # Normalize partNo
-        normalized_partNo = self._normalize_string(partNo)
-
-        # Prepare specs for update
-        specs_to_upsert = []
-        for item in items:
-            normalized_key = self._normalize_string(item.key)
-            normalized_aliases = [self._normalize_string(alias) for alias in item.aliases]
-
-            spec_data = item.model_dump(exclude_unset=True) # Use model_dump for Pydantic v2
-            spec_data["key"] = normalized_key
-            spec_data["aliases"] = normalized_aliases
-            spec_data["lastUpdatedAt"] = current_time
-            spec_data["lastUpdatedBy"] = actor
-            
-            if sourceFilename:
-                source_file = SourceFile(filename=sourceFilename, uploadedAt=current_time)
-                # Check if sourceFiles already exists and append, otherwise create list
-                if "sourceFiles" in spec_data and isinstance(spec_data["sourceFiles"], list):
-                    spec_data["sourceFiles"].append(source_file.model_dump())
-                else:
-                    spec_data["sourceFiles"] = [source_file.model_dump()]
-
-            specs_to_upsert.append(spec_data)
-
-        # Find existing part or create a new one
-        existing_part = await self.collection.find_one({"partNo": normalized_partNo})
-
-        if existing_part:
-            # Update existing part
-            update_fields = {"updatedAt": current_time}
-            for new_spec in specs_to_upsert:
-                # Find if spec with same key exists
-                found = False
-                for i, existing_spec in enumerate(existing_part.get("specs", [])):
-                    if existing_spec["key"] == new_spec["key"]:
-                        # Update existing spec
-                        existing_part["specs"][i] = new_spec
-                        found = True
-                        break
-                if not found:
-                    # Add new spec
-                    existing_part.setdefault("specs", []).append(new_spec)
-            
-            update_fields["specs"] = existing_part["specs"]
-            await self.collection.update_one(
-                {"partNo": normalized_partNo},
-                {"$set": update_fields}
-            )
-        else:
-            # Create new part
-            new_part = Part(
-                partNo=normalized_partNo,
-                specs=specs_to_upsert,
-                createdAt=current_time,
-                updatedAt=current_time
-            )
-            await self.collection.insert_one(new_part.model_dump())
+        if sourceFilename:
+            source_file = SourceFile(filename=sourceFilename, uploadedAt=current_time)
+            # Check if sourceFiles already exists and append, otherwise create list
+            if "sourceFiles" in spec_data and isinstance(spec_data["sourceFiles"], list):
+                spec_data["sourceFiles"].append(source_file.model_dump())
+            else:
+                spec_data["sourceFiles"] = [source_file.model_dump()]
+        return spec_data
 
     def _normalize_string(self, text: str) -> str:
-        # Trim whitespace
-        text = text.strip()
-        # Convert to lowercase
-        text = text.lower()
-        # Replace multiple spaces with a single space
-        text = " ".join(text.split())
-        # Remove spaces around parentheses
-        text = text.replace(" (", "(").replace(") ", ")")
-        return text
+        return normalize_string(text)
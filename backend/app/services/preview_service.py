@@ -0,0 +1,99 @@
+# backend/app/services/preview_service.py
+import asyncio
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+# (resolved path, mtime_ns, size) -> sha256 of the file
+_digest_cache: "OrderedDict[tuple[str, int, int], str]" = OrderedDict()
+# (digest, sheet, offset, limit) -> page
+_page_cache: "OrderedDict[tuple[str, str | None, int, int], Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_get(cache: OrderedDict, key):
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+def _cache_put(cache: OrderedDict, key, value, max_entries: int) -> None:
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+def _file_digest(file_path: Path) -> str:
+    stat = file_path.stat()
+    cache_key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+    digest = _cache_get(_digest_cache, cache_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        _cache_put(_digest_cache, cache_key, digest, settings.PREVIEW_CACHE_SIZE)
+    return digest
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+def _read_window(file_path: Path, sheet: str | None, offset: int, limit: int) -> Dict[str, Any]:
+    import openpyxl  # Imported on first preview rather than at app import
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet_names = workbook.sheetnames
+        if sheet is None:
+            worksheet = workbook.worksheets[0]
+        elif sheet in sheet_names:
+            worksheet = workbook[sheet]
+        else:
+            raise KeyError(sheet)
+
+        # Read one extra row to know whether another page exists; rows before
+        # offset are skipped by the streaming reader without building cells.
+        rows: List[List[Any]] = [
+            [_json_value(v) for v in row]
+            for row in worksheet.iter_rows(min_row=offset + 1, max_row=offset + limit + 1, values_only=True)
+        ]
+    finally:
+        workbook.close()
+
+    return {
+        "sheets": sheet_names,
+        "sheet": worksheet.title,
+        "offset": offset,
+        "limit": limit,
+        "rows": rows[:limit],
+        "has_more": len(rows) > limit,
+    }
+
+def _get_window(file_path: Path, sheet: str | None, offset: int, limit: int) -> Dict[str, Any]:
+    cache_key = (_file_digest(file_path), sheet, offset, limit)
+    page = _cache_get(_page_cache, cache_key)
+    if page is None:
+        page = _read_window(file_path, sheet, offset, limit)
+        _cache_put(_page_cache, cache_key, page, settings.PREVIEW_CACHE_SIZE)
+    return page
+
+async def get_sheet_window(file_path: Path, sheet: str | None = None, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """
+    Returns rows [offset, offset + limit) of a worksheet as JSON-ready lists.
+
+    Only the requested window is materialised, and pages are cached per file
+    digest, so repeated requests for the same result file skip the Excel parse.
+    Raises KeyError if the sheet does not exist.
+    """
+    return await asyncio.to_thread(_get_window, file_path, sheet, offset, limit)
@@ -4,25 +4,35 @@ from pathlib import Path
 from typing import List
 import traceback
 
-from app.core.job_manager import job_statuses
+from app.core.job_manager import get_job_dirs, job_statuses
+from app.core.logging_config import job_id_var
+from app.core.metrics import StageTimer, jobs_in_flight, jobs_queued
+from app.core.profiling import job_profile_path, profile_call
 from app.core.storage import storage_service
-from app.services.aoai_processing_service import process_aoai_job
 
 logger = logging.getLogger(__name__)
 
-async def process_files(job_id: str, excel_paths: List[Path], pdf_paths: List[Path], job_type: str) -> None:
+async def process_files(job_id: str, excel_paths: List[Path], pdf_paths: List[Path], job_type: str, profile: bool = False) -> None:
     """
     Orchestrates the file processing job, updating status via polling or SSE.
+    Stage timings (seconds) are kept on the job record under "timings".
+    With profile=True the AOAI run is sampled into the job's profile.collapsed.
     """
+    # This runs in its own task, so the job id tags every record logged for
+    # the job (including from to_thread calls) without being reset.
+    job_id_var.set(job_id)
+    jobs_queued.dec(kind="value")
+    timer = StageTimer("value")
     
     async def update_status(message: str):
         """Helper to send status updates based on job type."""
-        logger.info(f"[{job_id}] Status: {message}")
+        logger.info("Status: %s", message)
         if job_type == "polling":
-            job_statuses[job_id] = {"status": "processing", "message": message, "download_url": None, "query_fields": None, "query_targets": None}
+            job_statuses[job_id] = {"status": "processing", "message": message, "download_url": None, "query_fields": None, "query_targets": None, "timings": dict(timer.timings)}
 
+    jobs_in_flight.inc(kind="value")
     try:
-        logger.info(f"[process_files] Start job_id={job_id}, job_type={job_type}")
+        logger.info("[process_files] Start job_type=%s", job_type)
         await update_status("已接受工作，開始處理…")
 
         # --- 1. Validate Input Files ---
@@ -34,30 +44,48 @@ async def process_files(job_id: str, excel_paths: List[Path], pdf_paths: List[Pa
             raise ValueError("至少需要提供 1 個 PDF 檔案。")
 
         # --- 2. Call the Core Processing Service ---
+        # Imported per job: the pipeline pulls in openpyxl and pyarrow, which
+        # the web process should not load just to serve other routes.
+        from app.services.aoai_processing_service import process_aoai_job
+
         # The core service will handle all steps and use the callback to report progress.
-        final_excel_path = await process_aoai_job(
+        job_run = process_aoai_job(
             job_id=job_id,
             pdf_paths=pdf_paths,
             excel_path=excel_path,
-            update_status=update_status
+            update_status=update_status,
+            timer=timer
         )
+        if profile:
+            job_run = profile_call(job_profile_path(get_job_dirs(job_id).base), job_run)
+        job_result = await job_run
 
         # --- 3. Finalize Job ---
-        download_url = storage_service.make_downloadable(final_excel_path)
+        download_url = await storage_service.make_downloadable(job_result.summary_path)
+        exports = {
+            fmt: await storage_service.make_downloadable(path)
+            for fmt, path in job_result.export_paths.items()
+        }
         final_result = {
             "message": "處理完成",
             "status": "done",
             "download_url": download_url,
+            "exports": exports,
         }
+        timer.finish("done")
+        final_result["timings"] = timer.timings
 
         if job_type == "polling":
             job_statuses[job_id] = final_result
         
-        logger.info(f"[process_files] Done job_id={job_id}")
+        logger.info("[process_files] Done")
 
     except Exception as e:
-        logger.exception(f"[process_files] Fail job_id={job_id} err={e}")
-        error_message = {"message": f"處理失敗：{e}", "status": "error", "details": traceback.format_exc()}
+        logger.exception("[process_files] Fail err=%s", e)
+        timer.finish("error")
+        error_message = {"message": f"處理失敗：{e}", "status": "error", "details": traceback.format_exc(), "timings": timer.timings}
         
         if job_type == "polling":
             job_statuses[job_id] = error_message
+    finally:
+        jobs_in_flight.dec(kind="value")
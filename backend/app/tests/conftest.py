@@ -0,0 +1,113 @@
+import re
+
+import pytest
+
+class FakeCursor:
+    """Async cursor over a list of documents, as returned by find() and aggregate()."""
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def sort(self, field, direction=1):
+        self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class FakeCollection:
+    """
+    In-memory stand-in for a Motor collection. Supports the query subset the
+    repositories use (equality, $gt, $regex; top-level projections and
+    $set/$setOnInsert/$inc/$addToSet updates) and records every call.
+    """
+    def __init__(self, name="", docs=None):
+        self.name = name
+        self.docs = list(docs or [])
+        self.finds = []
+        self.pipelines = []
+        self.batches = []
+        self.ordered = []
+
+    @staticmethod
+    def _matches(doc, flt):
+        for field, cond in (flt or {}).items():
+            value = doc.get(field)
+            if not isinstance(cond, dict):
+                if value != cond:
+                    return False
+                continue
+            for op, arg in cond.items():
+                if op == "$gt" and not (value is not None and value > arg):
+                    return False
+                if op == "$regex" and not (value is not None and re.match(arg, value)):
+                    return False
+                if op not in ("$gt", "$regex"):
+                    raise NotImplementedError(op)
+        return True
+
+    @staticmethod
+    def _project(doc, projection):
+        included = [k for k, v in (projection or {}).items() if v and k != "_id"]
+        if not included:
+            return {k: v for k, v in doc.items() if k != "_id" or (projection or {}).get("_id", 1)}
+        return {k: doc[k] for k in included if k in doc}
+
+    def find(self, flt=None, projection=None, **kwargs):
+        self.finds.append((flt, projection))
+        return FakeCursor(self._project(d, projection) for d in self.docs if self._matches(d, flt))
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeCursor(self.docs)
+
+    async def find_one(self, flt, projection=None):
+        return next((self._project(d, projection) for d in self.docs if self._matches(d, flt)), None)
+
+    async def update_one(self, flt, update, upsert=False):
+        doc = next((d for d in self.docs if self._matches(d, flt)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = {k: v for k, v in flt.items() if not isinstance(v, dict)}
+            doc.update(update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+        doc.update(update.get("$set", {}))
+        for field, inc in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + inc
+        for field, values in update.get("$addToSet", {}).items():
+            existing = doc.setdefault(field, [])
+            values = values["$each"] if isinstance(values, dict) else [values]
+            existing.extend(v for v in values if v not in existing)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+        self.ordered.append(ordered)
+        for op in operations:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+class FakeDb(dict):
+    """Creates an empty FakeCollection on first access, like a Motor database."""
+    def __missing__(self, name):
+        self[name] = FakeCollection(name)
+        return self[name]
+
+@pytest.fixture
+def fake_db():
+    return FakeDb()
@@ -0,0 +1,45 @@
+import pytest
+
+from app.services import aliases_repo
+from app.services.alias_cache import AliasCache
+from app.services.aliases_repo import AliasesRepository
+from app.models.schemas import FieldAlias
+
+@pytest.fixture
+def db(monkeypatch, fake_db):
+    fake_db["field_aliases"].docs.append({"canonical": "ovp", "aliases": ["ovp", "over voltage protection"]})
+    monkeypatch.setattr(aliases_repo, "get_db", lambda: fake_db)
+    monkeypatch.setattr(aliases_repo, "alias_cache", AliasCache(check_interval=0))
+    return fake_db
+
+@pytest.mark.asyncio
+async def test_resolve_uses_cached_table(db):
+    repo = AliasesRepository()
+    assert await repo.resolve(["Over Voltage  Protection", "OVP", "unknown"]) == {
+        "Over Voltage  Protection": "ovp", "OVP": "ovp", "unknown": None,
+    }
+    await repo.resolve(["ovp"])
+    # The version is rechecked, but the unchanged table is not reloaded.
+    assert len(db["field_aliases"].finds) == 1
+
+@pytest.mark.asyncio
+async def test_batch_upsert_bumps_version_for_other_workers(db):
+    worker_a, worker_b = AliasesRepository(), AliasesRepository()
+    other_cache = AliasCache(check_interval=0)
+    assert (await other_cache.get_mapping(db)).get("vin") is None
+
+    await worker_a.batch_upsert([FieldAlias(canonical="VIN", aliases=["Input Voltage"])])
+
+    assert await worker_b.resolve(["input voltage"]) == {"input voltage": "vin"}
+    # A cache in another process notices the bumped version on its next check.
+    assert (await other_cache.get_mapping(db))["input voltage"] == "vin"
+    assert other_cache.version == 1
+
+@pytest.mark.asyncio
+async def test_resolve_fuzzy_falls_back_to_closest_alias(db):
+    repo = AliasesRepository()
+    assert await repo.resolve(["Over-voltage protect."]) == {"Over-voltage protect.": None}
+    assert await repo.resolve(["Over-voltage protect.", "xyz"], fuzzy=True) == {"Over-voltage protect.": "ovp", "xyz": None}
+
+    suggestions = await repo.suggest("voltage prot")
+    assert suggestions[0].canonical == "ovp"
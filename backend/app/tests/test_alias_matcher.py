@@ -0,0 +1,30 @@
+from app.services.alias_matcher import TrigramIndex, trigrams
+
+ALIASES = {
+    "over charge release voltage": "ovp_release",
+    "ovp release": "ovp_release",
+    "over voltage protection": "ovp",
+    "ovp": "ovp",
+    "input voltage": "vin",
+}
+
+def test_trigrams_ignore_case_and_punctuation():
+    assert trigrams("Over-charge  Volt.") == trigrams("over charge volt")
+    assert trigrams("  ") == set()
+
+def test_search_ranks_closest_canonical_first():
+    index = TrigramIndex(ALIASES)
+    matches = index.search("Over-charge release volt.", limit=3)
+
+    assert matches[0].canonical == "ovp_release"
+    assert matches[0].alias == "over charge release voltage"
+    assert matches[0].score > 0.8
+    # One entry per canonical key, best-scoring alias only.
+    assert len({m.canonical for m in matches}) == len(matches)
+    assert [m.score for m in matches] == sorted((m.score for m in matches), reverse=True)
+
+def test_search_min_score_and_no_overlap():
+    index = TrigramIndex(ALIASES)
+    assert index.search("input voltage", min_score=0.99)[0].canonical == "vin"
+    assert index.search("zzzz") == []
+    assert index.search("over", min_score=0.95) == []
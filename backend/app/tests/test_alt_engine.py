@@ -0,0 +1,101 @@
+import time
+import numpy as np
+import pytest
+
+from app.services.alt_engine import SpecIndex, parse_numeric_spec
+
+def _part(part_no, **specs):
+    return {
+        "partNo": part_no,
+        "specs": [{"key": k, "value": v, "unit": u, "status": "confirmed"} for k, (v, u) in specs.items()],
+    }
+
+@pytest.mark.parametrize("value, unit, expected", [
+    (4.25, "V", 4.25),
+    ("4250", "mV", 4.25),
+    ("4.25V", None, 4.25),
+    ("150 mA", None, 0.15),
+    ("-40 to 85", "°C", 22.5),
+    ("DFN-8", None, None),
+    ("3 cells in series", None, None),
+    (True, None, None),
+])
+def test_parse_numeric_spec(value, unit, expected):
+    result = parse_numeric_spec(value, unit)
+    assert result == pytest.approx(expected) if expected is not None else result is None
+
+def test_rank_orders_by_weighted_distance():
+    index = SpecIndex.from_parts([
+        _part("target", ovp=("4.25", "V"), iq=("3", "uA"), package=("DFN-8", None)),
+        _part("close", ovp=("4.26", "V"), iq=("3.1", "uA"), package=("DFN-8", None)),
+        _part("far", ovp=("3.60", "V"), iq=("9", "uA"), package=("SOT-23", None)),
+        _part("partial", ovp=("4250", "mV")),
+        _part("unrelated", vin=("12", "V")),
+    ])
+
+    ranked = index.rank("target", keys=["ovp", "iq", "package"], top_n=10)
+    assert [c.part_no for c in ranked] == ["close", "partial", "far"]
+    assert ranked[0].score > 0.9
+    assert ranked[1].compared_keys == 1
+
+    # Weighting only the over-voltage threshold puts the exact match first.
+    weighted = index.rank("target", keys=["ovp", "iq", "package"], weights={"ovp": 100.0, "iq": 0.1, "package": 0.1})
+    assert weighted[0].part_no == "partial"
+
+def test_rank_unknown_target_or_keys():
+    index = SpecIndex.from_parts([_part("a", ovp=("4.2", "V")), _part("b", ovp=("4.3", "V"))])
+    assert index.rank("missing") == []
+    assert index.rank("a", keys=["not-a-spec"]) == []
+
+def test_rank_ignores_incorrect_specs():
+    parts = [_part("a", ovp=("4.2", "V")), _part("b", ovp=("4.2", "V"))]
+    parts[1]["specs"][0]["status"] = "incorrect"
+    assert SpecIndex.from_parts(parts).rank("a") == []
+
+def test_rank_large_catalog_is_fast():
+    rng = np.random.default_rng(0)
+    n_parts, n_keys = 100_000, 20
+    keys = [f"k{j}" for j in range(n_keys)]
+    numeric = rng.random((n_parts, n_keys), dtype=np.float32)
+    numeric[rng.random((n_parts, n_keys)) < 0.3] = np.nan
+    index = SpecIndex([f"p{i}" for i in range(n_parts)], keys, numeric, np.full((n_parts, n_keys), -1, dtype=np.int32))
+
+    index.rank("p0", keys=keys[:10])
+    start = time.perf_counter()
+    ranked = index.rank("p1", keys=keys[:10], top_n=5)
+    assert time.perf_counter() - start < 0.5
+    assert len(ranked) == 5
+
+class _StreamingCursor:
+    """Supports iteration only: building the index must not load the catalog as a list."""
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, n):
+        return self
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+@pytest.mark.asyncio
+async def test_get_spec_index_streams_projected_parts(monkeypatch):
+    from app.services import alt_engine
+
+    finds = []
+
+    class _Parts:
+        def find(self, flt, projection):
+            finds.append(projection)
+            return _StreamingCursor([_part(f"p{i}", ovp=(str(4 + i / 100), "V")) for i in range(5)])
+
+    monkeypatch.setattr(alt_engine, "INDEX_BUILD_CHUNK", 2)
+    alt_engine.invalidate_spec_index()
+    try:
+        index = await alt_engine.get_spec_index(db={"parts": _Parts()}, max_age_seconds=0)
+    finally:
+        alt_engine.invalidate_spec_index()
+
+    assert index.part_nos == [f"p{i}" for i in range(5)]
+    assert [c.part_no for c in index.rank("p0", top_n=2)] == ["p1", "p2"]
+    assert "specs" not in finds[0] and finds[0]["specs.value"] == 1
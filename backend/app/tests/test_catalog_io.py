@@ -0,0 +1,96 @@
+import io
+import json
+from datetime import datetime
+import pytest
+
+from app.scripts import catalog_io
+from app.scripts.catalog_io import export_catalog, import_catalog, read_ndjson, read_parts_csv
+
+def test_read_parts_csv_groups_adjacent_rows():
+    data = "partNo,key,value,unit,status\nBQ25895,VIN,5,V,\nBQ25895,OVP,4.2,V,edited\nMAX17055,Iq,7,uA,\n"
+    parts = list(read_parts_csv(io.StringIO(data)))
+    assert [p["partNo"] for p in parts] == ["BQ25895", "MAX17055"]
+    assert [s["key"] for s in parts[0]["specs"]] == ["VIN", "OVP"]
+    assert parts[0]["specs"][1]["status"] == "edited"
+
+@pytest.mark.asyncio
+async def test_import_parts_in_unordered_batches(fake_db):
+    lines = "\n".join(
+        json.dumps({"partNo": f" PN-{i} ", "specs": [{"key": "Input  Voltage", "value": 4.25}, {"key": "Cells", "value": 3.0}]})
+        for i in range(5)
+    )
+    written = await import_catalog(fake_db, "parts", read_ndjson(io.StringIO(lines)), batch_size=2)
+
+    assert written == 5
+    assert [len(b) for b in fake_db["parts"].batches] == [2, 2, 1]
+    assert fake_db["parts"].ordered == [False, False, False]
+    op = fake_db["parts"].batches[0][0]
+    assert op._filter == {"partNo": "pn-0"}
+    specs = op._doc["$set"]["specs"]
+    assert [(s["key"], s["value"], s["status"]) for s in specs] == [("input voltage", "4.25", "confirmed"), ("cells", 3, "confirmed")]
+
+@pytest.mark.asyncio
+async def test_import_parts_skips_bad_records_and_keeps_manufacturer(capsys, fake_db):
+    lines = "\n".join([
+        json.dumps({"partNo": "bq25895", "specs": [{"key": "VIN", "value": "5"}, {"key": "OVP", "value": "4.2"}, {"key": "vin", "value": "6"}]}),
+        json.dumps({"specs": [{"key": "vin", "value": "1"}]}),
+        "{not json",
+        json.dumps({"partNo": "max17055", "manufacturer": "ADI", "specs": [{"value": "no key"}]}),
+        json.dumps({"partNo": "max17055", "manufacturer": "ADI"}),
+    ])
+    written = await import_catalog(fake_db, "parts", read_ndjson(io.StringIO(lines)))
+
+    assert written == 2
+    no_manufacturer, with_manufacturer = fake_db["parts"].batches[0]
+    assert "manufacturer" not in no_manufacturer._doc["$set"]
+    assert no_manufacturer._doc["$setOnInsert"]["manufacturer"] is None
+    assert [(s["key"], s["value"]) for s in no_manufacturer._doc["$set"]["specs"]] == [("ovp", "4.2"), ("vin", "6")]
+    assert with_manufacturer._doc["$set"]["manufacturer"] == "ADI"
+    assert "manufacturer" not in with_manufacturer._doc["$setOnInsert"]
+    err = capsys.readouterr().err
+    assert "missing partNo" in err and "invalid JSON" in err and "missing key" in err
+
+@pytest.mark.asyncio
+async def test_import_aliases_bumps_cache_version(monkeypatch, fake_db):
+    bumped = []
+    async def bump(db):
+        bumped.append(db)
+    monkeypatch.setattr(catalog_io.alias_cache, "bump_version", bump)
+
+    await import_catalog(fake_db, "aliases", [{"canonical": "VIN", "aliases": ["Input Voltage"]}])
+
+    op = fake_db["field_aliases"].batches[0][0]
+    assert op._doc == {"$addToSet": {"aliases": {"$each": ["input voltage", "vin"]}}}
+    assert bumped == [fake_db]
+
+@pytest.mark.asyncio
+async def test_export_round_trips_as_ndjson_and_csv(fake_db):
+    part = {"partNo": "bq25895", "manufacturer": "TI", "updatedAt": datetime(2024, 1, 2),
+            "specs": [{"key": "vin", "value": "5", "unit": "V", "status": "confirmed"}]}
+    fake_db["parts"].docs.append(part)
+
+    out = io.StringIO()
+    assert await export_catalog(fake_db, "parts", "ndjson", out) == 1
+    exported = list(read_ndjson(io.StringIO(out.getvalue())))
+    assert exported[0]["updatedAt"] == "2024-01-02T00:00:00"
+
+    out = io.StringIO()
+    await export_catalog(fake_db, "parts", "csv", out)
+    reimported = list(read_parts_csv(io.StringIO(out.getvalue())))
+    assert reimported[0]["partNo"] == "bq25895"
+    assert reimported[0]["specs"][0]["key"] == "vin"
+    assert reimported[0]["manufacturer"] == "TI"
+
+@pytest.mark.asyncio
+async def test_csv_round_trip_keeps_spec_value_types(fake_db):
+    values = [5, -40, "4.25", "5V", "-40 to 85", "007", None]
+    part = {"partNo": "bq25895", "manufacturer": "TI",
+            "specs": [{"key": f"k{i}", "value": v, "unit": "V", "status": "confirmed"} for i, v in enumerate(values)]}
+    fake_db["parts"].docs.append(part)
+    out = io.StringIO()
+    await export_catalog(fake_db, "parts", "csv", out)
+
+    await import_catalog(fake_db, "parts", read_parts_csv(io.StringIO(out.getvalue())))
+
+    specs = fake_db["parts"].batches[0][0]._doc["$set"]["specs"]
+    assert [s["value"] for s in specs] == values
@@ -0,0 +1,72 @@
+import pytest
+from pathlib import Path
+
+from app.core.storage import StorageService
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageService(str(tmp_path), token_secret="test-secret")
+
+def _token(url: str) -> str:
+    return url.rsplit("/", 1)[-1]
+
+@pytest.mark.asyncio
+async def test_download_token_roundtrip(storage, tmp_path):
+    file_path = tmp_path / "jobs" / "job-1" / "output" / "summary.xlsx"
+    file_path.parent.mkdir(parents=True)
+    file_path.write_bytes(b"data")
+
+    url = await storage.make_downloadable(file_path)
+    assert url.startswith("/api/download/")
+    assert storage.resolve_download_path(_token(url)) == file_path.resolve()
+
+@pytest.mark.asyncio
+async def test_download_token_resolves_in_another_instance(storage, tmp_path):
+    file_path = tmp_path / "summary.xlsx"
+    file_path.write_bytes(b"data")
+    token = _token(await storage.make_downloadable(file_path))
+
+    other_worker = StorageService(str(tmp_path), token_secret="test-secret")
+    assert other_worker.resolve_download_path(token) == file_path.resolve()
+
+    wrong_secret = StorageService(str(tmp_path), token_secret="other-secret")
+    assert wrong_secret.resolve_download_path(token) is None
+
+@pytest.mark.asyncio
+async def test_download_token_generated_key_is_shared(tmp_path):
+    file_path = tmp_path / "summary.xlsx"
+    file_path.write_bytes(b"data")
+    token = _token(await StorageService(str(tmp_path)).make_downloadable(file_path))
+    assert StorageService(str(tmp_path)).resolve_download_path(token) == file_path.resolve()
+
+@pytest.mark.asyncio
+async def test_download_token_tampered(storage, tmp_path):
+    file_path = tmp_path / "summary.xlsx"
+    file_path.write_bytes(b"data")
+    token = _token(await storage.make_downloadable(file_path))
+    payload, signature = token.split(".")
+
+    assert storage.resolve_download_path(payload[:-1] + ("A" if payload[-1] != "A" else "B") + "." + signature) is None
+    assert storage.resolve_download_path(payload) is None
+    assert storage.resolve_download_path("not-a-token") is None
+
+@pytest.mark.asyncio
+async def test_download_token_expired(tmp_path):
+    storage = StorageService(str(tmp_path), token_secret="test-secret", token_ttl_seconds=-1)
+    file_path = tmp_path / "summary.xlsx"
+    file_path.write_bytes(b"data")
+    assert storage.resolve_download_path(_token(await storage.make_downloadable(file_path))) is None
+
+@pytest.mark.asyncio
+async def test_download_token_rejects_outside_root(storage, tmp_path):
+    with pytest.raises(ValueError):
+        await storage.make_downloadable(Path("/etc/passwd"))
+
+def test_placeholder_token_secret_is_rejected():
+    from pydantic import ValidationError
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(DOWNLOAD_TOKEN_SECRET="change_me")
+    assert Settings(DOWNLOAD_TOKEN_SECRET="").DOWNLOAD_TOKEN_SECRET is None
+    assert Settings(DOWNLOAD_TOKEN_SECRET="3f9c1e").DOWNLOAD_TOKEN_SECRET == "3f9c1e"
@@ -0,0 +1,125 @@
+import openpyxl
+import pytest
+
+from app.services.excel_processing_service import read_excel_sheet, get_excel_query_data, write_summary_to_excel
+
+@pytest.fixture
+def query_workbook(tmp_path):
+    path = tmp_path / "query.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Item", "PN-A", None, "PN-B"])
+    ws.append(["Overcharge Voltage", None, None, None])
+    ws.append([None, None, None, None])
+    ws.append(["Operating Temp", None, None, None])
+    ws["A1"].font = openpyxl.styles.Font(bold=True)
+    ws.column_dimensions["A"].width = 40
+    wb.create_sheet("Notes")
+    wb.save(path)
+    return path
+
+AOAI_RESULT = {
+    "documents": [
+        {
+            "target_pn": "PN-A",
+            "items": [
+                {"field": "Overcharge Voltage", "value": 4.25, "unit": "V", "confidence": 0.9, "provenance": "p1"},
+                {"field": "Operating Temp", "value": "-40 to 85", "unit": "°C"},
+            ],
+        },
+        {
+            "target_pn": "PN-B",
+            "items": [{"field": "Operating Temp", "value": {"min": -20, "max": 60}}],
+        },
+    ]
+}
+
+@pytest.mark.asyncio
+async def test_read_excel_sheet_single_pass(query_workbook):
+    sheet = await read_excel_sheet(query_workbook)
+
+    assert sheet.query.query_fields == ["Item", "Overcharge Voltage", "Operating Temp"]
+    assert sheet.query.query_targets == ["PN-A", "PN-B"]
+    assert sheet.field_rows == {"Item": 0, "Overcharge Voltage": 1, "Operating Temp": 3}
+    assert sheet.target_cols == {"PN-A": 1, "PN-B": 3}
+    assert sheet.grid[0] == ("Item", "PN-A", None, "PN-B")
+    assert (await get_excel_query_data(query_workbook)) == sheet.query
+
+@pytest.mark.asyncio
+async def test_write_summary_fills_actual_cells(query_workbook, tmp_path):
+    sheet = await read_excel_sheet(query_workbook)
+    output = await write_summary_to_excel(
+        original_excel_path=query_workbook,
+        query_data=sheet.query,
+        aoai_result=AOAI_RESULT,
+        output_dir=tmp_path / "out",
+        excel_sheet=sheet,
+    )
+
+    wb = openpyxl.load_workbook(output)
+    assert wb.sheetnames == ["Summary", "PN-A", "PN-B"]
+    summary = wb.worksheets[0]
+    assert summary["A1"].font.bold
+    assert summary.column_dimensions["A"].width == 40
+    assert summary["B2"].value == 4.25
+    assert summary["B4"].value == "-40 to 85"
+    assert summary["D4"].value == str({"min": -20, "max": 60})
+    assert summary["A3"].value is None
+
+    detail = wb["PN-A"]
+    assert [c.value for c in detail[1]] == ["Field", "Value", "Unit", "Confidence", "Provenance", "Notes"]
+    assert detail["A2"].value == "Overcharge Voltage"
+    assert detail["D2"].value == 0.9
+
+@pytest.mark.asyncio
+async def test_write_summary_sanitizes_detail_sheet_titles(query_workbook, tmp_path):
+    sheet = await read_excel_sheet(query_workbook)
+    result = {"documents": [{"target_pn": "PN/A:[rev 2]?", "items": [{"field": "Item", "value": 1}]}]}
+    output = await write_summary_to_excel(query_workbook, sheet.query, result, tmp_path / "out", excel_sheet=sheet)
+    assert openpyxl.load_workbook(output).sheetnames == ["Summary", "PN_A__rev_2__"]
+
+@pytest.mark.asyncio
+async def test_write_summary_streams_large_sheets_from_the_grid(query_workbook, tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "EXCEL_TEMPLATE_MAX_CELLS", 4)
+    sheet = await read_excel_sheet(query_workbook)
+    monkeypatch.setattr(openpyxl, "load_workbook", lambda *a, **k: pytest.fail("template must not be re-parsed"))
+    output = await write_summary_to_excel(query_workbook, sheet.query, AOAI_RESULT, tmp_path / "out", excel_sheet=sheet)
+
+    monkeypatch.undo()
+    wb = openpyxl.load_workbook(output)
+    assert wb.sheetnames == ["Summary", "PN-A", "PN-B"]
+    summary = wb["Summary"]
+    assert summary["A1"].value == "Item"
+    assert summary["B2"].value == 4.25
+    assert summary["D4"].value == str({"min": -20, "max": 60})
+    assert wb["PN-A"]["D2"].value == 0.9
+
+@pytest.mark.asyncio
+async def test_write_summary_streams_template_layout(tmp_path, monkeypatch):
+    path = tmp_path / "query.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Item", "PN-A", "Note"])
+    ws.append(["Overcharge Voltage", None, "=LEN(A2)"])
+    ws.merge_cells("C1:D1")
+    ws.freeze_panes = "B2"
+    ws.row_dimensions[1].height = 30
+    ws["B2"].number_format = "0.000"
+    wb.save(path)
+
+    created = []
+    real_workbook = openpyxl.Workbook
+    monkeypatch.setattr(openpyxl, "Workbook", lambda **kw: created.append(kw) or real_workbook(**kw))
+    sheet = await read_excel_sheet(path)
+    output = await write_summary_to_excel(path, sheet.query, AOAI_RESULT, tmp_path / "out", excel_sheet=sheet)
+    monkeypatch.undo()
+
+    assert created == [{"write_only": True}]
+    summary = openpyxl.load_workbook(output)["Summary"]
+    assert summary["B2"].value == 4.25 and summary["B2"].number_format == "0.000"
+    assert summary["C2"].value == "=LEN(A2)"
+    assert [r.coord for r in summary.merged_cells.ranges] == ["C1:D1"]
+    assert summary.freeze_panes == "B2"
+    assert summary.row_dimensions[1].height == 30
@@ -0,0 +1,48 @@
+import json
+import pytest
+
+from app.services import export_service
+from app.services.export_service import write_result_exports
+
+AOAI_RESULT = {
+    "documents": [
+        {
+            "target_pn": "PN-A",
+            "items": [
+                {"field": "Overcharge Voltage", "value": 4.25, "unit": "V", "confidence": 1.0, "provenance": "p3 Ordering Information", "notes": "表格值"},
+                {"field": "Package", "value": {"type": "DFN", "pins": 8}, "unit": None, "confidence": 0.95, "provenance": "Suffix map"},
+            ],
+        },
+        {"target_pn": "PN-B", "items": [{"field": "Overcharge Voltage", "value": "N/A", "unit": None, "confidence": 0.0, "provenance": "—"}]},
+    ]
+}
+
+@pytest.mark.asyncio
+async def test_write_result_exports_ndjson(tmp_path):
+    exports = await write_result_exports("job-1", AOAI_RESULT, tmp_path)
+
+    rows = [json.loads(line) for line in exports["ndjson"].read_text(encoding="utf-8").splitlines()]
+    assert [(r["target_pn"], r["field"]) for r in rows] == [
+        ("PN-A", "Overcharge Voltage"), ("PN-A", "Package"), ("PN-B", "Overcharge Voltage"),
+    ]
+    assert rows[0]["value"] == "4.25" and rows[0]["value_number"] == 4.25
+    assert rows[0]["provenance"] == "p3 Ordering Information" and rows[0]["notes"] == "表格值"
+    assert json.loads(rows[1]["value"]) == {"type": "DFN", "pins": 8}
+    assert rows[2]["value_number"] is None and rows[2]["confidence"] == 0.0
+    assert set(rows[0]) == set(export_service.EXPORT_COLUMNS)
+
+@pytest.mark.asyncio
+async def test_write_result_exports_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    exports = await write_result_exports("job-1", AOAI_RESULT, tmp_path)
+
+    table = pq.read_table(exports["parquet"])
+    assert table.column_names == export_service.EXPORT_COLUMNS
+    assert table.num_rows == 3
+    assert table.column("confidence").to_pylist() == [1.0, 0.95, 0.0]
+
+@pytest.mark.asyncio
+async def test_write_result_exports_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_service, "pa", None)
+    exports = await write_result_exports("job-1", AOAI_RESULT, tmp_path)
+    assert set(exports) == {"ndjson"}
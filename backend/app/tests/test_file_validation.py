@@ -3,7 +3,7 @@ from fastapi import UploadFile, HTTPException
 from io import BytesIO
 from unittest.mock import MagicMock
 
-from app.utils.file_validation import validate_file, validate_files
+from app.utils.file_validation import validate_file, validate_files, UploadGuard
 from app.core.config import Settings
 
 @pytest.fixture
@@ -87,3 +87,41 @@ def test_validate_files_single_file_too_large_in_batch(mock_settings):
         validate_files(files, mock_settings)
     assert excinfo.value.status_code == 413
     assert "檔案 'too_large.pdf' 大小超過限制" in excinfo.value.detail
+
+def test_upload_guard_rejects_wrong_signature(mock_settings):
+    guard = UploadGuard(mock_settings)
+    check = guard.for_file(UploadFile(filename="fake.pdf", file=BytesIO(b"")))
+    with pytest.raises(HTTPException) as excinfo:
+        check(b"PK\x03\x04 not a pdf")
+    assert excinfo.value.status_code == 400
+    assert "內容與副檔名 .pdf 不符" in excinfo.value.detail
+
+def test_upload_guard_accepts_known_signatures(mock_settings):
+    guard = UploadGuard(mock_settings)
+    guard.for_file(UploadFile(filename="a.pdf", file=BytesIO(b"")))(b"%PDF-1.7\n")
+    guard.for_file(UploadFile(filename="b.xlsx", file=BytesIO(b"")))(b"PK\x03\x04rest")
+    guard.for_file(UploadFile(filename="c.xls", file=BytesIO(b"")))(b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1rest")
+
+def test_upload_guard_rejects_empty_file(mock_settings):
+    check = UploadGuard(mock_settings).for_file(UploadFile(filename="empty.xlsx", file=BytesIO(b"")))
+    with pytest.raises(HTTPException) as excinfo:
+        check(b"")
+    assert excinfo.value.status_code == 400
+
+def test_upload_guard_enforces_file_size_while_streaming(mock_settings):
+    check = UploadGuard(mock_settings).for_file(UploadFile(filename="big.pdf", file=BytesIO(b"")))
+    check(b"%PDF-" + b"a" * (512 * 1024))
+    with pytest.raises(HTTPException) as excinfo:
+        check(b"a" * (600 * 1024))
+    assert excinfo.value.status_code == 413
+    assert "檔案 'big.pdf' 大小超過限制" in excinfo.value.detail
+
+def test_upload_guard_enforces_total_size_across_files(mock_settings):
+    guard = UploadGuard(mock_settings)
+    chunk = b"a" * (900 * 1024)
+    guard.for_file(UploadFile(filename="a.pdf", file=BytesIO(b"")))(b"%PDF-" + chunk)
+    guard.for_file(UploadFile(filename="b.pdf", file=BytesIO(b"")))(b"%PDF-" + chunk)
+    with pytest.raises(HTTPException) as excinfo:
+        guard.for_file(UploadFile(filename="c.pdf", file=BytesIO(b"")))(b"%PDF-" + chunk)
+    assert excinfo.value.status_code == 413
+    assert "上傳總大小超過限制" in excinfo.value.detail
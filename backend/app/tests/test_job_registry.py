@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from app.core import job_manager
+from app.core.job_manager import JobRegistry, compact_record
+
+def test_registry_evicts_oldest_beyond_max_entries():
+    evicted = []
+    registry = JobRegistry(ttl_seconds=60, max_entries=3, on_evict=lambda job_id, _: evicted.append(job_id))
+    for i in range(5):
+        registry[f"job-{i}"] = {"status": "processing"}
+
+    assert len(registry) == 3
+    assert evicted == ["job-0", "job-1"]
+    assert registry.get("job-0") is None
+
+    # Updating a job makes it the most recent one.
+    registry.update("job-2", status="done")
+    registry["job-5"] = {"status": "processing"}
+    assert "job-2" in registry
+    assert "job-3" not in registry
+
+def test_registry_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(job_manager.time, "monotonic", lambda: now[0])
+    registry = JobRegistry(ttl_seconds=10, max_entries=100)
+    registry["old"] = {"status": "done"}
+    now[0] += 5
+    registry["new"] = {"status": "done"}
+
+    now[0] += 6
+    assert registry.get("old") is None
+    assert registry["new"] == {"status": "done"}
+
+    # Expired records are also dropped on the next write, without a lookup.
+    now[0] += 10
+    registry["newest"] = {"status": "processing"}
+    assert len(registry) == 1
+
+def test_compact_record_trims_tracebacks():
+    record = compact_record({"status": "error", "download_url": None, "details": "x" * 5000 + "ValueError: boom"}, max_text=100)
+    assert "download_url" not in record
+    assert len(record["details"]) == 103
+    assert record["details"].endswith("ValueError: boom")
+
+class _MemoryStore:
+    """Keeps the newest version of each record, like MongoJobStore's conditional upsert."""
+    def __init__(self, delays=None):
+        self.docs = {}
+        self.delays = delays or {}
+
+    async def put(self, job_id, record, version):
+        await asyncio.sleep(self.delays.get(record["status"], 0))
+        stored = self.docs.get(job_id)
+        if stored is None or stored[0] < version:
+            self.docs[job_id] = (version, record)
+
+    async def get(self, job_id):
+        stored = self.docs.get(job_id)
+        return stored[1] if stored else None
+
+async def _drain(registry):
+    while registry._pending:
+        await next(iter(registry._pending))
+
+@pytest.mark.asyncio
+async def test_registry_falls_back_to_store():
+    store = _MemoryStore()
+    writer = JobRegistry(ttl_seconds=60, max_entries=10, store=store)
+    writer["job"] = {"status": "done", "download_url": "/api/download/x"}
+    await _drain(writer)
+
+    # A registry on another worker does not hold the job in memory.
+    reader = JobRegistry(ttl_seconds=60, max_entries=10, store=store)
+    assert reader.get("job") is None
+    assert await reader.aget("job") == {"status": "done", "download_url": "/api/download/x"}
+
+@pytest.mark.asyncio
+async def test_late_persisted_write_does_not_replace_newer_record():
+    # The "processing" write is slow and lands after the "done" write.
+    store = _MemoryStore(delays={"processing": 0.05})
+    registry = JobRegistry(ttl_seconds=60, max_entries=10, store=store)
+    registry["job"] = {"status": "processing"}
+    registry.update("job", status="done")
+    await _drain(registry)
+
+    assert await store.get("job") == {"status": "done"}
+
+def test_mongo_store_upsert_is_conditional_on_version(monkeypatch):
+    from pymongo.errors import DuplicateKeyError
+    from app.db import mongo
+
+    calls = []
+
+    class _Collection:
+        async def replace_one(self, flt, doc, upsert):
+            calls.append((flt, doc))
+            raise DuplicateKeyError("E11000 duplicate key")
+
+    monkeypatch.setattr(mongo, "get_db", lambda: {"jobs": _Collection()})
+    asyncio.run(job_manager.MongoJobStore().put("job", {"status": "processing"}, version=5))
+    flt, doc = calls[0]
+    assert flt == {"_id": "job", "$or": [{"version": {"$lt": 5}}, {"version": {"$exists": False}}]}
+    assert doc["version"] == 5
+
+@pytest.mark.asyncio
+async def test_polling_a_compacted_processing_record(monkeypatch):
+    from httpx import AsyncClient, ASGITransport
+    from app.main import app
+    from app.routers import value
+
+    registry = JobRegistry(ttl_seconds=60, max_entries=10)
+    registry["job"] = {"status": "processing", "message": "...", "download_url": None}
+    monkeypatch.setattr(value, "job_statuses", registry)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/api/value/result_polling/job")
+    assert response.status_code == 200
+    assert response.json()["download_url"] is None
+
+@pytest.mark.asyncio
+async def test_job_dirs_follow_settings_not_the_environment(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.core.storage import StorageService
+
+    # DATA_DIR set only in .env (settings) while the environment says otherwise
+    monkeypatch.setenv("DATA_DIR", str(tmp_path / "env"))
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "settings"))
+    dirs = job_manager.get_job_dirs("job-1")
+    assert dirs.base == (tmp_path / "settings" / "jobs" / "job-1").resolve()
+
+    summary = dirs.output / "summary.xlsx"
+    summary.write_bytes(b"PK")
+    storage = StorageService(settings.DATA_DIR, token_secret="test-secret")
+    url = await storage.make_downloadable(summary)
+    assert storage.resolve_download_path(url.rsplit("/", 1)[-1]) == summary.resolve()
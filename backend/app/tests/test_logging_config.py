@@ -0,0 +1,52 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from app.core.logging_config import JobContextFilter, JsonFormatter, bind_job_id, parse_levels
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(JobContextFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def handler():
+    logger = logging.getLogger("test.logging_config")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler
+    logger.removeHandler(handler)
+
+@pytest.mark.asyncio
+async def test_job_id_follows_tasks_and_threads(handler):
+    logger = logging.getLogger("test.logging_config")
+
+    async def job():
+        logger.info("in task")
+        await asyncio.to_thread(logger.info, "in thread")
+
+    with bind_job_id("job-1"):
+        task = asyncio.create_task(job())
+    logger.info("outside")
+    await task
+
+    assert {r.getMessage(): r.job_id for r in handler.records} == {"in task": "job-1", "in thread": "job-1", "outside": "-"}
+
+def test_json_formatter_includes_job_id_and_extra_fields(handler):
+    with bind_job_id("job-2"):
+        logging.getLogger("test.logging_config").info("stage %s done", "aoai", extra={"seconds": 1.5})
+    entry = json.loads(JsonFormatter().format(handler.records[0]))
+    assert entry["message"] == "stage aoai done"
+    assert entry["job_id"] == "job-2"
+    assert entry["seconds"] == 1.5
+    assert entry["level"] == "INFO"
+
+def test_parse_levels():
+    assert parse_levels("app.services=debug, azure=WARNING,,bad") == {"app.services": "DEBUG", "azure": "WARNING"}
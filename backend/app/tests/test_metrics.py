@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.core import metrics
+from app.core.metrics import Histogram, StageTimer
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ["stage"], buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value, stage="aoai")
+    assert histogram.render()[2:] == [
+        'demo_seconds_bucket{stage="aoai",le="1"} 2',
+        'demo_seconds_bucket{stage="aoai",le="5"} 3',
+        'demo_seconds_bucket{stage="aoai",le="+Inf"} 4',
+        'demo_seconds_count{stage="aoai"} 4',
+        'demo_seconds_sum{stage="aoai"} 14.5',
+    ]
+
+@pytest.mark.asyncio
+async def test_stage_timings_are_recorded_and_exported(monkeypatch):
+    from app.main import app
+
+    stages = Histogram("job_stage_seconds", "Duration of each job processing stage.", ["kind", "stage"])
+    monkeypatch.setattr(metrics, "job_stage_seconds", stages)
+    timer = StageTimer("value")
+    with timer.stage("excel_parse"):
+        pass
+    for name in ("a.pdf", "b.pdf"):
+        with timer.stage(f"di:{name}", metric_stage="di_call"):
+            pass
+    timer.finish("done")
+    assert set(timer.timings) == {"excel_parse", "di:a.pdf", "di:b.pdf", "total"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'job_stage_seconds_count{kind="value",stage="di_call"} 2' in response.text
+    assert "# TYPE jobs_in_flight gauge" in response.text
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+from app.db.monitoring import CommandLatencyListener, summarize_plan
+
+def _run(listener, name, command, duration_ms, request_id, failed=False):
+    conn = ("localhost", 27017)
+    listener.started(SimpleNamespace(command_name=name, command=command, connection_id=conn, request_id=request_id))
+    done = SimpleNamespace(command_name=name, duration_micros=int(duration_ms * 1000), connection_id=conn, request_id=request_id)
+    (listener.failed if failed else listener.succeeded)(done)
+
+def test_histograms_by_collection_and_command():
+    listener = CommandLatencyListener(slow_ms=1000, explain_slow=False)
+    _run(listener, "find", {"find": "parts", "filter": {}}, 0.4, 1)
+    _run(listener, "find", {"find": "parts", "filter": {}}, 30, 2)
+    _run(listener, "getMore", {"getMore": 123, "collection": "parts"}, 3, 3)
+    _run(listener, "update", {"update": "parts"}, 7, 4, failed=True)
+
+    snapshot = listener.snapshot()
+    assert set(snapshot) == {"parts.find", "parts.getMore", "parts.update"}
+    find = snapshot["parts.find"]
+    assert find["count"] == 2
+    assert find["buckets"]["le_1ms"] == 1
+    assert find["buckets"]["le_50ms"] == 1
+    assert find["max_ms"] == 30
+    assert snapshot["parts.update"]["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_slow_reads_are_logged_and_explained(caplog):
+    explained = []
+
+    class _Db:
+        async def command(self, cmd):
+            explained.append(cmd)
+            return {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "partNo_1"}}}}
+
+    listener = CommandLatencyListener(slow_ms=50, explain_slow=True)
+    listener.bind(_Db(), asyncio.get_running_loop())
+    command = {"find": "parts", "filter": {"partNo": "x"}, "lsid": {"id": 1}, "$db": "simplo_ai"}
+    _run(listener, "find", command, 120, 1)
+    _run(listener, "find", command, 130, 2)  # same shape: explained once per interval
+    _run(listener, "find", command, 5, 3)
+    await asyncio.sleep(0.01)
+
+    assert explained == [{"explain": {"find": "parts", "filter": {"partNo": "x"}}, "verbosity": "queryPlanner"}]
+    out = caplog.text
+    assert out.count("[SLOW MONGO] parts.find took") == 2
+    assert "plan: IXSCAN(partNo_1) <- FETCH" in out
+
+def test_summarize_plan_handles_slot_based_engine():
+    plan = {"queryPlan": {"stage": "LIMIT", "inputStage": {"stage": "COLLSCAN"}}, "slotBasedPlan": {}}
+    assert summarize_plan(plan) == "COLLSCAN <- LIMIT"
+    assert summarize_plan({}) == "unknown"
@@ -0,0 +1,99 @@
+from datetime import datetime
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.models.schemas import Part, SpecItem
+from app.routers.parts import get_aliases_repo, get_parts_repo
+
+class _FakeAliases:
+    async def resolve(self, candidates):
+        return {c: c.lower() if c.lower() in ("vin", "ovp") else None for c in candidates}
+
+class _FakeParts:
+    def __init__(self):
+        self.reads = 0
+        self.writes = []
+        self.part = Part(
+            partNo="bq25895",
+            specs=[SpecItem(key="ovp", value="4.2", status="confirmed", notes="from datasheet",
+                            lastUpdatedAt=datetime.now(), lastUpdatedBy="seed")],
+            createdAt=datetime.now(),
+            updatedAt=datetime.now(),
+        )
+
+    async def get_part(self, partNo):
+        self.reads += 1
+        return self.part if partNo == "bq25895" else None
+
+    async def get_part_view(self, partNo, keys=None, fields=None):
+        self.reads += 1
+        self.view_args = (keys, fields)
+        return {"partNo": "bq25895", "updatedAt": datetime(2024, 1, 2), "specs": [{"key": "ovp", "value": "4.2"}]}
+
+    async def get_parts(self, partNos):
+        self.reads += 1
+        return {"bq25895": self.part}
+
+    async def upsert_specs(self, partNo, items, actor, sourceFilename=None):
+        self.writes.append({partNo: items})
+
+    async def bulk_upsert_specs(self, updates, actor, sourceFilename=None):
+        self.writes.append(updates)
+
+@pytest.fixture
+def parts():
+    fake = _FakeParts()
+    app.dependency_overrides[get_parts_repo] = lambda: fake
+    app.dependency_overrides[get_aliases_repo] = lambda: _FakeAliases()
+    yield fake
+    app.dependency_overrides.clear()
+
+async def _request(method, url, payload):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        return await ac.request(method, url, json=payload)
+
+@pytest.mark.asyncio
+async def test_patch_specs_reads_part_once(parts):
+    items = [{"keyOrAlias": "OVP", "value": f"4.{i}"} for i in range(20)] + [{"keyOrAlias": "VIN", "value": "5"}, {"keyOrAlias": "??"}]
+    response = await _request("PATCH", "/api/parts/bq25895/specs", {"items": items, "actor": "tester"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert parts.reads == 1
+    assert len(parts.writes) == 1
+    assert body["unresolved_aliases"] == ["??"]
+    assert body["updated_specs"][0]["status"] == "edited"
+    assert body["updated_specs"][20]["status"] == "pending"
+    # Notes of existing specs are preserved.
+    assert parts.writes[0]["bq25895"][0].notes == "from datasheet"
+
+@pytest.mark.asyncio
+async def test_bulk_patch_specs_single_read_and_write(parts):
+    payload = {
+        "actor": "tester",
+        "parts": [
+            {"partNo": "BQ25895", "items": [{"keyOrAlias": "ovp", "value": "4.3"}]},
+            {"partNo": "new-part", "items": [{"keyOrAlias": "vin", "value": "12"}, {"keyOrAlias": "nope"}]},
+        ],
+    }
+    response = await _request("PATCH", "/api/parts/specs/bulk", payload)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["partNo"] for r in results] == ["BQ25895", "new-part"]
+    assert results[0]["updated_specs"][0]["status"] == "edited"
+    assert results[1]["unresolved_aliases"] == ["nope"]
+    assert parts.reads == 1
+    assert len(parts.writes) == 1
+    assert set(parts.writes[0]) == {"bq25895", "new-part"}
+
+@pytest.mark.asyncio
+async def test_get_part_with_keys_returns_filtered_view(parts):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/api/parts/BQ25895", params={"keys": "OVP,Unknown Key", "fields": "value"})
+
+    assert response.status_code == 200
+    assert response.json() == {"partNo": "bq25895", "updatedAt": "2024-01-02T00:00:00", "specs": [{"key": "ovp", "value": "4.2"}]}
+    # Aliases resolve to canonical keys; unknown ones are looked up normalized.
+    assert parts.view_args == (["ovp", "unknown key"], ["value"])
@@ -0,0 +1,181 @@
+import copy
+from datetime import datetime
+import pytest
+
+from app.models.schemas import SpecItem
+from app.services import parts_repo
+from app.services.parts_repo import PartsRepository, build_spec_upsert_ops
+
+class _FakePartsCollection:
+    """Applies the subset of update operators used by build_spec_upsert_ops."""
+    def __init__(self, docs=None):
+        self.docs = {d["partNo"]: d for d in docs or []}
+        self.bulk_calls = 0
+
+    def _match(self, doc, flt):
+        for field, cond in flt.items():
+            if field == "partNo":
+                if doc["partNo"] != cond:
+                    return False
+                continue
+            keys = [s["key"] for s in doc.get("specs", [])]
+            if isinstance(cond, dict) and "$ne" in cond:
+                if cond["$ne"] in keys:
+                    return False
+            elif cond not in keys:
+                return False
+        return True
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_calls += 1
+        for op in operations:
+            self.apply(op)
+
+    def apply(self, op):
+        flt, update, upsert = op._filter, op._doc, op._upsert
+        doc = self.docs.get(flt["partNo"])
+        if doc is None and upsert:
+            doc = self.docs[flt["partNo"]] = {"partNo": flt["partNo"], **copy.deepcopy(update.get("$setOnInsert", {}))}
+        if doc is None or not self._match(doc, flt):
+            return
+        for field, value in update.get("$set", {}).items():
+            if field == "specs.$":
+                i = [s["key"] for s in doc["specs"]].index(flt["specs.key"])
+                doc["specs"][i] = value
+            else:
+                doc[field] = value
+        for field, value in update.get("$push", {}).items():
+            doc.setdefault(field, []).append(value)
+
+    async def find_one(self, *args, **kwargs):
+        raise AssertionError("upsert_specs must not read the part")
+
+def _spec(key, value):
+    return SpecItem(key=key, value=value, status="pending", lastUpdatedAt=datetime.now(), lastUpdatedBy="tester")
+
+@pytest.fixture
+def collection(monkeypatch):
+    existing = {
+        "partNo": "bq25895",
+        "specs": [{"key": "vin", "value": "5"}, {"key": "ovp", "value": "4.2"}],
+        "createdAt": datetime(2024, 1, 1),
+    }
+    fake = _FakePartsCollection([existing])
+    monkeypatch.setattr(parts_repo, "get_db", lambda: {"parts": fake})
+    return fake
+
+@pytest.mark.asyncio
+async def test_upsert_specs_replaces_and_appends_in_one_round_trip(collection):
+    await PartsRepository().upsert_specs("BQ25895", [_spec("OVP", "4.25"), _spec("iq", 3)], actor="tester")
+
+    part = collection.docs["bq25895"]
+    assert collection.bulk_calls == 1
+    assert [(s["key"], s["value"]) for s in part["specs"]] == [("vin", "5"), ("ovp", "4.25"), ("iq", 3)]
+    assert part["createdAt"] == datetime(2024, 1, 1)
+
+@pytest.mark.asyncio
+async def test_upsert_specs_creates_missing_part(collection):
+    await PartsRepository().upsert_specs("New Part", [_spec("vin", "12")], actor="tester", sourceFilename="ds.pdf")
+
+    part = collection.docs["new part"]
+    assert part["specs"][0]["key"] == "vin"
+    assert part["specs"][0]["sourceFiles"][0]["filename"] == "ds.pdf"
+    assert part["createdAt"] == part["updatedAt"]
+
+def test_spec_upsert_ops_shape():
+    now = datetime(2024, 1, 1)
+    ops = build_spec_upsert_ops("p1", [{"key": "vin"}], now)
+    assert len(ops) == 3
+    assert ops[1]._filter == {"partNo": "p1", "specs.key": {"$ne": "vin"}}
+    assert ops[2]._doc == {"$set": {"specs.$": {"key": "vin"}}}
+
+def test_concurrent_writers_adding_same_new_key_keep_last_value(collection):
+    now = datetime(2024, 1, 1)
+    first = build_spec_upsert_ops("bq25895", [{"key": "iq", "value": "first"}], now)
+    second = build_spec_upsert_ops("bq25895", [{"key": "iq", "value": "second"}], now)
+    # Neither writer sees the other's key before its own push runs.
+    for a, b in zip(first, second):
+        collection.apply(a)
+        collection.apply(b)
+
+    iq = [s for s in collection.docs["bq25895"]["specs"] if s["key"] == "iq"]
+    assert iq == [{"key": "iq", "value": "second"}]
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_specs_writes_all_parts_at_once(collection):
+    await PartsRepository().bulk_upsert_specs(
+        {"BQ25895": [_spec("ovp", "4.3")], "bq24610": [_spec("vin", "28")], "empty": []},
+        actor="tester",
+    )
+
+    assert collection.bulk_calls == 1
+    assert collection.docs["bq25895"]["specs"][1]["value"] == "4.3"
+    assert collection.docs["bq24610"]["specs"][0]["value"] == "28"
+    assert "empty" not in collection.docs
+
+@pytest.mark.asyncio
+async def test_list_parts_pages_with_keyset_cursor(monkeypatch, fake_db):
+    fake = fake_db["parts"]
+    fake.docs = [{"partNo": p, "manufacturer": "TI", "specs": [{"key": "vin"}]}
+                 for p in ["bq24610", "bq25895", "bq25896", "bq27z561", "max17055"]]
+    monkeypatch.setattr(parts_repo, "get_db", lambda: fake_db)
+    repo = PartsRepository()
+
+    page, cursor = await repo.list_parts(prefix="BQ2", limit=2)
+    assert [d["partNo"] for d in page] == ["bq24610", "bq25895"]
+    assert "specs" not in page[0]
+    page, cursor = await repo.list_parts(prefix="BQ2", limit=2, cursor=cursor)
+    assert [d["partNo"] for d in page] == ["bq25896", "bq27z561"]
+    assert cursor is None
+
+    flt, projection = fake.finds[-1]
+    assert flt["partNo"] == {"$regex": "^bq2", "$gt": "bq25895"}
+    assert projection == {"_id": 0, "partNo": 1, "manufacturer": 1, "updatedAt": 1}
+
+@pytest.mark.asyncio
+async def test_list_parts_filters_and_validation(monkeypatch, fake_db):
+    fake = fake_db["parts"]
+    monkeypatch.setattr(parts_repo, "get_db", lambda: fake_db)
+    repo = PartsRepository()
+
+    await repo.list_parts(spec_key="Input Voltage", status="incorrect", fields=["partNo", "specs.key", "specs.status"])
+    flt, projection = fake.finds[-1]
+    assert flt == {"specs": {"$elemMatch": {"key": "input voltage", "status": "incorrect"}}}
+    assert projection == {"_id": 0, "partNo": 1, "specs.key": 1, "specs.status": 1}
+
+    with pytest.raises(ValueError):
+        await repo.list_parts(fields=["secret"])
+    with pytest.raises(ValueError):
+        await repo.list_parts(cursor="%%%")
+
+@pytest.mark.asyncio
+async def test_get_part_view_filters_specs_server_side(monkeypatch, fake_db):
+    fake = fake_db["parts"]
+    fake.docs = [{"partNo": "bq25895", "specs": []}]
+    monkeypatch.setattr(parts_repo, "get_db", lambda: fake_db)
+    repo = PartsRepository()
+
+    assert await repo.get_part_view("BQ25895", keys=["vin", "ovp"], fields=["value", "unit"]) == {"partNo": "bq25895", "specs": []}
+    match, _, project = fake.pipelines[-1]
+    assert match == {"$match": {"partNo": "bq25895"}}
+    specs = project["$project"]["specs"]["$map"]
+    assert specs["input"]["$ifNull"][0]["$filter"]["cond"] == {"$in": ["$$s.key", ["vin", "ovp"]]}
+    assert specs["in"] == {"key": "$$s.key", "value": "$$s.value", "unit": "$$s.unit"}
+
+    await repo.get_part_view("BQ25895")
+    assert fake.pipelines[-1][2]["$project"]["specs"] == "$specs"
+
+    with pytest.raises(ValueError):
+        await repo.get_part_view("BQ25895", fields=["password"])
+
+@pytest.mark.asyncio
+async def test_get_part_document_fills_model_defaults(monkeypatch):
+    class _Collection:
+        async def find_one(self, flt, projection):
+            assert flt == {"partNo": "bq25895"} and projection == {"_id": 0}
+            return {"partNo": "bq25895", "specs": [{"key": "vin", "value": "5", "status": "pending"}]}
+
+    monkeypatch.setattr(parts_repo, "get_db", lambda: {"parts": _Collection()})
+    part = await PartsRepository().get_part_document("BQ25895")
+    assert part["manufacturer"] is None
+    assert part["specs"][0] == {"key": "vin", "value": "5", "status": "pending", "unit": None, "aliases": [], "sourceFiles": [], "notes": None}
@@ -0,0 +1,61 @@
+import datetime
+import openpyxl
+import pytest
+
+from app.services import preview_service
+from app.services.preview_service import get_sheet_window
+
+@pytest.fixture
+def result_workbook(tmp_path):
+    path = tmp_path / "summary.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Summary"
+    ws.append(["Item", "PN-A"])
+    for i in range(1, 250):
+        ws.append([f"F{i}", i])
+    detail = wb.create_sheet("PN-A")
+    detail.append(["Field", "Value"])
+    detail.append(["Date", datetime.datetime(2024, 1, 2, 3, 4, 5)])
+    wb.save(path)
+    return path
+
+@pytest.mark.asyncio
+async def test_sheet_window_pages(result_workbook):
+    first = await get_sheet_window(result_workbook, offset=0, limit=100)
+    assert first["sheets"] == ["Summary", "PN-A"]
+    assert first["sheet"] == "Summary"
+    assert first["rows"][0] == ["Item", "PN-A"]
+    assert len(first["rows"]) == 100
+    assert first["has_more"] is True
+
+    last = await get_sheet_window(result_workbook, offset=200, limit=100)
+    assert last["rows"][0] == ["F200", 200]
+    assert len(last["rows"]) == 50
+    assert last["has_more"] is False
+
+@pytest.mark.asyncio
+async def test_sheet_window_named_sheet_is_json_ready(result_workbook):
+    page = await get_sheet_window(result_workbook, sheet="PN-A")
+    assert page["rows"] == [["Field", "Value"], ["Date", "2024-01-02T03:04:05"]]
+
+    with pytest.raises(KeyError):
+        await get_sheet_window(result_workbook, sheet="missing")
+
+@pytest.mark.asyncio
+async def test_sheet_window_is_cached_per_digest(result_workbook, monkeypatch):
+    calls = []
+    read_window = preview_service._read_window
+    monkeypatch.setattr(preview_service, "_read_window", lambda *a: calls.append(a) or read_window(*a))
+
+    await get_sheet_window(result_workbook, offset=10, limit=5)
+    await get_sheet_window(result_workbook, offset=10, limit=5)
+    assert len(calls) == 1
+
+    # Rewriting the file changes its digest, so the cached page is not reused.
+    wb = openpyxl.load_workbook(result_workbook)
+    wb.active["A11"] = "changed"
+    wb.save(result_workbook)
+    page = await get_sheet_window(result_workbook, offset=10, limit=5)
+    assert len(calls) == 2
+    assert page["rows"][0][0] == "changed"
@@ -0,0 +1,93 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.core import profiling
+from app.core.profiling import AWAIT_MARKER, ProfilingMiddleware, TaskProfiler, profiling_allowed
+from app.routers import admin
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+async def _job():
+    _busy(0.05)
+    await asyncio.sleep(0.05)
+
+@pytest.mark.asyncio
+async def test_task_profiler_samples_running_and_awaiting_stacks():
+    profiler = TaskProfiler(interval_ms=1)
+    profiler.start()
+    await _job()
+    profiler.stop()
+
+    stacks = list(profiler.samples)
+    assert any(s.split(";")[-1].startswith("_busy ") for s in stacks)
+    assert any(s.endswith(AWAIT_MARKER) and "_job " in s for s in stacks)
+    # Stacks start at the profiled call, not at the test runner.
+    assert all(s.startswith("test_task_profiler_samples_running_and_awaiting_stacks ") for s in stacks)
+
+ADMIN_TOKEN = "3b8f0c2e9d41a7"
+
+@pytest.fixture
+def enabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling.settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling.settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling.settings, "PROFILING_ADMIN_TOKEN", ADMIN_TOKEN)
+    monkeypatch.setattr(profiling.settings, "PROFILING_INTERVAL_MS", 1.0)
+    return tmp_path
+
+@pytest.mark.asyncio
+async def test_profiled_request_can_be_downloaded(enabled):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(admin.router, prefix="/api/admin")
+
+    @app.get("/slow")
+    async def slow():
+        await _job()
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        plain = await ac.get("/slow", headers={"X-Profile": "1"})
+        assert "x-profile-id" not in plain.headers  # no admin token, no profile
+
+        response = await ac.get("/slow", headers={"X-Profile": "1", "X-Admin-Token": ADMIN_TOKEN})
+        profile_id = response.headers["x-profile-id"]
+        assert (await ac.get(f"/api/admin/profiles/{profile_id}")).status_code == 403
+        download = await ac.get(f"/api/admin/profiles/{profile_id}", headers={"X-Admin-Token": ADMIN_TOKEN})
+        assert download.status_code == 200
+        assert "_job " in download.text
+
+        job_id = str(uuid.uuid4())
+        (enabled / "jobs" / job_id).mkdir(parents=True)
+        (enabled / "jobs" / job_id / "profile.collapsed").write_text("process_aoai_job;aoai [await] 3\n")
+        job_profile = await ac.get(f"/api/admin/profiles/{job_id}", headers={"X-Admin-Token": ADMIN_TOKEN})
+        assert job_profile.text == "process_aoai_job;aoai [await] 3\n"
+        assert (await ac.get("/api/admin/profiles/..%2F..%2Fetc", headers={"X-Admin-Token": ADMIN_TOKEN})).status_code == 404
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("token", [None, "", "change-me"])
+async def test_profiling_stays_off_without_a_real_token(enabled, monkeypatch, token):
+    monkeypatch.setattr(profiling.settings, "PROFILING_ADMIN_TOKEN", token)
+    assert not profiling.profiling_configured()
+    assert not profiling_allowed(token)
+
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/admin")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get(f"/api/admin/profiles/{uuid.uuid4()}", headers={"X-Admin-Token": token or ""})
+    assert response.status_code == 404
+
+def test_placeholder_admin_token_is_rejected_at_startup():
+    from pydantic import ValidationError
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(PROFILING_ADMIN_TOKEN="change-me")
+    assert Settings(PROFILING_ADMIN_TOKEN="").PROFILING_ADMIN_TOKEN is None
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime
+
+from app.models.schemas import Part
+from app.utils import responses
+from app.utils.responses import FastJSONResponse
+
+def _part_document():
+    now = datetime(2024, 1, 2, 3, 4, 5, 678000)
+    return {
+        "partNo": "bq25895",
+        "manufacturer": None,
+        "createdAt": now,
+        "updatedAt": now,
+        "specs": [
+            {"key": f"k{i}", "value": i if i % 2 else f"{i} V", "unit": "V", "aliases": [], "status": "confirmed",
+             "sourceFiles": [{"filename": "ds.pdf", "uploadedAt": now}], "lastUpdatedAt": now,
+             "lastUpdatedBy": "seed", "notes": None}
+            for i in range(3)
+        ],
+    }
+
+def test_fast_response_matches_model_serialization():
+    doc = _part_document()
+    fast = json.loads(FastJSONResponse(doc).body)
+    assert fast == json.loads(Part(**doc).model_dump_json())
+
+def test_stdlib_fallback_matches(monkeypatch):
+    doc = _part_document()
+    expected = responses.dumps(doc)
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(responses.dumps(doc)) == json.loads(expected)
+
+def test_fast_routes_document_their_shape_without_response_model():
+    from app.main import app
+    from app.routers import parts, value
+
+    routes = {route.path: route for router in (parts.router, value.router) for route in router.routes}
+    openapi = app.openapi()["paths"]
+    for path, route_path, schema in [
+        ("/api/value/result_polling/{job_id}", "/result_polling/{job_id}", "ValueResultResponse"),
+        ("/api/parts", "", "PartListResponse"),
+        ("/api/parts/{partNo}", "/{partNo}", "Part"),
+    ]:
+        assert routes[route_path].response_model is None
+        content = openapi[path]["get"]["responses"]["200"]["content"]["application/json"]
+        assert content["schema"]["$ref"].endswith("/" + schema)
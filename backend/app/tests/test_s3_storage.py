@@ -0,0 +1,69 @@
+import pytest
+from io import BytesIO
+from fastapi import UploadFile
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from app.core.storage import StorageService
+from app.core.storage_backends import S3StorageBackend
+
+BUCKET = "ce-ai-test"
+
+@pytest.fixture
+def s3_backend(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield S3StorageBackend(bucket=BUCKET, key_prefix="ce/", client=client)
+
+@pytest.mark.asyncio
+async def test_uploads_are_persisted_once_by_digest(s3_backend, tmp_path):
+    storage = StorageService(str(tmp_path), token_secret="test-secret", backend=s3_backend)
+    content = b"%PDF-1.7 " + b"x" * 1024
+
+    first = await storage.save_upload(UploadFile(filename="a.pdf", file=BytesIO(content)))
+    await storage.save_upload(UploadFile(filename="b.pdf", file=BytesIO(content)))
+
+    listed = s3_backend.client.list_objects_v2(Bucket=BUCKET, Prefix="ce/blobs/")
+    assert [obj["Key"] for obj in listed["Contents"]] == [f"ce/blobs/{first.digest[:2]}/{first.digest}"]
+
+@pytest.mark.asyncio
+async def test_artifact_is_served_from_another_node(s3_backend, tmp_path):
+    node_a = StorageService(str(tmp_path / "a"), token_secret="test-secret", backend=s3_backend)
+    node_b = StorageService(str(tmp_path / "b"), token_secret="test-secret", backend=s3_backend)
+
+    artifact = node_a.base_dir / "jobs" / "job-1" / "output" / "summary.xlsx"
+    artifact.parent.mkdir(parents=True)
+    artifact.write_bytes(b"0123456789")
+    token = (await node_a.make_downloadable(artifact)).rsplit("/", 1)[-1]
+
+    key = node_b.resolve_download_key(token)
+    assert key == "jobs/job-1/output/summary.xlsx"
+    assert not node_b.local_path(key).exists()
+
+    url = await node_b.presigned_url(key)
+    assert BUCKET in url and "summary.xlsx" in url
+
+    assert await node_b.read_file_bytes(node_b.local_path(key), start=2, end=5) == b"234"
+
+    local_copy = await node_b.ensure_local(key)
+    assert local_copy.read_bytes() == b"0123456789"
+
+@pytest.mark.asyncio
+async def test_last_release_deletes_the_remote_blob(s3_backend, tmp_path):
+    storage = StorageService(str(tmp_path), token_secret="test-secret", backend=s3_backend)
+    content = b"%PDF-1.7 shared"
+    first = await storage.save_upload(UploadFile(filename="a.pdf", file=BytesIO(content)))
+    second = await storage.save_upload(UploadFile(filename="b.pdf", file=BytesIO(content)))
+    key = f"blobs/{first.digest[:2]}/{first.digest}"
+
+    await storage.release_uploads([first])
+    assert s3_backend.exists(key)
+
+    await storage.release_uploads([second])
+    assert not s3_backend.exists(key)
+    assert not storage.blob_path(first.digest).exists()
+    s3_backend.delete(key)  # deleting a missing object is not an error
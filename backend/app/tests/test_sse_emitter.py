@@ -0,0 +1,85 @@
+import asyncio
+import json
+import pytest
+
+from app.utils.sse import SSEEmitter
+
+def _parse(payload: bytes):
+    fields = {}
+    for line in payload.decode().split("\r\n"):
+        if line:
+            key, _, value = line.partition(": ")
+            fields[key] = value
+    return fields
+
+async def _collect(emitter, last_event_id=None):
+    return [_parse(p) async for p in emitter.subscribe(last_event_id)]
+
+@pytest.mark.asyncio
+async def test_partial_text_is_coalesced():
+    emitter = SSEEmitter(flush_interval=0.05)
+
+    async def producer(e):
+        e.send("progress", {"percent": 10})
+        for ch in "hello":
+            e.send_text("partial", ch)
+        await asyncio.sleep(0.1)
+        e.send_text("partial", " world")
+        e.send("done", {"ok": True})
+
+    emitter.start(producer)
+    events = await _collect(emitter)
+
+    assert [e["event"] for e in events] == ["progress", "partial", "partial", "done"]
+    assert [json.loads(e["data"]).get("text") for e in events[1:3]] == ["hello", " world"]
+    assert [e["id"] for e in events] == ["0", "1", "2", "3"]
+    assert events[0]["retry"] == str(emitter.retry_ms)
+
+@pytest.mark.asyncio
+async def test_resume_from_last_event_id_does_not_rerun():
+    runs = []
+    emitter = SSEEmitter(flush_interval=0.01)
+
+    async def producer(e):
+        runs.append(1)
+        for i in range(4):
+            e.send("progress", {"percent": i})
+
+    emitter.start(producer)
+    first = await _collect(emitter)
+    resumed = await _collect(emitter, last_event_id=first[1]["id"])
+
+    assert runs == [1]
+    assert [e["id"] for e in resumed] == ["2", "3"]
+
+@pytest.mark.asyncio
+async def test_live_subscriber_and_bounded_replay():
+    emitter = SSEEmitter(flush_interval=0.01, replay_size=3)
+    gate = asyncio.Event()
+
+    async def producer(e):
+        for i in range(5):
+            e.send("progress", {"percent": i})
+        await gate.wait()
+        e.send("done", {})
+
+    emitter.start(producer)
+    reader = asyncio.create_task(_collect(emitter))
+    await asyncio.sleep(0.01)
+    gate.set()
+    events = await reader
+
+    # Only the last three events are retained for (re)connecting clients.
+    assert [e["id"] for e in events] == ["2", "3", "4", "5"]
+
+@pytest.mark.asyncio
+async def test_producer_failure_sends_error_and_closes():
+    emitter = SSEEmitter()
+
+    async def producer(e):
+        raise RuntimeError("boom")
+
+    emitter.start(producer)
+    events = await _collect(emitter)
+    assert [e["event"] for e in events] == ["error"]
+    assert emitter.closed
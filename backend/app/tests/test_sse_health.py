@@ -1,18 +1,19 @@
 import pytest
 import asyncio
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
 from app.main import app
 
 @pytest.mark.asyncio
 async def test_sse_stream_receives_progress_event():
     from app.routers.alt import alt_service
+    from app.core.storage import StoredUpload
     from pathlib import Path
     
     job_id = "test-sse-job-123"
     fake_file_path = Path("/tmp/fake_test_file.xlsx")
-    alt_service.register_job(job_id, fake_file_path)
+    alt_service.register_job(job_id, StoredUpload(path=fake_file_path, digest="0" * 64, size=0, filename=fake_file_path.name))
 
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         response = await ac.get(f"/api/alt/stream/{job_id}", timeout=10)
         
         assert response.status_code == 200
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.db import mongo
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ["openai", "azure.ai.formrecognizer", "pandas", "openpyxl", "numpy", "pyarrow"]
+
+def test_app_imports_without_aoai_settings_or_heavy_modules(tmp_path):
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("AZURE_OPENAI_", "DI_"))}
+    env["DATA_DIR"] = str(tmp_path)
+    code = f"import sys, app.main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+@pytest.mark.asyncio
+async def test_ready_waits_for_background_indexes(monkeypatch):
+    from app.main import app
+
+    release = asyncio.Event()
+
+    async def slow_ensure_indexes():
+        await release.wait()
+
+    monkeypatch.setattr(mongo, "ensure_indexes", slow_ensure_indexes)
+    for attr in ("client", "db", "index_task"):
+        monkeypatch.setattr(mongo.mongo_client, attr, None)
+    await mongo.connect_to_mongo()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            assert (await ac.get("/api/health/ready")).status_code == 503
+            release.set()
+            assert await mongo.wait_for_indexes(timeout=1)
+            assert (await ac.get("/api/health/ready")).json() == {"ready": True}
+    finally:
+        await mongo.close_mongo_connection()
+
+@pytest.mark.asyncio
+async def test_index_build_retries_connection_errors_but_not_rejected_commands(monkeypatch):
+    from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+
+    from app.main import app
+
+    errors = [ServerSelectionTimeoutError("no servers"), DuplicateKeyError("E11000 duplicate key partNo")]
+    calls = []
+
+    async def failing_ensure_indexes():
+        calls.append(1)
+        raise errors[len(calls) - 1]
+
+    monkeypatch.setattr(mongo, "ensure_indexes", failing_ensure_indexes)
+    monkeypatch.setattr(mongo, "INDEX_RETRY_SECONDS", 0)
+    for attr in ("client", "db", "index_task"):
+        monkeypatch.setattr(mongo.mongo_client, attr, None)
+    await mongo.connect_to_mongo()
+    try:
+        assert await mongo.wait_for_indexes(timeout=1) is False
+        assert len(calls) == 2
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/api/health/ready")
+        assert response.status_code == 503
+        assert "E11000" in response.json()["error"]
+    finally:
+        await mongo.close_mongo_connection()
+
+class _IndexedCollection:
+    def __init__(self, indexes):
+        self.indexes = indexes
+        self.created = []
+
+    async def index_information(self):
+        return self.indexes
+
+    async def create_index(self, field, **options):
+        self.created.append((field, options))
+
+class _Db:
+    def __init__(self, collection):
+        self.collection = collection
+        self.commands = []
+
+    def __getitem__(self, name):
+        return self.collection
+
+    async def command(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+@pytest.mark.asyncio
+async def test_ttl_index_is_changed_with_collmod():
+    db = _Db(_IndexedCollection({"_id_": {"key": [("_id", 1)]}, "updatedAt_1": {"key": [("updatedAt", 1)], "expireAfterSeconds": 3600}}))
+    await mongo.ensure_ttl_index(db, "jobs", "updatedAt", 7200)
+    assert db.collection.created == []
+    assert db.commands == [(("collMod", "jobs"), {"index": {"keyPattern": {"updatedAt": 1}, "expireAfterSeconds": 7200}})]
+
+    await mongo.ensure_ttl_index(db, "jobs", "updatedAt", 3600)
+    assert len(db.commands) == 1
+
+    fresh = _Db(_IndexedCollection({"_id_": {"key": [("_id", 1)]}}))
+    await mongo.ensure_ttl_index(fresh, "jobs", "updatedAt", 60)
+    assert fresh.collection.created == [("updatedAt", {"expireAfterSeconds": 60})]
@@ -0,0 +1,106 @@
+import hashlib
+import pytest
+from io import BytesIO
+from fastapi import UploadFile
+
+from app.core.storage import StorageService
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageService(str(tmp_path), token_secret="test-secret")
+
+@pytest.mark.asyncio
+async def test_save_upload_returns_digest_and_keeps_filename(storage):
+    content = b"%PDF-1.7 datasheet"
+    upload = await storage.save_upload(UploadFile(filename="up8308.pdf", file=BytesIO(content)))
+
+    assert upload.digest == hashlib.sha256(content).hexdigest()
+    assert upload.size == len(content)
+    assert upload.filename == "up8308.pdf"
+    assert upload.path.name.endswith("_up8308.pdf")
+    assert upload.path.read_bytes() == content
+    assert list(storage.tmp_dir.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_stored_once(storage):
+    content = b"same datasheet bytes" * 1000
+    first = await storage.save_upload(UploadFile(filename="a.pdf", file=BytesIO(content)))
+    second = await storage.save_upload(UploadFile(filename="b.pdf", file=BytesIO(content)))
+
+    assert first.digest == second.digest
+    assert first.path != second.path
+    assert first.path.stat().st_ino == second.path.stat().st_ino == storage.blob_path(first.digest).stat().st_ino
+    assert storage.ref_count(first.digest) == 2
+
+    storage.release_upload(first)
+    assert not first.path.exists()
+    assert storage.ref_count(first.digest) == 1
+    assert second.path.read_bytes() == content
+
+    storage.release_upload(second)
+    assert storage.ref_count(first.digest) == 0
+    assert not storage.blob_path(first.digest).exists()
+
+@pytest.mark.asyncio
+async def test_save_upload_strips_directories_from_filename(storage):
+    upload = await storage.save_upload(UploadFile(filename="../../evil.xlsx", file=BytesIO(b"PK")))
+    assert upload.path.parent == storage.uploads_dir
+    assert upload.filename == "evil.xlsx"
+
+@pytest.mark.asyncio
+async def test_save_uploads_aborts_all_on_rejected_file(storage):
+    def guard_factory(upload):
+        def check(chunk):
+            if upload.filename == "bad.pdf" and chunk:
+                raise ValueError("rejected")
+        return check
+
+    files = [
+        UploadFile(filename="good.xlsx", file=BytesIO(b"PK\x03\x04 good")),
+        UploadFile(filename="bad.pdf", file=BytesIO(b"not a pdf")),
+    ]
+    with pytest.raises(ValueError):
+        await storage.save_uploads(files, guard_factory)
+
+    assert list(storage.uploads_dir.iterdir()) == []
+    assert list(storage.tmp_dir.iterdir()) == []
+    assert not any(p.is_file() for p in storage.blobs_dir.rglob("*"))
+
+@pytest.mark.asyncio
+async def test_save_uploads_keeps_input_order(storage):
+    files = [UploadFile(filename=f"{i}.pdf", file=BytesIO(f"%PDF-{i}".encode())) for i in range(5)]
+    saved = await storage.save_uploads(files)
+    assert [s.filename for s in saved] == [f"{i}.pdf" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_value_job_releases_its_uploads_when_it_ends(storage, monkeypatch):
+    from app.routers import value
+
+    monkeypatch.setattr(value, "storage_service", storage)
+    upload = await storage.save_upload(UploadFile(filename="ds.pdf", file=BytesIO(b"%PDF-1.7 job input")))
+
+    async def failing_job():
+        raise RuntimeError("job failed")
+
+    with pytest.raises(RuntimeError):
+        await value._release_after([upload], failing_job())
+    assert not upload.path.exists()
+    assert storage.ref_count(upload.digest) == 0
+    assert not storage.blob_path(upload.digest).exists()
+
+@pytest.mark.asyncio
+async def test_evicted_alt_job_releases_its_upload(storage, monkeypatch):
+    from app.services import alt_service
+
+    monkeypatch.setattr(alt_service, "storage_service", storage)
+    service = alt_service.AltService()
+    service.jobs.max_entries = 1
+    first = await storage.save_upload(UploadFile(filename="a.xlsx", file=BytesIO(b"PK first")))
+    second = await storage.save_upload(UploadFile(filename="b.xlsx", file=BytesIO(b"PK second")))
+
+    service.register_job("job-1", first)
+    assert first.path.exists()
+    service.register_job("job-2", second)
+    assert not first.path.exists()
+    assert storage.ref_count(first.digest) == 0
+    assert second.path.exists()
@@ -1,7 +1,18 @@
 from fastapi import UploadFile, HTTPException, status
-from typing import List
+from typing import Callable, List
 from pathlib import Path
 
+# Leading bytes expected for each accepted extension.
+FILE_SIGNATURES = {
+    ".pdf": (b"%PDF-",),
+    ".xlsx": (b"PK\x03\x04",),
+    ".xls": (b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1",),
+}
+# PDF readers accept the header anywhere in the first 1024 bytes.
+PDF_HEADER_WINDOW = 1024
+
+ChunkGuard = Callable[[bytes], None]
+
 def validate_file(file: UploadFile, allowed_extensions: List[str], max_size_mb: int):
     file_ext = Path(file.filename).suffix.lower()
     if file_ext not in allowed_extensions:
@@ -43,3 +54,53 @@ def validate_files(files: List[UploadFile], settings):
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"上傳總大小 ({total_size / (1024 * 1024):.2f} MB) 超過限制 ({settings.TOTAL_UPLOAD_LIMIT_MB} MB)。"
         )
+
+def _has_expected_signature(file_ext: str, first_chunk: bytes) -> bool:
+    signatures = FILE_SIGNATURES.get(file_ext)
+    if not signatures:
+        return True
+    if file_ext == ".pdf":
+        return any(sig in first_chunk[:PDF_HEADER_WINDOW] for sig in signatures)
+    return first_chunk.startswith(signatures)
+
+class UploadGuard:
+    """
+    Enforces upload limits on the bytes actually received, chunk by chunk.
+
+    UploadFile.size may be missing, so validate_files() can only reject what the
+    client declared. for_file() returns a callback for StorageService.save_upload
+    that checks the file signature on the first chunk and the per-file and
+    request-wide byte limits on every chunk, aborting the save as soon as one fails.
+    """
+    def __init__(self, settings):
+        self.max_file_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+        self.max_total_bytes = settings.TOTAL_UPLOAD_LIMIT_MB * 1024 * 1024
+        self.max_file_size_mb = settings.MAX_FILE_SIZE_MB
+        self.total_upload_limit_mb = settings.TOTAL_UPLOAD_LIMIT_MB
+        self.total_bytes = 0
+
+    def for_file(self, file: UploadFile) -> ChunkGuard:
+        file_ext = Path(file.filename or "").suffix.lower()
+        file_bytes = 0
+
+        def check(chunk: bytes) -> None:
+            nonlocal file_bytes
+            if file_bytes == 0 and not _has_expected_signature(file_ext, chunk):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"檔案 '{file.filename}' 內容與副檔名 {file_ext} 不符或檔案為空。"
+                )
+            file_bytes += len(chunk)
+            self.total_bytes += len(chunk)
+            if file_bytes > self.max_file_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"檔案 '{file.filename}' 大小超過限制 ({self.max_file_size_mb} MB)。"
+                )
+            if self.total_bytes > self.max_total_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"上傳總大小超過限制 ({self.total_upload_limit_mb} MB)。"
+                )
+
+        return check
@@ -0,0 +1,14 @@
+def normalize_string(text: str) -> str:
+    """
+    Canonical form used for part numbers, spec keys and aliases in MongoDB.
+    Shared by PartsRepository and AliasesRepository so lookups always agree.
+    """
+    # Trim whitespace
+    text = text.strip()
+    # Convert to lowercase
+    text = text.lower()
+    # Replace multiple spaces with a single space
+    text = " ".join(text.split())
+    # Remove spaces around parentheses
+    text = text.replace(" (", "(").replace(") ", ")")
+    return text
@@ -0,0 +1,38 @@
+# backend/app/utils/responses.py
+import datetime
+import json
+import logging
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # In requirements.txt; a partial dev install falls back to the stdlib encoder
+    orjson = None
+    logger.warning("orjson is not installed (see requirements.txt); FastJSONResponse uses the slower json module.")
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)  # e.g. ObjectId, Path
+
+def dumps(content: Any) -> bytes:
+    """Serializes plain dict/list data to JSON bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for trusted, already-shaped data (documents read from our
+    own collections, job records we wrote). Returning it from a route skips
+    response_model validation and jsonable_encoder, which dominate the cost
+    of large responses such as parts with hundreds of specs.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
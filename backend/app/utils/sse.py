@@ -0,0 +1,147 @@
+# backend/app/utils/sse.py
+"""
+Server-Sent Events emitter shared by streaming jobs.
+
+A job runs once in the background and publishes events to an SSEEmitter;
+every connected client reads from the emitter's replay buffer. Events are
+encoded to bytes once, when they are published, so fanning out to several
+clients (or replaying to a reconnecting one) costs no serialization.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Tuple
+
+from pydantic import BaseModel
+from sse_starlette.sse import ServerSentEvent
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _serialize(data: BaseModel | Dict[str, Any] | str) -> str:
+    if isinstance(data, BaseModel):
+        return data.model_dump_json()
+    if isinstance(data, str):
+        return data
+    return json.dumps(data, ensure_ascii=False)
+
+class SSEEmitter:
+    """
+    Collects a job's events into a bounded, id-numbered replay buffer.
+
+    - send() publishes an event immediately.
+    - send_text() appends text to a pending buffer that is published as one
+      event every flush_interval seconds (or before the next send()), so
+      token-by-token output does not become one event per token.
+    - subscribe() streams the buffer from a Last-Event-ID onwards and then
+      follows new events until the emitter is closed.
+    """
+    def __init__(
+        self,
+        flush_interval: float | None = None,
+        replay_size: int | None = None,
+        retry_ms: int | None = None,
+    ):
+        self.flush_interval = settings.SSE_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+        self.retry_ms = settings.SSE_RETRY_MS if retry_ms is None else retry_ms
+        self._events: Deque[Tuple[int, bytes]] = deque(maxlen=replay_size or settings.SSE_REPLAY_BUFFER_SIZE)
+        self._next_id = 0
+        self._pending_event: str | None = None
+        self._pending_text: List[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.closed = False
+        self.closed_at: float | None = None
+
+    def start(self, producer: Callable[["SSEEmitter"], Awaitable[None]]) -> asyncio.Task:
+        """Runs producer(self) as a background task; the emitter is closed when it returns."""
+        async def run():
+            try:
+                await producer(self)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("SSE producer failed: %s", e)
+                self.send("error", {"message": "處理過程中發生錯誤"})
+            finally:
+                self.close()
+
+        self._task = asyncio.create_task(run())
+        return self._task
+
+    def send(self, event: str, data: BaseModel | Dict[str, Any] | str) -> None:
+        """Publishes one event; pending coalesced text is flushed first to keep ordering."""
+        if self.closed:
+            return
+        self._flush()
+        self._publish(event, _serialize(data))
+
+    def send_text(self, event: str, text: str) -> None:
+        """Queues text to be sent as {"text": ...} in the next coalesced `event`."""
+        if self.closed or not text:
+            return
+        if self._pending_event is not None and self._pending_event != event:
+            self._flush()
+        self._pending_event = event
+        self._pending_text.append(text)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+
+    def close(self) -> None:
+        """Flushes pending text and ends every subscriber's stream once it is drained."""
+        if self.closed:
+            return
+        self._flush()
+        self.closed = True
+        self.closed_at = time.monotonic()
+        self._notify()
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self.close()
+
+    async def subscribe(self, last_event_id: str | None = None) -> AsyncIterator[bytes]:
+        """Yields encoded events after last_event_id (from the start when None or unknown)."""
+        try:
+            next_id = int(last_event_id) + 1 if last_event_id else 0
+        except ValueError:
+            next_id = 0
+
+        while True:
+            changed = self._changed
+            for event_id, payload in list(self._events):
+                if event_id >= next_id:
+                    yield payload
+                    next_id = event_id + 1
+            if self.closed and next_id >= self._next_id:
+                return
+            await changed.wait()
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending_text:
+            event, text = self._pending_event, "".join(self._pending_text)
+            self._pending_event, self._pending_text = None, []
+            self._publish(event, json.dumps({"text": text}, ensure_ascii=False))
+
+    def _publish(self, event: str, data: str) -> None:
+        event_id = self._next_id
+        self._next_id += 1
+        # The retry hint goes out with the first event so clients reconnect promptly.
+        retry = self.retry_ms if event_id == 0 else None
+        payload = ServerSentEvent(data=data, event=event, id=str(event_id), retry=retry).encode()
+        self._events.append((event_id, payload))
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
@@ -0,0 +1,90 @@
+"""
+Requests/sec of GET /api/parts/{partNo} for a large part, before and after
+the fast serialization path. Runs in-process over ASGI with the parts
+repository replaced by an in-memory document, so only the request
+handling and serialization are measured.
+
+    cd backend && python -m benchmarks.bench_part_response --specs 500 --requests 300
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.models.schemas import Part
+from app.routers.parts import get_aliases_repo, get_parts_repo
+from app.services.parts_repo import PART_DEFAULTS, SPEC_DEFAULTS
+
+def make_part(n_specs: int) -> dict:
+    now = datetime.now()
+    return {
+        "partNo": "bench-part",
+        "manufacturer": "TI",
+        "createdAt": now,
+        "updatedAt": now,
+        "specs": [
+            {
+                "key": f"spec {i}", "value": f"{i * 0.1:.2f}", "unit": "V", "aliases": [f"alias {i}"],
+                "status": "confirmed", "sourceFiles": [{"filename": "datasheet.pdf", "uploadedAt": now}],
+                "lastUpdatedAt": now, "lastUpdatedBy": "bench", "notes": None,
+            }
+            for i in range(n_specs)
+        ],
+    }
+
+class _Repo:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def get_part(self, partNo):
+        return Part(**self.doc)
+
+    async def get_part_document(self, partNo):
+        part = {**PART_DEFAULTS, **self.doc}
+        part["specs"] = [{**SPEC_DEFAULTS, **spec} for spec in part["specs"]]
+        return part
+
+def baseline_app(repo: _Repo) -> FastAPI:
+    """The previous handler: build a Part, then validate it again via response_model."""
+    baseline = FastAPI()
+
+    @baseline.get("/api/parts/{partNo}", response_model=Part)
+    async def get_part(partNo: str):
+        return await repo.get_part(partNo)
+
+    return baseline
+
+async def measure(asgi_app, n_requests: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=asgi_app), base_url="http://bench") as client:
+        for _ in range(10):  # warm up
+            (await client.get("/api/parts/bench-part")).raise_for_status()
+        started = time.perf_counter()
+        for _ in range(n_requests):
+            (await client.get("/api/parts/bench-part")).raise_for_status()
+        return n_requests / (time.perf_counter() - started)
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--specs", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    repo = _Repo(make_part(args.specs))
+    app.dependency_overrides[get_parts_repo] = lambda: repo
+    app.dependency_overrides[get_aliases_repo] = lambda: None  # unused without ?keys=
+    try:
+        before = await measure(baseline_app(repo), args.requests)
+        after = await measure(app, args.requests)
+    finally:
+        app.dependency_overrides.clear()
+
+    print(f"part with {args.specs} specs, {args.requests} requests")
+    print(f"  before (Part model + response_model): {before:8.1f} req/s")
+    print(f"  after  (FastJSONResponse):            {after:8.1f} req/s  ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
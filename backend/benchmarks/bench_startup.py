@@ -0,0 +1,59 @@
+"""
+Time to import app.main in a fresh interpreter, i.e. what every worker boot
+and test collection pays before serving anything. Each run also reports the
+heavy SDKs that got imported along the way; they should only load when a
+job needs them.
+
+    cd backend && python -m benchmarks.bench_startup --runs 5
+    cd backend && python -m benchmarks.bench_startup --max-seconds 1.5   # exit 1 if slower
+
+Runs without the AZURE_OPENAI_* / DI_* settings, since importing the app
+must not need them.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["openai", "azure.ai.formrecognizer", "pandas", "openpyxl", "numpy", "pyarrow"]
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def run_once(env) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, help="fail if the median import time is above this")
+    args = parser.parse_args()
+
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("AZURE_OPENAI_", "DI_"))}
+    env.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="bench-startup-"))
+
+    samples = [run_once(env) for _ in range(args.runs)]
+    seconds = [s["seconds"] for s in samples]
+    heavy = sorted({m for s in samples for m in s["heavy"]})
+    median = statistics.median(seconds)
+    print(f"import app.main: median {median * 1000:.0f} ms, min {min(seconds) * 1000:.0f} ms over {args.runs} runs")
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+
+    if heavy or (args.max_seconds is not None and median > args.max_seconds):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
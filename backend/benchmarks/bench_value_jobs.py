@@ -0,0 +1,160 @@
+"""
+Load test of value jobs against local fake DI/AOAI servers (see fake_azure).
+
+Starts fake_azure in a subprocess, points the app's DI/AOAI settings at it,
+then drives --jobs value jobs (--concurrency at a time) through the real
+FastAPI app in-process over ASGI: upload_polling, then poll result_polling
+until each job is done. No Azure quota and no MongoDB are needed.
+
+    cd backend && python -m benchmarks.bench_value_jobs --jobs 50 --concurrency 10
+    cd backend && python -m benchmarks.bench_value_jobs --jobs 20 --pdfs 4 --rate-429 0.2 --aoai-latency 8
+
+Reports job throughput, end-to-end latency percentiles, the median of each
+stage timing from the job records, and peak RSS of this process (app +
+client) and of the fake server.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.fake_azure import add_config_arguments, config_from_args, config_to_argv
+
+POLL_INTERVAL_SECONDS = 0.2
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"fake Azure server did not start on port {port}")
+
+def query_workbook(n_targets: int, n_fields: int) -> bytes:
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Field"] + [f"PN-{i}" for i in range(n_targets)])
+    for i in range(n_fields):
+        sheet.append([f"Parameter {i}"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def fake_pdf(size_kb: int) -> bytes:
+    # Only the signature is checked; the fake DI server ignores the content.
+    return b"%PDF-1.4\n" + b"0" * (size_kb * 1024)
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_job(client, excel: bytes, pdf: bytes, n_pdfs: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    files = [("excel", ("query.xlsx", excel, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"))]
+    files += [("pdfs", (f"datasheet_{i}.pdf", pdf, "application/pdf")) for i in range(n_pdfs)]
+    response = await client.post("/api/value/upload_polling", files=files)
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    while True:
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        result = (await client.get(f"/api/value/result_polling/{job_id}")).json()
+        if result.get("status") in ("done", "error"):
+            return {"status": result["status"], "seconds": time.perf_counter() - started, "timings": result.get("timings") or {}}
+
+async def drive(args) -> List[Dict[str, Any]]:
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+
+    excel = query_workbook(args.targets, args.fields)
+    pdf = fake_pdf(args.pdf_kb)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(client):
+        async with semaphore:
+            try:
+                return await run_job(client, excel, pdf, args.pdfs)
+            except Exception as e:
+                print(f"[ERROR] job failed to run: {e}", file=sys.stderr)
+                return {"status": "error", "seconds": 0.0, "timings": {}}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        return await asyncio.gather(*(one(client) for _ in range(args.jobs)))
+
+def report(results: List[Dict[str, Any]], elapsed: float, server_rss_kb: int) -> None:
+    done = [r for r in results if r["status"] == "done"]
+    latencies = [r["seconds"] for r in done]
+    print(f"{len(results)} jobs in {elapsed:.1f} s: {len(done)} done, {len(results) - len(done)} failed")
+    print(f"  throughput: {len(done) / elapsed:.2f} jobs/s")
+    if latencies:
+        print("  latency (s): " + "  ".join(f"p{p}={percentile(latencies, p):.2f}" for p in (50, 90, 99)) + f"  max={max(latencies):.2f}")
+
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for r in done:
+        for stage, seconds in r["timings"].items():
+            stages["di_call" if stage.startswith("di:") else stage].append(seconds)
+    if stages:
+        print("  stage median (s): " + "  ".join(f"{s}={statistics.median(v):.3f}" for s, v in stages.items()))
+
+    # ru_maxrss is in KiB on Linux
+    print(f"  peak RSS: app {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB, "
+          f"fake server {server_rss_kb / 1024:.0f} MiB")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--pdfs", type=int, default=2, help="PDFs per job")
+    parser.add_argument("--pdf-kb", type=int, default=200, help="size of each uploaded PDF")
+    parser.add_argument("--targets", type=int, default=3, help="part numbers per query workbook")
+    parser.add_argument("--fields", type=int, default=10, help="fields per query workbook")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's progress output")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_azure", "--port", str(port)] + config_to_argv(config_from_args(args)),
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        _wait_for_port(port)
+        endpoint = f"http://127.0.0.1:{port}"
+        # Must be set before the app (and its Settings) is imported.
+        os.environ.update({
+            "DI_ENDPOINT": endpoint, "DI_KEY": "fake",
+            "AZURE_OPENAI_ENDPOINT": endpoint, "AZURE_OPENAI_API_KEY": "fake",
+            "AZURE_OPENAI_API_VER": "2024-02-15-preview", "AZURE_OPENAI_DEPLOYMENT": "fake-deployment",
+        })
+        os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="bench-value-"))
+
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            results = asyncio.run(drive(args))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    report(results, elapsed, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Local stand-ins for the Document Intelligence and Azure OpenAI REST APIs, so
+value jobs can be load-tested without Azure quota. One server answers both:
+
+    POST /formrecognizer/documentModels/{model}:analyze        -> 202 + Operation-Location
+    GET  /formrecognizer/documentModels/{model}/analyzeResults/{id}
+                                                                 -> running, then a synthetic datasheet
+    POST /openai/deployments/{deployment}/chat/completions       -> JSON extraction result
+
+Point DI_ENDPOINT and AZURE_OPENAI_ENDPOINT at it (bench_value_jobs does
+this itself). Latency, 429 rate and payload sizes are configurable:
+
+    cd backend && python -m benchmarks.fake_azure --port 8765 --di-latency 2 --aoai-latency 5 --rate-429 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+SPEC_ROWS = [
+    ("Input Voltage", "2.7", "5.5", "V"),
+    ("Output Current", "", "3", "A"),
+    ("Switching Frequency", "1.8", "2.2", "MHz"),
+    ("Quiescent Current", "", "25", "uA"),
+    ("Operating Temperature", "-40", "125", "C"),
+    ("Efficiency", "", "95", "%"),
+]
+
+@dataclass
+class FakeAzureConfig:
+    di_latency: float = 1.0  # seconds until an analyze operation succeeds
+    aoai_latency: float = 3.0  # seconds per chat completion
+    jitter: float = 0.2  # +/- fraction applied to both latencies
+    rate_429: float = 0.0  # share of requests answered with 429
+    retry_after_ms: int = 200
+    pages: int = 8  # pages per synthetic datasheet
+    lines_per_page: int = 40
+    aoai_padding_kb: int = 0  # extra notes text in each extraction result
+
+def _latency(base: float, jitter: float) -> float:
+    return max(0.0, base * (1 + random.uniform(-jitter, jitter)))
+
+def _box(x: float, y: float, w: float, h: float) -> List[float]:
+    return [x, y, x + w, y, x + w, y + h, x, y + h]
+
+def synthetic_analyze_result(part_no: str, pages: int = 8, lines_per_page: int = 40) -> Dict[str, Any]:
+    """A prebuilt-document analyzeResult (REST shape) for a made-up datasheet of part_no."""
+    content_parts: List[str] = []
+    offset = 0
+
+    def span(text: str) -> List[Dict[str, int]]:
+        nonlocal offset
+        content_parts.append(text)
+        s = [{"offset": offset, "length": len(text)}]
+        offset += len(text) + 1
+        return s
+
+    result_pages = []
+    for page_number in range(1, pages + 1):
+        lines = []
+        for i in range(lines_per_page):
+            text = f"{part_no} datasheet page {page_number} line {i}: typical application note text."
+            lines.append({"content": text, "polygon": _box(0.5, 0.2 * i + 0.5, 7.0, 0.15), "spans": span(text)})
+        result_pages.append({
+            "pageNumber": page_number, "angle": 0, "width": 8.5, "height": 11, "unit": "inch",
+            "spans": [{"offset": 0, "length": 0}], "lines": lines, "words": [],
+        })
+
+    cells = []
+    for column, header in enumerate(["Parameter", "Min", "Max", "Unit"]):
+        cells.append({"kind": "columnHeader", "rowIndex": 0, "columnIndex": column, "content": header, "spans": span(header)})
+    for row, values in enumerate(SPEC_ROWS, start=1):
+        for column, value in enumerate(values):
+            cells.append({"rowIndex": row, "columnIndex": column, "content": value, "spans": span(value)})
+    table = {
+        "rowCount": len(SPEC_ROWS) + 1, "columnCount": 4, "cells": cells,
+        "boundingRegions": [{"pageNumber": 2, "polygon": _box(0.5, 0.5, 7.5, 3.0)}],
+        "spans": [{"offset": 0, "length": 0}],
+    }
+    return {
+        "apiVersion": "2023-07-31", "modelId": "prebuilt-document", "stringIndexType": "textElements",
+        "content": "\n".join(content_parts), "pages": result_pages, "tables": [table],
+        "keyValuePairs": [], "paragraphs": [], "styles": [],
+    }
+
+def synthetic_extraction(pns: List[str], items: List[str], padding_kb: int = 0) -> Dict[str, Any]:
+    """An AOAI extraction result in the shape SYSTEM_PROMPT asks for."""
+    notes = "x" * (padding_kb * 1024 // max(1, len(pns) * len(items))) or None
+    return {
+        "documents": [
+            {
+                "target_pn": pn,
+                "items": [
+                    {"field": item, "value": f"{i + 1}.0", "unit": "V", "confidence": 0.95,
+                     "provenance": "p2 Electrical Characteristics", "notes": notes}
+                    for i, item in enumerate(items)
+                ],
+            }
+            for pn in pns
+        ]
+    }
+
+def create_app(config: FakeAzureConfig) -> Starlette:
+    operations: Dict[str, tuple] = {}  # operation id -> (ready_at, part_no)
+    counters = {"di_analyze": 0, "di_poll": 0, "aoai": 0, "throttled": 0}
+
+    def throttled() -> Response | None:
+        if config.rate_429 and random.random() < config.rate_429:
+            counters["throttled"] += 1
+            return JSONResponse(
+                {"error": {"code": "429", "message": "Rate limit is exceeded."}}, status_code=429,
+                headers={"retry-after-ms": str(config.retry_after_ms), "retry-after": "1"},
+            )
+        return None
+
+    async def analyze(request: Request) -> Response:
+        throttle = throttled()
+        if throttle:
+            return throttle
+        counters["di_analyze"] += 1
+        body = await request.body()
+        model = request.path_params["model"].split(":")[0]
+        operation_id = str(uuid.uuid4())
+        operations[operation_id] = (time.monotonic() + _latency(config.di_latency, config.jitter), f"PN-{len(body) % 997}")
+        location = f"{request.base_url}formrecognizer/documentModels/{model}/analyzeResults/{operation_id}?api-version=2023-07-31"
+        return Response(status_code=202, headers={"Operation-Location": location})
+
+    async def analyze_result(request: Request) -> Response:
+        counters["di_poll"] += 1
+        operation_id = request.path_params["operation_id"]
+        if operation_id not in operations:
+            return JSONResponse({"error": {"code": "NotFound", "message": "Unknown operation."}}, status_code=404)
+        ready_at, part_no = operations[operation_id]
+        remaining = ready_at - time.monotonic()
+        if remaining > 0:
+            retry_ms = str(int(min(remaining, 1.0) * 1000) + 1)
+            return JSONResponse({"status": "running"}, headers={"retry-after-ms": retry_ms})
+        operations.pop(operation_id)
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return JSONResponse({
+            "status": "succeeded", "createdDateTime": now, "lastUpdatedDateTime": now,
+            "analyzeResult": synthetic_analyze_result(part_no, config.pages, config.lines_per_page),
+        })
+
+    async def chat_completions(request: Request) -> Response:
+        throttle = throttled()
+        if throttle:
+            return throttle
+        counters["aoai"] += 1
+        body = await request.json()
+        payload = json.loads(body["messages"][-1]["content"])
+        targets = payload.get("targets", {})
+        await asyncio.sleep(_latency(config.aoai_latency, config.jitter))
+        content = json.dumps(synthetic_extraction(targets.get("pns", []), targets.get("items", []), config.aoai_padding_kb))
+        prompt_tokens = sum(len(m.get("content", "")) for m in body["messages"]) // 4
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion", "created": int(time.time()),
+            "model": request.path_params["deployment"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        })
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse(counters)
+
+    return Starlette(routes=[
+        Route("/formrecognizer/documentModels/{model}", analyze, methods=["POST"]),
+        Route("/formrecognizer/documentModels/{model}/analyzeResults/{operation_id}", analyze_result, methods=["GET"]),
+        Route("/openai/deployments/{deployment}/chat/completions", chat_completions, methods=["POST"]),
+        Route("/stats", stats, methods=["GET"]),
+    ])
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeAzureConfig()
+    parser.add_argument("--di-latency", type=float, default=defaults.di_latency, help="seconds per DI analyze")
+    parser.add_argument("--aoai-latency", type=float, default=defaults.aoai_latency, help="seconds per chat completion")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--rate-429", type=float, default=defaults.rate_429, help="share of requests throttled (0-1)")
+    parser.add_argument("--retry-after-ms", type=int, default=defaults.retry_after_ms)
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="pages per synthetic datasheet")
+    parser.add_argument("--lines-per-page", type=int, default=defaults.lines_per_page)
+    parser.add_argument("--aoai-padding-kb", type=int, default=defaults.aoai_padding_kb)
+
+def config_from_args(args: argparse.Namespace) -> FakeAzureConfig:
+    return FakeAzureConfig(
+        di_latency=args.di_latency, aoai_latency=args.aoai_latency, jitter=args.jitter,
+        rate_429=args.rate_429, retry_after_ms=args.retry_after_ms, pages=args.pages,
+        lines_per_page=args.lines_per_page, aoai_padding_kb=args.aoai_padding_kb,
+    )
+
+def config_to_argv(config: FakeAzureConfig) -> List[str]:
+    return [
+        "--di-latency", str(config.di_latency), "--aoai-latency", str(config.aoai_latency),
+        "--jitter", str(config.jitter), "--rate-429", str(config.rate_429),
+        "--retry-after-ms", str(config.retry_after_ms), "--pages", str(config.pages),
+        "--lines-per-page", str(config.lines_per_page), "--aoai-padding-kb", str(config.aoai_padding_kb),
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -121,6 +121,11 @@ const AltPage = () => {
     });
 
     eventSource.onerror = (err) => {
+      if (eventSource.readyState === EventSource.CONNECTING) {
+        // 瀏覽器會帶 Last-Event-ID 自動重連，後端從中斷處續傳
+        setProgressMessage('連線中斷，重新連線中...');
+        return;
+      }
       console.error("EventSource failed:", err);
       setError('與伺服器連線發生錯誤或處理失敗。');
       setStatus('error');